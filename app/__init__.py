@@ -1,18 +1,25 @@
+import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_mail import Mail
 from flask_cors import CORS
+from app.utils.db_routing import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 mail = Mail()
 
 def create_app(config_name='default'):
+    from app.utils.startup import StartupTimer
+    timer = StartupTimer()
+    
     app = Flask(__name__)
+    app.extensions['startup_timings'] = timer
+    
+    from app.utils.serializers import FastJSONProvider
+    app.json = FastJSONProvider(app)
     
     CORS(app, resources={r"/api/*": {"origins": [
         "http://localhost:3000", 
@@ -27,25 +34,85 @@ def create_app(config_name='default'):
     from app.config import config
     app.config.from_object(config[config_name])
     
+    # Behind nginx, take the client address and scheme from the headers set by the trusted proxies
+    if app.config.get('PROXY_FIX_X_FOR'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app,
+            x_for=app.config['PROXY_FIX_X_FOR'],
+            x_proto=app.config.get('PROXY_FIX_X_PROTO', 0)
+        )
+    timer.mark('flask')
+    
     # Initialize extensions with app
+    from app.utils import db_pool
+    db_pool.configure_engine_options(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    with app.app_context():
+        db_pool.register_engines(db.engines.values())
+    
+    from app.utils import db_routing
+    db_routing.init_app(app)
     jwt.init_app(app)
     mail.init_app(app)
+    
+    # Flask-Migrate pulls in Alembic, which only the `flask db` commands need
+    if os.environ.get('FLASK_RUN_FROM_CLI'):
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    timer.mark('extensions')
+    
+    from app.services.email_service import outbox_sender
+    outbox_sender.init_app(app)
+    
+    from app.services.password_service import password_hasher
+    password_hasher.init_app(app)
+    
+    from app.services import principal_service
+    principal_service.init_app(app)
+    
+    from app.services.token_blocklist import token_blocklist
+    token_blocklist.init_app(app)
+    
+    from app.services import stats_service
+    stats_service.init_app(app)
+    
+    from app.utils.rate_limit import rate_limiter
+    rate_limiter.init_app(app)
+    
+    from app.utils.idempotency import idempotency
+    idempotency.init_app(app)
+    
+    from app.services.shadow_service import shadow_scorer
+    shadow_scorer.init_app(app)
+    
+    from app.services import prediction_service
+    prediction_service.init_app(app)
+    
+    from app.utils.compression import compressor
+    compressor.init_app(app)
+    
+    from app.utils.query_stats import request_query_stats
+    request_query_stats.init_app(app)
+    timer.mark('services')
     # CORS(app)
     
     # Import and configure Swagger here to avoid circular imports
     from app.utils.swagger_utils import configure_swagger
     configure_swagger(app)
+    timer.mark('swagger')
     
     # Register blueprints
     from app.api.v1.auth import auth_bp
     from app.api.v1.admin import admin_bp
     from app.api.v1.predictions import predictions_bp
+    from app.api.v1.properties import properties_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
     app.register_blueprint(admin_bp, url_prefix='/api/v1/admin')
     app.register_blueprint(predictions_bp, url_prefix='/api/v1/predictions')
+    app.register_blueprint(properties_bp, url_prefix='/api/v1/properties')
+    timer.mark('blueprints')
     
     @app.route('/')
     def index():
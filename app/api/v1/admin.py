@@ -1,8 +1,28 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import jwt_required, current_user
 from app.models.user import User
 from app import db
-from app.services.email_service import send_invitation_email
+from app.services.email_service import enqueue_email, outbox_sender
+from app.services.principal_service import invalidate_principal, invalidate_principals
+from app.services.property_import_service import FORMATS, ImportInterrupted, detect_format, import_properties
+from app.services.shadow_service import shadow_scorer
+from app.services.stats_service import get_admin_stats, invalidate_admin_stats
+from app.services.token_blocklist import token_blocklist
+from app.services.user_import_service import parse_invitation_csv, import_invitations
+from app.services.user_query_service import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_int, parse_user_filters, apply_user_filters, parse_fields, get_users_page,
+    get_users_page_version, stream_users_json, search_users
+)
+from app.utils.auth import admin_required
+from app.utils.db_pool import pool_status
+from app.utils.db_routing import read_only
+from app.utils.http_cache import compute_etag, not_modified, cache_headers
+from app.utils.idempotency import idempotent
+from app.utils.validation import validate_json
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+import csv
+import io
+import os
 import uuid
 from datetime import datetime
 
@@ -10,6 +30,9 @@ admin_bp = Blueprint('admin', __name__)
 
 @admin_bp.route('/users', methods=['POST'])
 @jwt_required()
+@admin_required
+@validate_json
+@idempotent
 def create_user():
     """
     Create and invite a new user (Admin only)
@@ -19,6 +42,11 @@ def create_user():
     security:
       - JWT: []
     parameters:
+      - name: Idempotency-Key
+        in: header
+        type: string
+        required: false
+        description: Unique key for this request; retries with the same key get the first response back
       - name: body
         in: body
         required: true
@@ -53,14 +81,10 @@ def create_user():
       403:
         description: Not an admin
       409:
-        description: User already exists
+        description: User already exists, or a request with the same Idempotency-Key is still being processed
+      422:
+        description: Idempotency-Key was already used for a different request
     """
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'message': 'Admin privileges required'}), 403
-    
     data = request.get_json()
     
     if not data or not data.get('email'):
@@ -89,49 +113,394 @@ def create_user():
     new_user.invitation_sent_at = datetime.utcnow()
     
     db.session.add(new_user)
+    # Queue the invitation email in the same transaction as the user
+    enqueue_email(new_user.email, 'invitation', {'invitation_token': invitation_token})
     db.session.commit()
-    
-    # Send invitation email
-    send_invitation_email(new_user.email, invitation_token)
+    outbox_sender.wake()
     
     return jsonify({
         'message': 'User created and invitation sent successfully',
         'user': new_user.to_dict()
     }), 201
 
+@admin_bp.route('/users/import', methods=['POST'])
+@jwt_required()
+@admin_required
+def import_users():
+    """
+    Invite users in bulk from a CSV file (Admin only)
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    consumes:
+      - multipart/form-data
+      - text/csv
+    parameters:
+      - name: file
+        in: formData
+        type: file
+        required: false
+        description: CSV with an email column and optional first_name, last_name and is_admin columns. May also be sent as a text/csv request body.
+    responses:
+      200:
+        description: Import summary with created, existing and duplicate counts, and per-line errors
+      400:
+        description: Invalid CSV
+      401:
+        description: Unauthorized
+      403:
+        description: Not an admin
+      409:
+        description: Some emails were registered concurrently, retry the import
+    """
+    upload = request.files.get('file')
+    if upload:
+        lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig')
+    elif request.mimetype == 'text/csv':
+        lines = io.StringIO(request.get_data(as_text=True))
+    else:
+        return jsonify({'message': 'CSV file is required'}), 400
+    
+    try:
+        invitations, errors = parse_invitation_csv(lines)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'message': f'Invalid CSV: {str(e)}'}), 400
+    
+    try:
+        summary = import_invitations(invitations)
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'Some emails were registered during the import, please retry'}), 409
+    
+    summary['invalid'] = len(errors)
+    summary['errors'] = errors[:100]
+    
+    return jsonify(summary), 200
+
+@admin_bp.route('/properties/import', methods=['POST'])
+@jwt_required()
+@admin_required
+def import_property_feed():
+    """
+    Upsert properties from a CSV or NDJSON listing feed (Admin only)
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    consumes:
+      - multipart/form-data
+      - text/csv
+      - application/x-ndjson
+    parameters:
+      - name: file
+        in: formData
+        type: file
+        required: false
+        description: Feed with address, city, country, postcode, property_type, size_sqft, num_bedrooms, num_bathrooms and listing_price, and optional latitude and longitude. May also be sent as the request body.
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson]
+        required: false
+        description: Feed format, by default guessed from the file name or content type
+    responses:
+      200:
+        description: Import summary with loaded, duplicate and invalid row counts, per-line errors and rows per second
+      400:
+        description: Invalid feed; rows committed before an error part way through are reported
+      401:
+        description: Unauthorized
+      403:
+        description: Not an admin
+      500:
+        description: Database error part way through; rows committed before it are reported
+    """
+    upload = request.files.get('file')
+    if upload:
+        fmt = request.args.get('format') or detect_format(upload.filename, upload.mimetype)
+        lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig')
+    elif request.mimetype in ['text/csv', 'application/x-ndjson', 'application/jsonl']:
+        fmt = request.args.get('format') or detect_format(mimetype=request.mimetype)
+        # Read the body as it arrives rather than buffering the whole feed
+        lines = io.TextIOWrapper(request.stream, encoding='utf-8-sig')
+    else:
+        return jsonify({'message': 'CSV or NDJSON feed is required'}), 400
+    
+    if fmt not in FORMATS:
+        return jsonify({'message': f"Invalid format, expected one of: {', '.join(FORMATS)}"}), 400
+    
+    try:
+        summary = import_properties(lines, fmt, chunk_size=current_app.config['PROPERTY_IMPORT_CHUNK_SIZE'])
+    except ImportInterrupted as e:
+        # Earlier chunks stay committed; re-sending the feed upserts the same rows
+        status = 500 if isinstance(e.__cause__, SQLAlchemyError) else 400
+        return jsonify(dict(e.summary, message=str(e))), status
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'message': f'Invalid feed: {str(e)}'}), 400
+    
+    return jsonify(summary), 200
+
 @admin_bp.route('/users', methods=['GET'])
 @jwt_required()
+@admin_required
+@read_only
 def get_users():
     """
-    Get all users (Admin only)
+    Get users, one page at a time (Admin only)
     ---
     tags:
       - Admin
     security:
       - JWT: []
+    parameters:
+      - name: cursor
+        in: query
+        type: integer
+        required: false
+        description: Value of the X-Next-Cursor header from the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (default 100, max 1000)
+      - name: active
+        in: query
+        type: boolean
+        required: false
+        description: Only active (true) or inactive (false) users
+      - name: admin
+        in: query
+        type: boolean
+        required: false
+        description: Only admins (true) or non-admins (false)
+      - name: pending
+        in: query
+        type: boolean
+        required: false
+        description: Only users with (true) or without (false) a pending invitation
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma separated fields to return, e.g. id,email,is_active
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream every matching user as a single JSON array instead of one page, for exports
     responses:
       200:
-        description: List of users
+        description: List of users. X-Next-Cursor is set when more pages are available.
         schema:
           type: array
           items:
             type: object
+      304:
+        description: Page not modified since the ETag given in If-None-Match
+      400:
+        description: Invalid request
+      401:
+        description: Unauthorized
+      403:
+        description: Not an admin
+    """
+    try:
+        filters = parse_user_filters(request.args)
+        fields = parse_fields(request.args.get('fields'))
+        after_id = parse_int(request.args, 'cursor')
+        limit = min(parse_int(request.args, 'limit', DEFAULT_PAGE_SIZE, minimum=1), MAX_PAGE_SIZE)
+        stream = request.args.get('stream', '').lower() in ['true', 'yes', '1']
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    if stream:
+        return Response(
+            stream_with_context(stream_users_json(filters, fields, after_id)),
+            mimetype='application/json'
+        )
+    
+    etag = compute_etag('users', get_users_page_version(filters, after_id, limit), filters, fields, after_id, limit)
+    response = not_modified(etag, 'admin')
+    if response is not None:
+        return response
+    
+    users, next_cursor = get_users_page(filters, fields, after_id, limit)
+    response = cache_headers(jsonify(users), etag, 'admin')
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return response, 200
+
+@admin_bp.route('/users', methods=['PATCH'])
+@jwt_required()
+@admin_required
+@validate_json
+def bulk_update_users():
+    """
+    Activate, deactivate or change the role of many users at once (Admin only)
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            ids:
+              type: array
+              minItems: 1
+              items:
+                type: integer
+              description: Users to update
+              example: [12, 15, 19]
+            filter:
+              type: object
+              minProperties: 1
+              additionalProperties: false
+              description: Update every user matching these filters instead of a list of ids
+              properties:
+                active:
+                  type: boolean
+                admin:
+                  type: boolean
+                pending:
+                  type: boolean
+            is_active:
+              type: boolean
+              description: New active state
+            is_admin:
+              type: boolean
+              description: New admin state
+    responses:
+      200:
+        description: Number of users updated. The calling admin is never deactivated or demoted, and the
+          tokens of users deactivated or demoted are revoked.
+        schema:
+          type: object
+          properties:
+            updated:
+              type: integer
+      400:
+        description: Invalid request
+      401:
+        description: Unauthorized
+      403:
+        description: Not an admin
+    """
+    data = request.get_json()
+    changes = {field: data[field] for field in ['is_active', 'is_admin'] if field in data}
+    if not changes:
+        return jsonify({'message': 'Nothing to update: set is_active and/or is_admin'}), 400
+    
+    statement = db.update(User)
+    if 'ids' in data:
+        statement = statement.where(User.id.in_(data['ids']))
+    elif 'filter' in data:
+        statement = apply_user_filters(statement, parse_user_filters(data['filter']))
+    else:
+        return jsonify({'message': 'Either ids or a non-empty filter is required'}), 400
+    
+    # Admins cannot lock themselves out
+    revoking = changes.get('is_active') is False or changes.get('is_admin') is False
+    if revoking:
+        statement = statement.where(User.id != current_user.id)
+    
+    updated_ids = [
+        user_id for (user_id,) in db.session.execute(
+            statement.values(**changes).returning(User.id).execution_options(synchronize_session=False)
+        )
+    ]
+    # Tokens already issued would keep their old access until expiry on workers with a cached principal
+    if revoking:
+        token_blocklist.revoke_users(updated_ids, commit=False)
+    db.session.commit()
+    
+    invalidate_principals(updated_ids)
+    invalidate_admin_stats()
+    
+    return jsonify({'message': 'Users updated successfully', 'updated': len(updated_ids)}), 200
+
+@admin_bp.route('/users/search', methods=['GET'])
+@jwt_required()
+@admin_required
+@read_only
+def search_users_endpoint():
+    """
+    Search users by email, first name or last name (Admin only)
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Search text, matched as a prefix, or as a substring when at least 3 characters long
+      - name: page
+        in: query
+        type: integer
+        required: false
+        description: Page number (default 1)
+      - name: per_page
+        in: query
+        type: integer
+        required: false
+        description: Results per page (default 20, max 100)
+    responses:
+      200:
+        description: Ranked matching users
+        schema:
+          type: object
+          properties:
+            items:
+              type: array
+              items:
+                type: object
+            page:
+              type: integer
+            per_page:
+              type: integer
+            has_more:
+              type: boolean
+      400:
+        description: Invalid request
       401:
         description: Unauthorized
       403:
         description: Not an admin
     """
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    term = request.args.get('q', '').strip()
+    if not term:
+        return jsonify({'message': 'Search text q is required'}), 400
+    
+    try:
+        page = parse_int(request.args, 'page', 1, minimum=1)
+        per_page = min(parse_int(request.args, 'per_page', 20, minimum=1), 100)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    if not current_user or not current_user.is_admin:
-        return jsonify({'message': 'Admin privileges required'}), 403
+    users, has_more = search_users(term, page, per_page)
     
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    return jsonify({
+        'items': users,
+        'page': page,
+        'per_page': per_page,
+        'has_more': has_more
+    }), 200
 
 @admin_bp.route('/users/<int:user_id>', methods=['GET'])
 @jwt_required()
+@admin_required
+@read_only
 def get_user(user_id):
     """
     Get a specific user (Admin only)
@@ -151,6 +520,8 @@ def get_user(user_id):
         description: User details
         schema:
           type: object
+      304:
+        description: Not modified since the ETag given in If-None-Match
       401:
         description: Unauthorized
       403:
@@ -158,20 +529,21 @@ def get_user(user_id):
       404:
         description: User not found
     """
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'message': 'Admin privileges required'}), 403
-    
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({'message': 'User not found'}), 404
     
-    return jsonify(user.to_dict()), 200
+    etag = compute_etag('user', user.id, user.updated_at)
+    response = not_modified(etag, 'admin')
+    if response is not None:
+        return response
+    
+    return cache_headers(jsonify(user.to_dict()), etag, 'admin'), 200
 
 @admin_bp.route('/users/<int:user_id>', methods=['PUT'])
 @jwt_required()
+@admin_required
+@validate_json
 def update_user(user_id):
     """
     Update a user (Admin only)
@@ -221,19 +593,11 @@ def update_user(user_id):
       409:
         description: Email already in use
     """
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'message': 'Admin privileges required'}), 403
-    
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({'message': 'User not found'}), 404
     
     data = request.get_json()
-    if not data:
-        return jsonify({'message': 'No data provided'}), 400
     
     # Check if email is being changed and if it's already in use
     if data.get('email') and data['email'] != user.email:
@@ -249,13 +613,21 @@ def update_user(user_id):
     if 'last_name' in data:
         user.last_name = data['last_name']
     
+    # Tokens already issued stay valid until expiry unless revoked, and revoking them also drops the
+    # user's cached principal on every worker
+    revoke = False
     if 'is_admin' in data:
+        revoke = user.is_admin and not data['is_admin']
         user.is_admin = data['is_admin']
     
     if 'is_active' in data:
         user.is_active = data['is_active']
+        revoke = revoke or not user.is_active
     
+    if revoke:
+        token_blocklist.revoke_user(user.id, commit=False)
     db.session.commit()
+    invalidate_principal(user.id)
     
     return jsonify({
         'message': 'User updated successfully',
@@ -264,6 +636,7 @@ def update_user(user_id):
 
 @admin_bp.route('/users/<int:user_id>', methods=['DELETE'])
 @jwt_required()
+@admin_required
 def delete_user(user_id):
     """
     Delete a user (Admin only)
@@ -288,27 +661,24 @@ def delete_user(user_id):
       404:
         description: User not found
     """
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'message': 'Admin privileges required'}), 403
-    
     # Prevent self-deletion
-    if int(user_id) == current_user_id:
+    if int(user_id) == current_user.id:
         return jsonify({'message': 'Cannot delete your own account'}), 400
     
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({'message': 'User not found'}), 404
     
     db.session.delete(user)
+    token_blocklist.revoke_user(user_id, commit=False)
     db.session.commit()
+    invalidate_principal(user_id)
     
     return jsonify({'message': 'User deleted successfully'}), 200
 
 @admin_bp.route('/users/<int:user_id>/resend-invitation', methods=['POST'])
 @jwt_required()
+@admin_required
 def resend_invitation(user_id):
     """
     Resend invitation to a user (Admin only)
@@ -335,13 +705,7 @@ def resend_invitation(user_id):
       400:
         description: User already active
     """
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'message': 'Admin privileges required'}), 403
-    
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({'message': 'User not found'}), 404
     
@@ -353,9 +717,104 @@ def resend_invitation(user_id):
     user.invitation_token = invitation_token
     user.invitation_sent_at = datetime.utcnow()
     
+    # Queue the invitation email in the same transaction as the new token
+    enqueue_email(user.email, 'invitation', {'invitation_token': invitation_token})
     db.session.commit()
-    
-    # Send invitation email
-    send_invitation_email(user.email, invitation_token)
+    outbox_sender.wake()
     
     return jsonify({'message': 'Invitation resent successfully'}), 200
+
+@admin_bp.route('/stats', methods=['GET'])
+@jwt_required()
+@admin_required
+@read_only
+def get_stats():
+    """
+    Get dashboard statistics (Admin only)
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    parameters:
+      - name: days
+        in: query
+        type: integer
+        required: false
+        description: Number of days in the per-day series (default 30, max 90)
+    responses:
+      200:
+        description: User counts, invitations sent and accepted per day, and prediction volumes. Cached for a short time.
+        schema:
+          type: object
+      401:
+        description: Unauthorized
+      403:
+        description: Not an admin
+    """
+    days = max(1, min(request.args.get('days', 30, type=int), 90))
+    
+    return jsonify(get_admin_stats(days)), 200
+
+@admin_bp.route('/shadow-report', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_shadow_report():
+    """
+    Get the shadow scoring comparison report (Admin only)
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    parameters:
+      - name: flush
+        in: query
+        type: boolean
+        required: false
+        description: Close the current aggregation window before reporting
+    responses:
+      200:
+        description: Latency percentiles and output deltas of the shadow model versus the active model, for the worker that served the request
+        schema:
+          type: object
+      401:
+        description: Unauthorized
+      403:
+        description: Not an admin
+    """
+    if request.args.get('flush', '').lower() in ['true', 'yes', '1']:
+        shadow_scorer.flush()
+    
+    report = shadow_scorer.report()
+    report['active_model_version'] = current_app.config['PREDICTION_MODEL_VERSION']
+    report['shadow_model_version'] = current_app.config.get('SHADOW_MODEL_VERSION')
+    
+    return jsonify(report), 200
+
+@admin_bp.route('/db-pool', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_db_pool_status():
+    """
+    Get database connection pool metrics (Admin only)
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    responses:
+      200:
+        description: Pool size, connections in use, saturation and checkout wait times per database bind, for the worker that served the request
+        schema:
+          type: object
+      401:
+        description: Unauthorized
+      403:
+        description: Not an admin
+    """
+    binds = {}
+    for key, engine in db.engines.items():
+        binds[key or 'default'] = pool_status(engine)
+    
+    return jsonify({'pid': os.getpid(), 'binds': binds}), 200
@@ -1,14 +1,26 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt, current_user
 from app.models.user import User
 from app import db
 from app.services.email_service import send_invitation_email
+from app.services.password_service import PasswordHasherBusy
+from app.services.principal_service import invalidate_principal
+from app.services.token_blocklist import token_blocklist
+from app.utils.db_routing import read_only
+from app.utils.http_cache import compute_etag, not_modified, cache_headers
+from app.utils.rate_limit import rate_limit
 import uuid
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
 
+def _hasher_busy_response():
+    response = jsonify({'message': 'Server is busy, please retry shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login')
 def login():
     """
     User login endpoint
@@ -47,6 +59,10 @@ def login():
               type: object
       401:
         description: Invalid credentials
+      429:
+        description: Too many login attempts, retry after the Retry-After delay
+      503:
+        description: Too many concurrent logins, retry after the Retry-After delay
     """
     data = request.get_json()
     
@@ -55,11 +71,18 @@ def login():
     
     user = User.query.filter_by(email=data['email']).first()
     
-    if not user or not user.check_password(data['password']):
-        return jsonify({'message': 'Invalid credentials'}), 401
-    
-    if not user.is_active:
-        return jsonify({'message': 'Account is not active. Please complete the invitation process.'}), 401
+    try:
+        if not user or not user.check_password_and_rehash(data['password']):
+            return jsonify({'message': 'Invalid credentials'}), 401
+        
+        if not user.is_active:
+            return jsonify({'message': 'Account is not active. Please complete the invitation process.'}), 401
+        
+        # Save the hash upgraded from older hash parameters, if any
+        if db.session.is_modified(user):
+            db.session.commit()
+    except PasswordHasherBusy:
+        return _hasher_busy_response()
     
     access_token = create_access_token(identity=user.id)
     refresh_token = create_refresh_token(identity=user.id)
@@ -96,6 +119,28 @@ def refresh():
     
     return jsonify({'access_token': access_token}), 200
 
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Revoke the token used to call this endpoint
+    ---
+    tags:
+      - Authentication
+    security:
+      - JWT: []
+    description: Call once with the access token and once with the refresh token to revoke both.
+    responses:
+      200:
+        description: Token revoked
+      401:
+        description: Invalid token
+    """
+    jwt_payload = get_jwt()
+    token_blocklist.revoke_token(jwt_payload)
+    
+    return jsonify({'message': f"{jwt_payload['type'].capitalize()} token revoked"}), 200
+
 @auth_bp.route('/accept-invitation', methods=['POST'])
 def accept_invitation():
     """
@@ -139,17 +184,24 @@ def accept_invitation():
     if not user:
         return jsonify({'message': 'Invalid invitation token'}), 404
     
-    user.set_password(data['password'])
+    try:
+        user.set_password(data['password'])
+    except PasswordHasherBusy:
+        return _hasher_busy_response()
+    
     user.is_active = True
     user.invitation_accepted_at = datetime.utcnow()
     user.invitation_token = None
     
     db.session.commit()
+    # Nothing else to revoke: invited users cannot log in before accepting, so no worker has them cached
+    invalidate_principal(user.id)
     
     return jsonify({'message': 'Invitation accepted successfully'}), 200
 
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
+@read_only
 def get_current_user():
     """
     Get current user information
@@ -163,13 +215,15 @@ def get_current_user():
         description: User information
         schema:
           type: object
+      304:
+        description: Not modified since the ETag given in If-None-Match
       401:
         description: Invalid token
     """
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user:
-        return jsonify({'message': 'User not found'}), 404
+    # The cached principal carries updated_at, so revalidation needs no query
+    etag = compute_etag('profile', current_user.id, current_user.updated_at)
+    response = not_modified(etag, 'profile')
+    if response is not None:
+        return response
     
-    return jsonify(user.to_dict()), 200
+    return cache_headers(jsonify(current_user.to_dict()), etag, 'profile'), 200
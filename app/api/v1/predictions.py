@@ -1,16 +1,24 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 from app.models.property import Property
 from app.models.prediction import Prediction
 from app.models.area import Area
-from app.models.user import User
 from app import db
+from app.services.prediction_service import run_prediction
+from app.utils.db_routing import read_only, use_primary
+from app.utils.http_cache import compute_etag, not_modified, cache_headers
+from app.utils.idempotency import idempotent
+from app.utils.rate_limit import rate_limit
+from app.utils.validation import validate_json
 import datetime
 
 predictions_bp = Blueprint('predictions', __name__)
 
 @predictions_bp.route('/price', methods=['POST'])
 @jwt_required()
+@rate_limit('predictions')
+@validate_json
+@idempotent
 def predict_price():
     """
     Predict property price
@@ -20,6 +28,11 @@ def predict_price():
     security:
       - JWT: []
     parameters:
+      - name: Idempotency-Key
+        in: header
+        type: string
+        required: false
+        description: Unique key for this request; retries with the same key get the first response back
       - name: body
         in: body
         required: true
@@ -64,58 +77,25 @@ def predict_price():
         description: Invalid request
       401:
         description: Unauthorized
+      409:
+        description: A request with the same Idempotency-Key is still being processed
+      422:
+        description: Idempotency-Key was already used for a different request
+      429:
+        description: Rate limit exceeded, retry after the Retry-After delay
     """
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or not user.is_active:
+    if not current_user.is_active:
         return jsonify({'message': 'Unauthorized'}), 401
     
     data = request.get_json()
     
-    if not data:
-        return jsonify({'message': 'No data provided'}), 400
-    
-    required_fields = ['location', 'size_sqft', 'num_bedrooms', 'num_bathrooms', 'property_type']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'message': f'Missing required field: {field}'}), 400
-    
-    # Simple dummy prediction for demonstration
-    # In a real implementation, this would use a trained ML model
-    base_price = 200000
-    location_factor = 1.0
-    
-    if 'London' in data['location']:
-        location_factor = 2.5
-    elif 'New York' in data['location']:
-        location_factor = 3.0
-    elif 'Paris' in data['location']:
-        location_factor = 2.2
-    elif 'Dubai' in data['location']:
-        location_factor = 1.8
-    
-    property_type_factor = 1.0
-    if data['property_type'] == 'Detached House':
-        property_type_factor = 1.5
-    elif data['property_type'] == 'Semi-detached House':
-        property_type_factor = 1.3
-    elif data['property_type'] == 'Townhouse':
-        property_type_factor = 1.2
-    elif data['property_type'] == 'Villa':
-        property_type_factor = 1.8
-    
-    predicted_price = (
-        base_price +
-        (data['size_sqft'] * 200) +
-        (data['num_bedrooms'] * 25000) +
-        (data['num_bathrooms'] * 15000)
-    ) * location_factor * property_type_factor
-    
-    return jsonify({'predicted_price': predicted_price}), 200
+    return jsonify(run_prediction('price', data)), 200
 
 @predictions_bp.route('/rent', methods=['POST'])
 @jwt_required()
+@rate_limit('predictions')
+@validate_json
+@idempotent
 def predict_rent():
     """
     Predict property rental yield
@@ -125,6 +105,11 @@ def predict_rent():
     security:
       - JWT: []
     parameters:
+      - name: Idempotency-Key
+        in: header
+        type: string
+        required: false
+        description: Unique key for this request; retries with the same key get the first response back
       - name: body
         in: body
         required: true
@@ -173,69 +158,25 @@ def predict_rent():
         description: Invalid request
       401:
         description: Unauthorized
+      409:
+        description: A request with the same Idempotency-Key is still being processed
+      422:
+        description: Idempotency-Key was already used for a different request
+      429:
+        description: Rate limit exceeded, retry after the Retry-After delay
     """
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or not user.is_active:
+    if not current_user.is_active:
         return jsonify({'message': 'Unauthorized'}), 401
     
     data = request.get_json()
     
-    if not data:
-        return jsonify({'message': 'No data provided'}), 400
-    
-    required_fields = ['location', 'size_sqft', 'num_bedrooms', 'num_bathrooms', 'property_type']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'message': f'Missing required field: {field}'}), 400
-    
-    # Get predicted price first
-    price_response = predict_price()
-    predicted_price = price_response[0].json['predicted_price']
-    
-    # Simple dummy rent prediction for demonstration
-    # In a real implementation, this would use a trained ML model
-    base_rent = 1000
-    location_factor = 1.0
-    
-    if 'London' in data['location']:
-        location_factor = 1.8
-    elif 'New York' in data['location']:
-        location_factor = 2.2
-    elif 'Paris' in data['location']:
-        location_factor = 1.6
-    elif 'Dubai' in data['location']:
-        location_factor = 1.4
-    
-    property_type_factor = 1.0
-    if data['property_type'] == 'Detached House':
-        property_type_factor = 1.3
-    elif data['property_type'] == 'Semi-detached House':
-        property_type_factor = 1.2
-    elif data['property_type'] == 'Townhouse':
-        property_type_factor = 1.1
-    elif data['property_type'] == 'Villa':
-        property_type_factor = 1.5
-    
-    predicted_monthly_rent = (
-        base_rent +
-        (data['size_sqft'] * 0.5) +
-        (data['num_bedrooms'] * 300) +
-        (data['num_bathrooms'] * 150)
-    ) * location_factor * property_type_factor
-    
-    predicted_annual_rent = predicted_monthly_rent * 12
-    predicted_rental_yield = (predicted_annual_rent / predicted_price) * 100
-    
-    return jsonify({
-        'predicted_monthly_rent': predicted_monthly_rent,
-        'predicted_annual_rent': predicted_annual_rent,
-        'predicted_rental_yield': predicted_rental_yield
-    }), 200
+    return jsonify(run_prediction('rent', data)), 200
 
 @predictions_bp.route('/capital-growth', methods=['POST'])
 @jwt_required()
+@rate_limit('predictions')
+@validate_json
+@idempotent
 def predict_capital_growth():
     """
     Predict property capital growth
@@ -245,6 +186,11 @@ def predict_capital_growth():
     security:
       - JWT: []
     parameters:
+      - name: Idempotency-Key
+        in: header
+        type: string
+        required: false
+        description: Unique key for this request; retries with the same key get the first response back
       - name: body
         in: body
         required: true
@@ -278,57 +224,24 @@ def predict_capital_growth():
         description: Invalid request
       401:
         description: Unauthorized
+      409:
+        description: A request with the same Idempotency-Key is still being processed
+      422:
+        description: Idempotency-Key was already used for a different request
+      429:
+        description: Rate limit exceeded, retry after the Retry-After delay
     """
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or not user.is_active:
+    if not current_user.is_active:
         return jsonify({'message': 'Unauthorized'}), 401
     
     data = request.get_json()
     
-    if not data:
-        return jsonify({'message': 'No data provided'}), 400
-    
-    required_fields = ['location', 'property_type']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'message': f'Missing required field: {field}'}), 400
-    
-    # Simple dummy capital growth prediction for demonstration
-    # In a real implementation, this would use a trained ML model
-    base_growth_1y = 3.0
-    base_growth_3y = 9.5
-    base_growth_5y = 16.0
-    
-    location_factor = 1.0
-    if 'London' in data['location']:
-        location_factor = 1.2
-    elif 'New York' in data['location']:
-        location_factor = 1.3
-    elif 'Paris' in data['location']:
-        location_factor = 1.1
-    elif 'Dubai' in data['location']:
-        location_factor = 1.4
-    
-    property_type_factor = 1.0
-    if data['property_type'] == 'Detached House':
-        property_type_factor = 1.1
-    elif data['property_type'] == 'Land Plot':
-        property_type_factor = 1.2
-    
-    predicted_capital_growth_1y = base_growth_1y * location_factor * property_type_factor
-    predicted_capital_growth_3y = base_growth_3y * location_factor * property_type_factor
-    predicted_capital_growth_5y = base_growth_5y * location_factor * property_type_factor
-    
-    return jsonify({
-        'predicted_capital_growth_1y': predicted_capital_growth_1y,
-        'predicted_capital_growth_3y': predicted_capital_growth_3y,
-        'predicted_capital_growth_5y': predicted_capital_growth_5y
-    }), 200
+    return jsonify(run_prediction('capital-growth', data)), 200
 
 @predictions_bp.route('/area-score', methods=['GET'])
 @jwt_required()
+@rate_limit('predictions')
+@read_only
 def get_area_score():
     """
     Get investment score for an area
@@ -366,17 +279,18 @@ def get_area_score():
               type: number
             rental_yield:
               type: number
+      304:
+        description: Not modified since the ETag given in If-None-Match
       400:
         description: Invalid request
       401:
         description: Unauthorized
+      429:
+        description: Rate limit exceeded, retry after the Retry-After delay
       404:
         description: Area not found
     """
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or not user.is_active:
+    if not current_user.is_active:
         return jsonify({'message': 'Unauthorized'}), 401
     
     area_name = request.args.get('area')
@@ -387,6 +301,10 @@ def get_area_score():
     
     # Check if area exists in database
     area = Area.query.filter_by(area_name=area_name, country=country).first()
+    if not area:
+        # The replica may lag; check the primary before creating the area
+        with use_primary():
+            area = Area.query.filter_by(area_name=area_name, country=country).first()
     
     # If area doesn't exist, create dummy data
     # In a real implementation, this would use a trained ML model
@@ -425,11 +343,16 @@ def get_area_score():
         db.session.add(area)
         db.session.commit()
     
-    return jsonify({
+    etag = compute_etag('area', area.id, area.updated_at)
+    response = not_modified(etag, 'area_score')
+    if response is not None:
+        return response
+    
+    return cache_headers(jsonify({
         'area_name': area.area_name,
         'country': area.country,
         'investment_score': area.investment_score,
         'avg_price': area.avg_price,
         'avg_rent': area.avg_rent,
         'rental_yield': area.rental_yield
-    }), 200
+    }), etag, 'area_score'), 200
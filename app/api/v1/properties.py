@@ -0,0 +1,64 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required, current_user
+from app.services.property_export_service import FORMATS, MIMETYPES, parse_export_filters, stream_export
+from app.utils.db_routing import read_only
+from app.utils.rate_limit import rate_limit
+
+properties_bp = Blueprint('properties', __name__)
+
+@properties_bp.route('/export', methods=['GET'])
+@jwt_required()
+@rate_limit('exports')
+@read_only
+def export_properties():
+    """
+    Export properties with their latest prediction as CSV or NDJSON
+    ---
+    tags:
+      - Properties
+    security:
+      - JWT: []
+    produces:
+      - text/csv
+      - application/x-ndjson
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson]
+        required: false
+        description: Output format (default csv)
+      - name: city
+        in: query
+        type: string
+        required: false
+      - name: country
+        in: query
+        type: string
+        required: false
+      - name: property_type
+        in: query
+        type: string
+        required: false
+    responses:
+      200:
+        description: Every matching property, one row or line each, streamed and gzip compressed when the client accepts it
+      400:
+        description: Invalid format
+      401:
+        description: Unauthorized
+      429:
+        description: Rate limit exceeded, retry after the Retry-After delay
+    """
+    if not current_user.is_active:
+        return jsonify({'message': 'Unauthorized'}), 401
+    
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in FORMATS:
+        return jsonify({'message': f"Invalid format, expected one of: {', '.join(FORMATS)}"}), 400
+    
+    filters = parse_export_filters(request.args)
+    # @read_only keeps the body's query on the replica until the stream is closed
+    response = Response(stream_with_context(stream_export(filters, fmt)), mimetype=MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=properties.{fmt}'
+    return response
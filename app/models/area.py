@@ -1,8 +1,12 @@
 from datetime import datetime
 from app import db
+from app.utils.serializers import ModelSerializer
 
 class Area(db.Model):
     __tablename__ = 'areas'
+    __table_args__ = (
+        db.Index('ix_areas_area_name_country', 'area_name', 'country'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     area_name = db.Column(db.String(255), nullable=False)
@@ -15,14 +19,16 @@ class Area(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'area_name': self.area_name,
-            'country': self.country,
-            'avg_price': self.avg_price,
-            'avg_rent': self.avg_rent,
-            'rental_yield': self.rental_yield,
-            'investment_score': self.investment_score,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return area_serializer.to_dict(self)
+
+area_serializer = ModelSerializer(Area, [
+    'id',
+    'area_name',
+    'country',
+    'avg_price',
+    'avg_rent',
+    'rental_yield',
+    'investment_score',
+    'created_at',
+    'updated_at'
+])
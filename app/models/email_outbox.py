@@ -0,0 +1,42 @@
+from datetime import datetime
+from app import db
+from app.utils.serializers import ModelSerializer
+
+class EmailOutbox(db.Model):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+    
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(255), nullable=False)
+    template = db.Column(db.String(50), nullable=False)
+    context = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return email_outbox_serializer.to_dict(self)
+
+email_outbox_serializer = ModelSerializer(EmailOutbox, [
+    'id',
+    'recipient',
+    'template',
+    'status',
+    'attempts',
+    'next_attempt_at',
+    'last_error',
+    'sent_at',
+    'created_at',
+    'updated_at'
+])
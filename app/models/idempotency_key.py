@@ -0,0 +1,12 @@
+from datetime import datetime
+from app import db
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # '<user id>:<method>:<path>:<Idempotency-Key header>'
+    key = db.Column(db.String(512), unique=True, nullable=False)
+    record = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
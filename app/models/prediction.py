@@ -1,8 +1,13 @@
 from datetime import datetime
 from app import db
+from app.utils.serializers import ModelSerializer
 
 class Prediction(db.Model):
     __tablename__ = 'predictions'
+    __table_args__ = (
+        db.Index('ix_predictions_property_id_created_at', 'property_id', 'created_at'),
+        db.Index('ix_predictions_model_version', 'model_version'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
@@ -17,16 +22,18 @@ class Prediction(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'property_id': self.property_id,
-            'predicted_sale_price': self.predicted_sale_price,
-            'predicted_rental_yield': self.predicted_rental_yield,
-            'predicted_capital_growth_1y': self.predicted_capital_growth_1y,
-            'predicted_capital_growth_3y': self.predicted_capital_growth_3y,
-            'predicted_capital_growth_5y': self.predicted_capital_growth_5y,
-            'investment_score': self.investment_score,
-            'model_version': self.model_version,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return prediction_serializer.to_dict(self)
+
+prediction_serializer = ModelSerializer(Prediction, [
+    'id',
+    'property_id',
+    'predicted_sale_price',
+    'predicted_rental_yield',
+    'predicted_capital_growth_1y',
+    'predicted_capital_growth_3y',
+    'predicted_capital_growth_5y',
+    'investment_score',
+    'model_version',
+    'created_at',
+    'updated_at'
+])
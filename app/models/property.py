@@ -1,8 +1,14 @@
 from datetime import datetime
 from app import db
+from app.utils.serializers import ModelSerializer
 
 class Property(db.Model):
     __tablename__ = 'properties'
+    __table_args__ = (
+        db.Index('ix_properties_city_country_property_type', 'city', 'country', 'property_type'),
+        # Natural key of a listing, used by the bulk import to upsert
+        db.UniqueConstraint('country', 'postcode', 'address', name='uq_properties_country_postcode_address'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     address = db.Column(db.Text, nullable=False)
@@ -23,19 +29,21 @@ class Property(db.Model):
     predictions = db.relationship('Prediction', backref='property', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'address': self.address,
-            'city': self.city,
-            'country': self.country,
-            'postcode': self.postcode,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'size_sqft': self.size_sqft,
-            'num_bedrooms': self.num_bedrooms,
-            'num_bathrooms': self.num_bathrooms,
-            'listing_price': self.listing_price,
-            'property_type': self.property_type,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return property_serializer.to_dict(self)
+
+property_serializer = ModelSerializer(Property, [
+    'id',
+    'address',
+    'city',
+    'country',
+    'postcode',
+    'latitude',
+    'longitude',
+    'size_sqft',
+    'num_bedrooms',
+    'num_bathrooms',
+    'listing_price',
+    'property_type',
+    'created_at',
+    'updated_at'
+])
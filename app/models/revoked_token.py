@@ -0,0 +1,26 @@
+from datetime import datetime
+from app import db
+from app.utils.serializers import ModelSerializer
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # Either a token jti, or 'user:<id>' to revoke every token of a user issued before revoked_at
+    jti = db.Column(db.String(64), unique=True, nullable=False)
+    token_type = db.Column(db.String(16), nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def to_dict(self):
+        return revoked_token_serializer.to_dict(self)
+
+revoked_token_serializer = ModelSerializer(RevokedToken, [
+    'id',
+    'jti',
+    'token_type',
+    'user_id',
+    'revoked_at',
+    'expires_at'
+])
@@ -1,6 +1,10 @@
 from datetime import datetime
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.serializers import ModelSerializer
+from app.services.password_service import password_hasher
+
+# Stored for invited users until they set a password; never matches any password
+UNUSABLE_PASSWORD = '!'
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -18,26 +22,66 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Admin user search: btree indexes on lower() serve prefix matches, and on
+    # Postgres trigram indexes on the same expressions serve substring matches
+    __table_args__ = (
+        db.Index('ix_users_email_lower', db.func.lower(email).label('email_lower'),
+                 postgresql_ops={'email_lower': 'text_pattern_ops'}),
+        db.Index('ix_users_first_name_lower', db.func.lower(first_name).label('first_name_lower'),
+                 postgresql_ops={'first_name_lower': 'text_pattern_ops'}),
+        db.Index('ix_users_last_name_lower', db.func.lower(last_name).label('last_name_lower'),
+                 postgresql_ops={'last_name_lower': 'text_pattern_ops'}),
+        db.Index('ix_users_email_trgm', db.func.lower(email).label('email_lower'),
+                 postgresql_using='gin', postgresql_ops={'email_lower': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_users_first_name_trgm', db.func.lower(first_name).label('first_name_lower'),
+                 postgresql_using='gin', postgresql_ops={'first_name_lower': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_users_last_name_trgm', db.func.lower(last_name).label('last_name_lower'),
+                 postgresql_using='gin', postgresql_ops={'last_name_lower': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+    
     def __init__(self, email, password=None, is_admin=False):
         self.email = email
         if password:
             self.set_password(password)
+        else:
+            self.password_hash = UNUSABLE_PASSWORD
         self.is_admin = is_admin
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
+    
+    def check_password_and_rehash(self, password):
+        # Upgrades a hash made with older parameters in the same pool call as the check
+        matches, new_hash = password_hasher.verify_and_update(self.password_hash, password)
+        if new_hash:
+            self.password_hash = new_hash
+        return matches
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'email': self.email,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'is_admin': self.is_admin,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return user_serializer.to_dict(self)
+
+
+user_serializer = ModelSerializer(User, [
+    'id',
+    'email',
+    'first_name',
+    'last_name',
+    'is_admin',
+    'is_active',
+    'created_at',
+    'updated_at'
+])
+
+
+# The trigram indexes need the pg_trgm extension
+db.event.listen(
+    User.__table__,
+    'before_create',
+    db.DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
@@ -1,37 +1,312 @@
-from flask import Flask
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from jinja2 import Environment
 from flask_mail import Message
-from app import mail
+from app import db, mail
+from app.models.email_outbox import EmailOutbox
 
-def send_invitation_email(recipient_email, invitation_token):
-    """
-    Send invitation email to a new user
-    
-    Args:
-        recipient_email (str): Email address of the recipient
-        invitation_token (str): Invitation token for account activation
-    
-    Returns:
-        bool: True if email was sent successfully, False otherwise
-    """
-    try:
-        invitation_link = f"http://localhost:5000/accept-invitation?token={invitation_token}"
-        
-        msg = Message(
-            subject="Welcome to Realtex AI - Invitation to Join",
-            recipients=[recipient_email],
-            html=f"""
+# Templates are compiled once at import instead of being formatted per message
+_template_env = Environment(autoescape=True)
+
+EMAIL_TEMPLATES = {
+    'invitation': {
+        'subject': _template_env.from_string("Welcome to Realtex AI - Invitation to Join"),
+        'html': _template_env.from_string("""
             <h2>Welcome to Realtex AI</h2>
             <p>You have been invited to join the Realtex AI platform.</p>
             <p>Please click the link below to set your password and activate your account:</p>
-            <p><a href="{invitation_link}">Accept Invitation</a></p>
+            <p><a href="http://localhost:5000/accept-invitation?token={{ invitation_token }}">Accept Invitation</a></p>
             <p>This link will expire in 7 days.</p>
             <p>If you did not request this invitation, please ignore this email.</p>
             <p>Thank you,<br>The Realtex AI Team</p>
-            """
-        )
-        
-        mail.send(msg)
+            """)
+    }
+}
+
+def render_email(recipient, template, context):
+    """
+    Build a message from one of the precompiled templates
+
+    Args:
+        recipient (str): Email address of the recipient
+        template (str): Template name in EMAIL_TEMPLATES
+        context (dict): Template variables
+
+    Returns:
+        Message: Flask-Mail message ready to send
+    """
+    templates = EMAIL_TEMPLATES[template]
+    return Message(
+        subject=templates['subject'].render(**context),
+        recipients=[recipient],
+        html=templates['html'].render(**context)
+    )
+
+def enqueue_email(recipient, template, context):
+    """
+    Add an email to the outbox; it is sent once the current transaction commits
+
+    Args:
+        recipient (str): Email address of the recipient
+        template (str): Template name in EMAIL_TEMPLATES
+        context (dict): Template variables
+
+    Returns:
+        EmailOutbox: The pending outbox entry
+    """
+    entry = EmailOutbox(recipient=recipient, template=template, context=context)
+    db.session.add(entry)
+    return entry
+
+def enqueue_invitation_emails(invitations):
+    """
+    Add invitation emails to the outbox with a single multi-row insert
+
+    Args:
+        invitations (list): (recipient_email, invitation_token) pairs
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            'recipient': recipient_email,
+            'template': 'invitation',
+            'context': {'invitation_token': invitation_token},
+            'status': EmailOutbox.STATUS_PENDING,
+            'attempts': 0,
+            'next_attempt_at': now,
+            'created_at': now,
+            'updated_at': now
+        }
+        for recipient_email, invitation_token in invitations
+    ]
+    if rows:
+        db.session.execute(db.insert(EmailOutbox), rows)
+
+def send_invitation_email(recipient_email, invitation_token):
+    """
+    Queue an invitation email to a new user
+
+    Args:
+        recipient_email (str): Email address of the recipient
+        invitation_token (str): Invitation token for account activation
+
+    Returns:
+        bool: True once the email is committed to the outbox
+    """
+    enqueue_email(recipient_email, 'invitation', {'invitation_token': invitation_token})
+    db.session.commit()
+    outbox_sender.wake()
+    return True
+
+
+def _is_connection_error(error):
+    # SMTP errors are OSErrors too, but most of them reject a single message
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
         return True
-    except Exception as e:
-        print(f"Error sending invitation email: {str(e)}")
-        return False
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class CircuitBreaker:
+    """
+    Stops connection attempts to a failing mail server for a cooldown period
+
+    After `threshold` consecutive failures the breaker opens; once the
+    cooldown has passed, the next attempt is let through and closes the
+    breaker again if it succeeds.
+    """
+
+    def __init__(self, threshold=3, cooldown=60):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0
+
+    @property
+    def is_open(self):
+        return time.monotonic() < self.open_until
+
+    def record_success(self):
+        self.failures = 0
+        self.open_until = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.open_until = time.monotonic() + self.cooldown
+
+
+class OutboxSender:
+    """
+    Delivers queued outbox emails in batches over a reused SMTP connection
+
+    Each worker runs one background sender thread, woken when mail is queued
+    and otherwise polling every OUTBOX_POLL_INTERVAL seconds. The thread is
+    started when a gunicorn worker boots (see gunicorn.conf.py) or on the
+    first request a process serves, so emails left pending or waiting for a
+    retry by the previous deploy are picked up without new mail being
+    queued. Rows are claimed with SKIP LOCKED on databases that support it,
+    so several workers can share the outbox. Failed messages are retried
+    with exponential backoff up to OUTBOX_MAX_ATTEMPTS times. Connection
+    failures count toward the circuit breaker instead of against the
+    messages, which are retried after OUTBOX_RETRY_BACKOFF seconds.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.batch_size = 50
+        self.poll_interval = 5
+        self.max_attempts = 5
+        self.retry_backoff = 30
+        self.stale_after = 600
+        self.breaker = CircuitBreaker()
+        self._app = None
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('OUTBOX_SENDER_ENABLED', True)
+        self.batch_size = app.config.get('OUTBOX_BATCH_SIZE', 50)
+        self.poll_interval = app.config.get('OUTBOX_POLL_INTERVAL', 5)
+        self.max_attempts = app.config.get('OUTBOX_MAX_ATTEMPTS', 5)
+        self.retry_backoff = app.config.get('OUTBOX_RETRY_BACKOFF', 30)
+        self.breaker = CircuitBreaker(
+            app.config.get('OUTBOX_BREAKER_THRESHOLD', 3),
+            app.config.get('OUTBOX_BREAKER_COOLDOWN', 60)
+        )
+        self._app = app
+        app.before_request(self.start)
+
+    def _running(self):
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def start(self):
+        """Start this process's sender thread unless it is running; it checks the outbox right away"""
+        if not self.enabled or self._running():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so each worker starts its own sender
+            if not self._running():
+                self._thread = threading.Thread(target=self._run, name='outbox-sender', daemon=True)
+                self._pid = os.getpid()
+                self._wakeup.set()
+                self._thread.start()
+
+    def wake(self):
+        """Start the sender thread if needed and have it check the outbox now"""
+        if not self.enabled:
+            return
+        self.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            with self._app.app_context():
+                try:
+                    self.drain()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Error processing email outbox: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def _claim_batch(self):
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.stale_after)
+        ids = [
+            entry_id for (entry_id,) in db.session.query(EmailOutbox.id)
+            .filter(db.or_(
+                db.and_(EmailOutbox.status == EmailOutbox.STATUS_PENDING, EmailOutbox.next_attempt_at <= now),
+                # Picked up by a sender that died before finishing
+                db.and_(EmailOutbox.status == EmailOutbox.STATUS_SENDING, EmailOutbox.updated_at < stale)
+            ))
+            .order_by(EmailOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ]
+        if not ids:
+            db.session.commit()
+            return []
+
+        EmailOutbox.query.filter(EmailOutbox.id.in_(ids)).update(
+            {'status': EmailOutbox.STATUS_SENDING, 'updated_at': now},
+            synchronize_session=False
+        )
+        db.session.commit()
+        return EmailOutbox.query.filter(EmailOutbox.id.in_(ids)).order_by(EmailOutbox.id).all()
+
+    def _schedule_retry(self, entry, error):
+        entry.attempts += 1
+        entry.last_error = error
+        if entry.attempts >= self.max_attempts:
+            entry.status = EmailOutbox.STATUS_FAILED
+        else:
+            entry.status = EmailOutbox.STATUS_PENDING
+            delay = self.retry_backoff * (2 ** (entry.attempts - 1))
+            entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+    def _release(self, entry, error):
+        # The server, not the message, failed: retry later without using up an attempt
+        entry.last_error = error
+        entry.status = EmailOutbox.STATUS_PENDING
+        entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.retry_backoff)
+
+    def send_batch(self):
+        """
+        Send one batch of due outbox emails
+
+        Returns:
+            int: Number of outbox entries processed
+        """
+        if self.breaker.is_open:
+            return 0
+
+        batch = self._claim_batch()
+        if not batch:
+            return 0
+
+        try:
+            with mail.connect() as connection:
+                for entry in batch:
+                    try:
+                        connection.send(render_email(entry.recipient, entry.template, entry.context))
+                        entry.status = EmailOutbox.STATUS_SENT
+                        entry.sent_at = datetime.utcnow()
+                    except Exception as e:
+                        if _is_connection_error(e):
+                            raise
+                        self._schedule_retry(entry, str(e))
+            self.breaker.record_success()
+        except Exception as e:
+            # Could not connect (or the connection dropped): retry everything not sent yet
+            self.breaker.record_failure()
+            print(f"Error connecting to mail server: {str(e)}")
+            for entry in batch:
+                if entry.status == EmailOutbox.STATUS_SENDING:
+                    self._release(entry, str(e))
+
+        db.session.commit()
+        return len(batch)
+
+    def drain(self):
+        """
+        Send due outbox emails until none are left or the circuit breaker opens
+
+        Returns:
+            int: Number of outbox entries processed
+        """
+        processed = 0
+        while True:
+            count = self.send_batch()
+            processed += count
+            if count < self.batch_size:
+                return processed
+
+
+outbox_sender = OutboxSender()
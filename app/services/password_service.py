@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated and a request cannot be admitted in time"""
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a dedicated, bounded thread pool
+
+    Hashing is memory-hard and slow by design. Capping how many hashes run at
+    once keeps a burst of logins from taking every worker thread and CPU away
+    from the rest of the traffic. Requests beyond the pool size wait in a
+    bounded queue; if they cannot start within the queue timeout, or the
+    queue is full, PasswordHasherBusy is raised so the caller can answer 503.
+
+    The pool only adds concurrency when a worker serves several requests at
+    once (gunicorn gthread workers, the default GUNICORN_WORKLOAD=io). A sync
+    worker handles one request at a time and simply waits for the result,
+    so there the pool only caps hashing CPU per worker.
+    """
+
+    def __init__(self):
+        self.method = 'scrypt'
+        self.max_workers = 2
+        self.max_queue = 32
+        self.queue_timeout = 5.0
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._executor = None
+        self._executor_pid = None
+        self._method_prefix = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        self.max_workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 32)
+        self.queue_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 5.0)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._executor = None
+        self._method_prefix = None
+
+    def _get_executor(self):
+        # Threads do not survive a fork, so each worker builds its own pool
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='password-hasher'
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Password hashing queue is full')
+
+        enqueued_at = time.monotonic()
+
+        def task():
+            if time.monotonic() - enqueued_at > self.queue_timeout:
+                raise PasswordHasherBusy('Timed out waiting for a password hashing slot')
+            return fn(*args)
+
+        try:
+            return self._get_executor().submit(task).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """
+        Hash a password with the configured method
+
+        Args:
+            password (str): Plain text password
+
+        Returns:
+            str: Password hash
+
+        Raises:
+            PasswordHasherBusy: If the hashing pool is saturated
+        """
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        """
+        Check a password against a stored hash
+
+        Args:
+            pwhash (str): Stored password hash
+            password (str): Plain text password
+
+        Returns:
+            bool: True if the password matches
+
+        Raises:
+            PasswordHasherBusy: If the hashing pool is saturated
+        """
+        if not pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def _verify_and_update(self, pwhash, password):
+        if not check_password_hash(pwhash, password):
+            return False, None
+        if not self.needs_rehash(pwhash):
+            return True, None
+        return True, generate_password_hash(password, self.method)
+
+    def verify_and_update(self, pwhash, password):
+        """
+        Check a password and, when it matches a hash made with other parameters, rehash it
+
+        Both steps run in one pool task, so a login never queues twice.
+
+        Args:
+            pwhash (str): Stored password hash
+            password (str): Plain text password
+
+        Returns:
+            tuple: (True if the password matches, new hash or None if the stored one is current)
+
+        Raises:
+            PasswordHasherBusy: If the hashing pool is saturated
+        """
+        if not pwhash:
+            return False, None
+        return self._run(self._verify_and_update, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """
+        Check whether a stored hash was made with different hash parameters
+
+        Args:
+            pwhash (str): Stored password hash
+
+        Returns:
+            bool: True if the hash should be regenerated with the current method
+        """
+        if self._method_prefix is None:
+            # Let werkzeug expand defaults such as 'scrypt' -> 'scrypt:32768:8:1'
+            self._method_prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return not pwhash or pwhash.split('$', 1)[0] != self._method_prefix
+
+
+password_hasher = PasswordHasher()
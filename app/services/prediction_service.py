@@ -0,0 +1,204 @@
+import time
+from flask import current_app
+from app.services.shadow_service import shadow_scorer
+
+LOCATION_PRICE_FACTORS = {'London': 2.5, 'New York': 3.0, 'Paris': 2.2, 'Dubai': 1.8}
+LOCATION_RENT_FACTORS = {'London': 1.8, 'New York': 2.2, 'Paris': 1.6, 'Dubai': 1.4}
+LOCATION_GROWTH_FACTORS = {'London': 1.2, 'New York': 1.3, 'Paris': 1.1, 'Dubai': 1.4}
+
+PROPERTY_TYPE_PRICE_FACTORS = {
+    'Detached House': 1.5,
+    'Semi-detached House': 1.3,
+    'Townhouse': 1.2,
+    'Villa': 1.8
+}
+PROPERTY_TYPE_RENT_FACTORS = {
+    'Detached House': 1.3,
+    'Semi-detached House': 1.2,
+    'Townhouse': 1.1,
+    'Villa': 1.5
+}
+PROPERTY_TYPE_GROWTH_FACTORS = {'Detached House': 1.1, 'Land Plot': 1.2}
+
+
+def _location_factor(location, factors):
+    # First match wins, in the order the factors are declared
+    for name, factor in factors.items():
+        if name in location:
+            return factor
+    return 1.0
+
+
+class PredictionModel:
+    """
+    Simple heuristic prediction model
+
+    In a real implementation, this would wrap a trained ML model. Candidate
+    versions subclass this and are registered with register_model() so they
+    can be selected by config or scored in shadow.
+    """
+    version = 'heuristic-v1'
+
+    def warm_up(self):
+        """
+        Load whatever the model needs before it serves requests
+
+        Called once in the gunicorn master so workers share it. The heuristic
+        model has nothing to load.
+        """
+
+    def predict(self, kind, data):
+        """
+        Run a prediction of the given kind
+
+        Args:
+            kind (str): One of 'price', 'rent' or 'capital-growth'
+            data (dict): Validated request payload
+
+        Returns:
+            dict: Prediction output as returned by the API
+        """
+        if kind == 'price':
+            return self.predict_price(data)
+        if kind == 'rent':
+            return self.predict_rent(data)
+        if kind == 'capital-growth':
+            return self.predict_capital_growth(data)
+        raise ValueError(f'Unknown prediction kind: {kind}')
+
+    def predict_price(self, data):
+        base_price = 200000
+        location_factor = _location_factor(data['location'], LOCATION_PRICE_FACTORS)
+        property_type_factor = PROPERTY_TYPE_PRICE_FACTORS.get(data['property_type'], 1.0)
+
+        predicted_price = (
+            base_price +
+            (data['size_sqft'] * 200) +
+            (data['num_bedrooms'] * 25000) +
+            (data['num_bathrooms'] * 15000)
+        ) * location_factor * property_type_factor
+
+        return {'predicted_price': predicted_price}
+
+    def predict_rent(self, data):
+        predicted_price = self.predict_price(data)['predicted_price']
+
+        base_rent = 1000
+        location_factor = _location_factor(data['location'], LOCATION_RENT_FACTORS)
+        property_type_factor = PROPERTY_TYPE_RENT_FACTORS.get(data['property_type'], 1.0)
+
+        predicted_monthly_rent = (
+            base_rent +
+            (data['size_sqft'] * 0.5) +
+            (data['num_bedrooms'] * 300) +
+            (data['num_bathrooms'] * 150)
+        ) * location_factor * property_type_factor
+
+        predicted_annual_rent = predicted_monthly_rent * 12
+        predicted_rental_yield = (predicted_annual_rent / predicted_price) * 100
+
+        return {
+            'predicted_monthly_rent': predicted_monthly_rent,
+            'predicted_annual_rent': predicted_annual_rent,
+            'predicted_rental_yield': predicted_rental_yield
+        }
+
+    def predict_capital_growth(self, data):
+        base_growth_1y = 3.0
+        base_growth_3y = 9.5
+        base_growth_5y = 16.0
+
+        location_factor = _location_factor(data['location'], LOCATION_GROWTH_FACTORS)
+        property_type_factor = PROPERTY_TYPE_GROWTH_FACTORS.get(data['property_type'], 1.0)
+
+        return {
+            'predicted_capital_growth_1y': base_growth_1y * location_factor * property_type_factor,
+            'predicted_capital_growth_3y': base_growth_3y * location_factor * property_type_factor,
+            'predicted_capital_growth_5y': base_growth_5y * location_factor * property_type_factor
+        }
+
+
+_models = {}
+
+
+def register_model(model):
+    """
+    Register a prediction model under its version
+
+    Args:
+        model (PredictionModel): Model instance to register
+    """
+    _models[model.version] = model
+
+
+def get_model(version):
+    """
+    Look up a registered prediction model
+
+    Args:
+        version (str): Model version
+
+    Returns:
+        PredictionModel: The registered model
+
+    Raises:
+        KeyError: If no model is registered under this version
+    """
+    return _models[version]
+
+
+register_model(PredictionModel())
+
+
+def init_app(app):
+    """
+    Resolve the active and shadow model versions once at startup
+
+    An unknown PREDICTION_MODEL_VERSION stops the app from starting. An
+    unknown SHADOW_MODEL_VERSION only disables shadow scoring, since the
+    shadow must never affect the responses users get.
+
+    Args:
+        app (Flask): Flask application instance
+
+    Raises:
+        ValueError: If no model is registered under PREDICTION_MODEL_VERSION
+    """
+    version = app.config['PREDICTION_MODEL_VERSION']
+    try:
+        model = get_model(version)
+    except KeyError:
+        raise ValueError(f'Unknown PREDICTION_MODEL_VERSION {version!r}, registered: {", ".join(sorted(_models))}')
+
+    shadow_model = None
+    shadow_version = app.config.get('SHADOW_MODEL_VERSION')
+    if shadow_version and shadow_version != model.version:
+        try:
+            shadow_model = get_model(shadow_version)
+        except KeyError:
+            print(f"Error loading shadow model: unknown SHADOW_MODEL_VERSION {shadow_version!r}, shadow scoring disabled")
+
+    app.extensions['prediction_models'] = (model, shadow_model)
+
+
+def run_prediction(kind, data):
+    """
+    Score a request with the active model and, if enabled, sample it for shadow scoring
+
+    Args:
+        kind (str): One of 'price', 'rent' or 'capital-growth'
+        data (dict): Validated request payload
+
+    Returns:
+        dict: Prediction output from the active model
+    """
+    model, shadow_model = current_app.extensions['prediction_models']
+
+    started = time.perf_counter()
+    result = model.predict(kind, data)
+    latency = time.perf_counter() - started
+
+    if shadow_model is not None and shadow_scorer.should_sample():
+        shadow_scorer.submit(kind, data, model.version, result, latency, shadow_model)
+
+    return result
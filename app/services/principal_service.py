@@ -0,0 +1,103 @@
+from flask import jsonify
+from app import db, jwt
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+# Per-worker cache of authenticated principals keyed by user id
+principal_cache = TTLCache(maxsize=10000, ttl=60)
+
+
+class Principal:
+    """
+    Read-only snapshot of the authenticated user
+
+    Loaded once per TTL window instead of once per request. Endpoints that
+    need to modify the user must load the User row themselves.
+    """
+
+    __slots__ = ('id', 'email', 'is_admin', 'is_active', 'updated_at', '_data')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.email = user.email
+        self.is_admin = bool(user.is_admin)
+        self.is_active = bool(user.is_active)
+        self.updated_at = user.updated_at
+        self._data = user.to_dict()
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+def init_app(app):
+    """
+    Configure the principal cache from the application config
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    principal_cache.configure(
+        maxsize=app.config.get('PRINCIPAL_CACHE_SIZE', 10000),
+        ttl=app.config.get('PRINCIPAL_CACHE_TTL', 60)
+    )
+
+
+def load_principal(user_id):
+    """
+    Get the principal for a user id, hitting the database only on a cache miss
+
+    Args:
+        user_id (int): User ID
+
+    Returns:
+        Principal: The principal, or None if the user does not exist
+    """
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+
+    principal = Principal(user)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+def invalidate_principal(user_id):
+    """
+    Drop a cached principal after the underlying user changed
+
+    Args:
+        user_id (int): User ID
+    """
+    principal_cache.delete(int(user_id))
+
+
+def invalidate_principals(user_ids=None):
+    """
+    Drop several cached principals at once after a bulk change
+
+    Args:
+        user_ids (list): User IDs, or None to clear the whole cache
+    """
+    if user_ids is None:
+        principal_cache.clear()
+        return
+    for user_id in user_ids:
+        principal_cache.delete(int(user_id))
+
+
+@jwt.user_lookup_loader
+def _user_lookup_callback(jwt_header, jwt_data):
+    try:
+        user_id = int(jwt_data['sub'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return load_principal(user_id)
+
+
+@jwt.user_lookup_error_loader
+def _user_lookup_error_callback(jwt_header, jwt_data):
+    return jsonify({'message': 'Unauthorized'}), 401
@@ -0,0 +1,124 @@
+import csv
+import io
+from datetime import date, datetime
+from app import db
+from app.models.prediction import Prediction
+from app.models.property import Property
+from app.utils.serializers import dumps
+
+EXPORT_BATCH_SIZE = 2000
+FORMATS = ['csv', 'ndjson']
+MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+FILTERS = ['city', 'country', 'property_type']
+
+PROPERTY_FIELDS = [
+    'id', 'address', 'city', 'country', 'postcode', 'latitude', 'longitude', 'size_sqft', 'num_bedrooms',
+    'num_bathrooms', 'listing_price', 'property_type', 'created_at', 'updated_at'
+]
+# Output name -> Prediction column, prefixed where the property has a column of the same name
+PREDICTION_FIELDS = {
+    'prediction_id': 'id',
+    'predicted_sale_price': 'predicted_sale_price',
+    'predicted_rental_yield': 'predicted_rental_yield',
+    'predicted_capital_growth_1y': 'predicted_capital_growth_1y',
+    'predicted_capital_growth_3y': 'predicted_capital_growth_3y',
+    'predicted_capital_growth_5y': 'predicted_capital_growth_5y',
+    'prediction_investment_score': 'investment_score',
+    'prediction_model_version': 'model_version',
+    'predicted_at': 'created_at'
+}
+EXPORT_FIELDS = PROPERTY_FIELDS + list(PREDICTION_FIELDS)
+
+
+def parse_export_filters(args):
+    """
+    Read export filters from query string style arguments
+
+    Args:
+        args (dict): Mapping such as request.args
+
+    Returns:
+        dict: Non-empty city, country and property_type filters
+    """
+    return {name: args[name].strip() for name in FILTERS if args.get(name, '').strip()}
+
+
+def build_export_query(filters):
+    """
+    Select every matching property with its most recent prediction
+
+    The latest prediction per property is picked with row_number() over
+    the predictions of each property, so the export is one query instead of
+    one per property. Properties without predictions have empty prediction
+    columns.
+
+    Args:
+        filters (dict): Filters returned by parse_export_filters()
+
+    Returns:
+        Select: Statement whose columns follow EXPORT_FIELDS
+    """
+    rank = db.func.row_number().over(
+        partition_by=Prediction.property_id,
+        order_by=(Prediction.created_at.desc(), Prediction.id.desc())
+    ).label('rank')
+    ranked = db.select(Prediction, rank).subquery()
+    latest = db.select(ranked).where(ranked.c.rank == 1).subquery()
+
+    columns = [getattr(Property, name) for name in PROPERTY_FIELDS]
+    columns += [latest.c[column].label(name) for name, column in PREDICTION_FIELDS.items()]
+    query = (
+        db.select(*columns)
+        .outerjoin(latest, latest.c.property_id == Property.id)
+        .order_by(Property.id)
+    )
+    for name, value in filters.items():
+        query = query.where(getattr(Property, name) == value)
+    return query
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def _encode_ndjson(rows):
+    return b''.join(dumps(dict(zip(EXPORT_FIELDS, row))) + b'\n' for row in rows)
+
+
+def stream_export(filters, fmt='csv', batch_size=EXPORT_BATCH_SIZE):
+    """
+    Stream matching properties and their latest predictions as CSV or NDJSON
+
+    Rows are fetched batch_size at a time through a server-side cursor
+    (yield_per), so memory stays flat however many properties match.
+
+    Args:
+        filters (dict): Filters returned by parse_export_filters()
+        fmt (str): 'csv' (with a header row) or 'ndjson'
+        batch_size (int): Rows fetched and encoded per chunk
+
+    Yields:
+        bytes: One encoded chunk per fetched batch
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of: {', '.join(FORMATS)}")
+
+    result = db.session.execute(
+        build_export_query(filters),
+        execution_options={'yield_per': batch_size}
+    )
+    if fmt == 'csv':
+        yield _encode_csv([], header=True)
+    for partition in result.partitions():
+        yield _encode_csv(partition) if fmt == 'csv' else _encode_ndjson(partition)
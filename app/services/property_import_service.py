@@ -0,0 +1,291 @@
+import csv
+import io
+import json
+import math
+import time
+from datetime import datetime
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.property import Property
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+# Rows with the same natural key update the existing property instead of adding one
+NATURAL_KEY = ['country', 'postcode', 'address']
+TEXT_FIELDS = ['address', 'city', 'country', 'postcode', 'property_type']
+FLOAT_FIELDS = ['size_sqft', 'listing_price']
+INT_FIELDS = ['num_bedrooms', 'num_bathrooms']
+COORDINATE_RANGES = {'latitude': 90, 'longitude': 180}
+COLUMNS = TEXT_FIELDS + FLOAT_FIELDS + INT_FIELDS + list(COORDINATE_RANGES) + ['created_at', 'updated_at']
+UPDATE_COLUMNS = [column for column in COLUMNS if column not in NATURAL_KEY and column != 'created_at']
+
+FORMATS = ['csv', 'ndjson']
+
+# Canonical property types, as used by the prediction factors and the API examples
+PROPERTY_TYPES = ['Apartment', 'Detached House', 'Semi-detached House', 'Townhouse', 'Villa', 'Land Plot']
+# Other spellings found in listing feeds
+PROPERTY_TYPE_ALIASES = {
+    'Apartment': ['flat'],
+    'Detached House': ['detached'],
+    'Semi-detached House': ['semi detached', 'semi'],
+    'Townhouse': ['town house'],
+    'Land Plot': ['land', 'plot']
+}
+
+
+def _property_type_key(value):
+    return ' '.join(value.lower().replace('-', ' ').replace('_', ' ').split())
+
+
+_PROPERTY_TYPE_LOOKUP = {_property_type_key(name): name for name in PROPERTY_TYPES}
+_PROPERTY_TYPE_LOOKUP.update(
+    (_property_type_key(alias), name) for name, aliases in PROPERTY_TYPE_ALIASES.items() for alias in aliases
+)
+
+
+class ImportInterrupted(Exception):
+    """
+    Raised when a feed stops loading part way through
+
+    Chunks loaded before the failure stay committed; `summary` reports them
+    and the line they reach. Rows are upserted on their natural key, so the
+    whole feed can simply be imported again.
+    """
+
+    def __init__(self, message, summary):
+        super().__init__(message)
+        self.summary = summary
+
+
+def detect_format(filename=None, mimetype=None):
+    """
+    Guess the feed format from a file name or content type
+
+    Args:
+        filename (str): Uploaded or local file name
+        mimetype (str): Request content type
+
+    Returns:
+        str: 'ndjson' for .ndjson/.jsonl files and NDJSON content types, otherwise 'csv'
+    """
+    if filename and filename.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if mimetype in ['application/x-ndjson', 'application/jsonl']:
+        return 'ndjson'
+    return 'csv'
+
+
+def iter_feed(lines, fmt='csv'):
+    """
+    Read raw rows from a CSV or NDJSON feed without loading it into memory
+
+    Args:
+        lines: Iterable of text lines, e.g. an open text file
+        fmt (str): 'csv' (with a header row) or 'ndjson' (one JSON object per line)
+
+    Yields:
+        tuple: (line number, row dict); the dict is None when the line is not valid JSON
+    """
+    if fmt == 'ndjson':
+        for line_num, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_num, row if isinstance(row, dict) else None
+        return
+
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames:
+        raise ValueError('CSV must have a header row')
+    missing = [field for field in TEXT_FIELDS + FLOAT_FIELDS + INT_FIELDS
+               if field not in [name.strip() for name in reader.fieldnames]]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+    for row in reader:
+        yield reader.line_num, {(key or '').strip(): value for key, value in row.items()}
+
+
+def _number(row, field, cast):
+    value = row.get(field)
+    if isinstance(value, str):
+        value = value.strip().replace(',', '')
+    if value is None or value == '':
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = None
+    if number is None or not math.isfinite(number) or (cast is int and not number.is_integer()):
+        raise ValueError(f'Invalid value for {field}: {value!r}')
+    return int(number) if cast is int else number
+
+
+def normalize_property(row, now):
+    """
+    Validate a raw feed row and convert it to a properties row
+
+    Whitespace is collapsed and postcodes are upper-cased so the same
+    listing always maps to the same natural key. Property types are mapped
+    onto PROPERTY_TYPES whatever their case or spelling ('flat',
+    'DETACHED_HOUSE'); unknown types are kept as given.
+
+    Args:
+        row (dict): Raw row from iter_feed()
+        now (datetime): Timestamp for created_at and updated_at
+
+    Returns:
+        dict: Column values for the properties table
+
+    Raises:
+        ValueError: If a required field is missing or a value is invalid
+    """
+    values = {}
+    for field in TEXT_FIELDS:
+        value = ' '.join(str(row.get(field) or '').split())
+        if not value:
+            raise ValueError(f'Missing required field: {field}')
+        values[field] = value
+    values['postcode'] = values['postcode'].upper()
+    values['property_type'] = _PROPERTY_TYPE_LOOKUP.get(
+        _property_type_key(values['property_type']), values['property_type']
+    )
+
+    for fields, cast in [(FLOAT_FIELDS, float), (INT_FIELDS, int), (COORDINATE_RANGES, float)]:
+        for field in fields:
+            values[field] = _number(row, field, cast)
+
+    for field in FLOAT_FIELDS + INT_FIELDS:
+        if values[field] is None:
+            raise ValueError(f'Missing required field: {field}')
+        if values[field] < 0 or (field in FLOAT_FIELDS and values[field] == 0):
+            raise ValueError(f'Invalid value for {field}: {values[field]}')
+    for field, limit in COORDINATE_RANGES.items():
+        if values[field] is not None and abs(values[field]) > limit:
+            raise ValueError(f'Invalid value for {field}: {values[field]}')
+
+    values['created_at'] = now
+    values['updated_at'] = now
+    return values
+
+
+def _load_sqlite(rows):
+    statement = sqlite_insert(Property.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=NATURAL_KEY,
+        set_={column: statement.excluded[column] for column in UPDATE_COLUMNS}
+    )
+    # A list of parameter sets runs as a single executemany
+    db.session.execute(statement, rows)
+
+
+def _load_postgres(rows):
+    connection = db.session.connection()
+    # Staging table private to this connection, emptied by every commit
+    connection.exec_driver_sql(
+        'CREATE TEMP TABLE IF NOT EXISTS property_import ON COMMIT DELETE ROWS AS '
+        f"SELECT {', '.join(COLUMNS)} FROM properties WITH NO DATA"
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # Unquoted empty fields load as NULL
+        writer.writerow(['' if row[column] is None else row[column] for column in COLUMNS])
+    buffer.seek(0)
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY property_import ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+    updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in UPDATE_COLUMNS)
+    connection.exec_driver_sql(
+        f"INSERT INTO properties ({', '.join(COLUMNS)}) SELECT {', '.join(COLUMNS)} FROM property_import "
+        f"ON CONFLICT ({', '.join(NATURAL_KEY)}) DO UPDATE SET {updates}"
+    )
+
+
+def _load_chunk(rows):
+    if db.session.get_bind().dialect.name == 'postgresql':
+        _load_postgres(rows)
+    else:
+        _load_sqlite(rows)
+    db.session.commit()
+
+
+def import_properties(lines, fmt='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Upsert properties from a CSV or NDJSON listing feed
+
+    The feed is read and validated chunk_size rows at a time. Each chunk is
+    loaded with COPY into a staging table and merged with INSERT ... ON
+    CONFLICT on PostgreSQL, or with one executemany upsert on SQLite, and
+    committed, so memory stays flat. If the feed or the database fails part
+    way, the chunks already committed stay loaded and ImportInterrupted
+    reports them; importing the feed again upserts the same rows. Rows
+    repeating a natural key within a chunk keep the last one.
+
+    Args:
+        lines: Iterable of text lines
+        fmt (str): 'csv' or 'ndjson'
+        chunk_size (int): Rows validated and loaded per transaction
+
+    Returns:
+        dict: Counts of loaded, duplicate and invalid rows, the first errors, the last line committed,
+            seconds and rows per second
+
+    Raises:
+        ValueError: If the format is unknown or the CSV header is unusable
+        ImportInterrupted: If an undecodable line, malformed CSV or database error stops the import
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of: {', '.join(FORMATS)}")
+
+    started = time.perf_counter()
+    summary = {'loaded': 0, 'duplicates': 0, 'invalid': 0, 'errors': [], 'committed_through_line': 0}
+    chunk = {}
+
+    def flush(line_num):
+        if chunk:
+            _load_chunk(list(chunk.values()))
+            summary['loaded'] += len(chunk)
+            chunk.clear()
+        summary['committed_through_line'] = line_num
+
+    def finish():
+        seconds = time.perf_counter() - started
+        summary['seconds'] = round(seconds, 3)
+        summary['rows_per_second'] = round(summary['loaded'] / seconds, 1) if seconds else 0.0
+        return summary
+
+    now = datetime.utcnow()
+    line_num = 0
+    try:
+        for line_num, row in iter_feed(lines, fmt):
+            try:
+                if row is None:
+                    raise ValueError('Invalid JSON object')
+                values = normalize_property(row, now)
+            except ValueError as e:
+                summary['invalid'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({'line': line_num, 'message': str(e)})
+                continue
+
+            key = tuple(values[field] for field in NATURAL_KEY)
+            if key in chunk:
+                summary['duplicates'] += 1
+            chunk[key] = values
+            if len(chunk) >= chunk_size:
+                flush(line_num)
+        flush(line_num)
+    except (UnicodeDecodeError, csv.Error, SQLAlchemyError) as e:
+        db.session.rollback()
+        raise ImportInterrupted(
+            f"Import stopped after line {summary['committed_through_line']} was committed: {str(e)}",
+            finish()
+        ) from e
+
+    return finish()
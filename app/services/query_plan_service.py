@@ -0,0 +1,155 @@
+import json
+from datetime import datetime
+from app import db
+from app.models.area import Area
+from app.models.email_outbox import EmailOutbox
+from app.models.prediction import Prediction
+from app.models.property import Property
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+
+# name -> (statement factory, tables that must be read through an index)
+HOT_QUERIES = {}
+
+
+def hot_query(name, tables):
+    """
+    Register a function returning a representative statement for a hot query
+
+    Args:
+        name (str): Name reported by the checker
+        tables (list): Tables the query must not read with a sequential scan
+    """
+    def decorator(fn):
+        HOT_QUERIES[name] = (fn, tables)
+        return fn
+    return decorator
+
+
+@hot_query('area score lookup', ['areas'])
+def _area_by_name():
+    return db.select(Area).filter_by(area_name='London', country='UK').limit(1)
+
+
+@hot_query('properties by location', ['properties'])
+def _properties_by_location():
+    return db.select(Property).filter_by(city='London', country='UK', property_type='Apartment')
+
+
+@hot_query('latest prediction for property', ['predictions'])
+def _latest_prediction():
+    return (
+        db.select(Prediction)
+        .filter_by(property_id=1)
+        .order_by(Prediction.created_at.desc())
+        .limit(1)
+    )
+
+
+@hot_query('predictions by model version', ['predictions'])
+def _predictions_by_model_version():
+    return db.select(db.func.count(Prediction.id)).filter_by(model_version='heuristic-v1')
+
+
+@hot_query('user by email', ['users'])
+def _user_by_email():
+    return db.select(User).filter_by(email='admin@realtex.ai')
+
+
+@hot_query('user email prefix', ['users'])
+def _user_email_prefix():
+    lowered = db.func.lower(User.email)
+    return db.select(User.id).where(lowered >= 'adm', lowered < 'adn')
+
+
+@hot_query('due outbox emails', ['email_outbox'])
+def _due_outbox_emails():
+    return (
+        db.select(EmailOutbox.id)
+        .where(EmailOutbox.status == EmailOutbox.STATUS_PENDING, EmailOutbox.next_attempt_at <= datetime(2000, 1, 1))
+        .limit(50)
+    )
+
+
+@hot_query('expired revoked tokens', ['revoked_tokens'])
+def _expired_revoked_tokens():
+    return db.select(RevokedToken.id).where(RevokedToken.expires_at < datetime(2000, 1, 1))
+
+
+def _explain(connection, statement):
+    # The sample values are inlined, so the planner sees the same literals as the query itself would bind
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+
+    if connection.dialect.name == 'postgresql':
+        plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + sql).scalar()
+        return json.loads(plan) if isinstance(plan, str) else plan
+    return connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql).fetchall()
+
+
+def _sqlite_scans(plan, tables):
+    # Rows are (id, parent, notused, detail); "SCAN t" without USING reads the whole table
+    lines = [row[3] for row in plan]
+    scans = []
+    for detail in lines:
+        words = detail.split()
+        if len(words) >= 2 and words[0] == 'SCAN' and words[1] in tables and 'USING' not in words:
+            scans.append(words[1])
+    return scans, lines
+
+
+def _postgres_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _postgres_nodes(child)
+
+
+def _postgres_scans(plan, tables, table_rows, min_rows):
+    scans = []
+    lines = []
+    for node in _postgres_nodes(plan[0]['Plan']):
+        relation = node.get('Relation Name')
+        lines.append(f"{node['Node Type']}" + (f' on {relation}' if relation else ''))
+        # The planner rightly prefers a sequential scan on small tables
+        if node['Node Type'] == 'Seq Scan' and relation in tables and table_rows.get(relation, 0) >= min_rows:
+            scans.append(relation)
+    return scans, lines
+
+
+def _postgres_table_rows(connection, tables):
+    rows = connection.exec_driver_sql(
+        'SELECT relname, reltuples FROM pg_class WHERE relkind = %(kind)s AND relname = ANY(%(names)s)',
+        {'kind': 'r', 'names': list(tables)}
+    ).fetchall()
+    return {name: tuples for name, tuples in rows}
+
+
+def check_query_plans(min_rows=10000):
+    """
+    EXPLAIN every registered hot query and report sequential scans
+
+    SQLite has no table statistics unless ANALYZE was run, so its planner
+    uses an index whenever one fits and every scan of a listed table is
+    reported. PostgreSQL only reports scans of tables estimated to hold at
+    least min_rows rows.
+
+    Args:
+        min_rows (int): Smallest PostgreSQL table for which a sequential scan is a regression
+
+    Returns:
+        list: Dicts with the query name, scanned tables and plan lines, in registration order
+    """
+    results = []
+    with db.engine.connect() as connection:
+        dialect_name = connection.dialect.name
+        table_rows = {}
+        if dialect_name == 'postgresql':
+            table_rows = _postgres_table_rows(connection, {t for _, tables in HOT_QUERIES.values() for t in tables})
+
+        for name, (factory, tables) in HOT_QUERIES.items():
+            plan = _explain(connection, factory())
+            if dialect_name == 'postgresql':
+                scans, lines = _postgres_scans(plan, tables, table_rows, min_rows)
+            else:
+                scans, lines = _sqlite_scans(plan, tables)
+            results.append({'name': name, 'sequential_scans': scans, 'plan': lines})
+    return results
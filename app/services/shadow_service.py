@@ -0,0 +1,252 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, int(round(pct / 100.0 * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+class _Reservoir:
+    """Bounded uniform sample of a stream of values"""
+
+    def __init__(self, size):
+        self.size = size
+        self.seen = 0
+        self.values = []
+
+    def add(self, value):
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            slot = random.randrange(self.seen)
+            if slot < self.size:
+                self.values[slot] = value
+
+    def summary(self):
+        values = sorted(self.values)
+        return {
+            'p50_ms': _ms(_percentile(values, 50)),
+            'p95_ms': _ms(_percentile(values, 95)),
+            'p99_ms': _ms(_percentile(values, 99)),
+            'max_ms': _ms(values[-1] if values else None)
+        }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+class _KindStats:
+    """Aggregated shadow comparison for one prediction kind within a window"""
+
+    def __init__(self, sample_size):
+        self.count = 0
+        self.errors = 0
+        self.versions = set()
+        self.primary_latency = _Reservoir(sample_size)
+        self.shadow_latency = _Reservoir(sample_size)
+        self.deltas = {}
+
+    def add(self, primary_version, shadow_version, primary_latency, shadow_latency, deltas):
+        self.count += 1
+        self.versions.add((primary_version, shadow_version))
+        self.primary_latency.add(primary_latency)
+        self.shadow_latency.add(shadow_latency)
+        for field, (abs_delta, rel_delta) in deltas.items():
+            stats = self.deltas.setdefault(field, [0.0, 0.0, 0.0, 0])
+            stats[0] += abs_delta
+            stats[1] = max(stats[1], abs_delta)
+            if rel_delta is not None:
+                stats[2] += rel_delta
+                stats[3] += 1
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'model_versions': [
+                {'primary': primary, 'shadow': shadow} for primary, shadow in sorted(self.versions)
+            ],
+            'primary_latency': self.primary_latency.summary(),
+            'shadow_latency': self.shadow_latency.summary(),
+            'output_deltas': {
+                field: {
+                    'mean_abs_delta': total_abs / self.count if self.count else None,
+                    'max_abs_delta': max_abs,
+                    'mean_rel_delta_pct': total_rel / rel_count * 100 if rel_count else None
+                }
+                for field, (total_abs, max_abs, total_rel, rel_count) in self.deltas.items()
+            }
+        }
+
+
+class ShadowScorer:
+    """
+    Scores a sampled fraction of prediction requests with a candidate model
+
+    Shadow scoring runs on a small background thread pool so it never adds
+    latency to the request. Comparisons are aggregated per worker in a time
+    window which is flushed to a bounded history every SHADOW_FLUSH_INTERVAL
+    seconds by a timer thread, started with the pool, so windows close on
+    time even when no sampled requests arrive.
+    """
+
+    def __init__(self):
+        self.sample_rate = 0.0
+        self.flush_interval = 60
+        self.max_workers = 2
+        self.max_pending = 100
+        self.sample_size = 2048
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._flusher = None
+        self._pending = 0
+        self._dropped = 0
+        self._window_started = time.time()
+        self._window = {}
+        self._history = deque(maxlen=48)
+
+    def init_app(self, app):
+        self.sample_rate = app.config.get('SHADOW_SAMPLE_RATE', 0.0)
+        self.flush_interval = app.config.get('SHADOW_FLUSH_INTERVAL', 60)
+        self.max_workers = app.config.get('SHADOW_MAX_WORKERS', 2)
+        self.max_pending = app.config.get('SHADOW_MAX_PENDING', 100)
+        self._history = deque(maxlen=app.config.get('SHADOW_HISTORY_SIZE', 48))
+
+    def should_sample(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _get_executor(self):
+        # Threads do not survive a fork, so a preloaded app gets a fresh pool per worker
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='shadow-scorer'
+            )
+            self._executor_pid = os.getpid()
+            self._pending = 0
+            self._flusher = threading.Thread(target=self._run_flusher, name='shadow-flusher', daemon=True)
+            self._flusher.start()
+        return self._executor
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(max(0.1, self._window_started + self.flush_interval - time.time()))
+            with self._lock:
+                self._maybe_flush_locked()
+
+    def submit(self, kind, data, primary_version, primary_result, primary_latency, shadow_model):
+        """
+        Queue a shadow scoring job for a request already answered by the primary model
+
+        Args:
+            kind (str): Prediction kind
+            data (dict): Request payload
+            primary_version (str): Version of the model that answered the request
+            primary_result (dict): Output returned to the client
+            primary_latency (float): Primary scoring time in seconds
+            shadow_model (PredictionModel): Candidate model to compare against
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._dropped += 1
+                return
+            self._pending += 1
+            executor = self._get_executor()
+
+        executor.submit(
+            self._score, kind, dict(data), primary_version, primary_result, primary_latency, shadow_model
+        )
+
+    def _score(self, kind, data, primary_version, primary_result, primary_latency, shadow_model):
+        try:
+            started = time.perf_counter()
+            try:
+                shadow_result = shadow_model.predict(kind, data)
+            except Exception as e:
+                print(f"Shadow model {shadow_model.version} failed on {kind}: {str(e)}")
+                self._record_error(kind)
+                return
+            shadow_latency = time.perf_counter() - started
+
+            deltas = {}
+            for field, primary_value in primary_result.items():
+                shadow_value = shadow_result.get(field)
+                if not isinstance(primary_value, (int, float)) or not isinstance(shadow_value, (int, float)):
+                    continue
+                abs_delta = abs(shadow_value - primary_value)
+                rel_delta = abs_delta / abs(primary_value) if primary_value else None
+                deltas[field] = (abs_delta, rel_delta)
+
+            with self._lock:
+                stats = self._window.setdefault(kind, _KindStats(self.sample_size))
+                stats.add(primary_version, shadow_model.version, primary_latency, shadow_latency, deltas)
+                self._maybe_flush_locked()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _record_error(self, kind):
+        with self._lock:
+            self._window.setdefault(kind, _KindStats(self.sample_size)).errors += 1
+            self._maybe_flush_locked()
+
+    def _maybe_flush_locked(self):
+        if time.time() - self._window_started >= self.flush_interval:
+            self._flush_locked()
+
+    def _summarize_locked(self):
+        return {
+            'window_started_at': datetime.fromtimestamp(self._window_started, timezone.utc).isoformat(),
+            'window_seconds': round(time.time() - self._window_started, 1),
+            'kinds': {kind: stats.summary() for kind, stats in self._window.items()}
+        }
+
+    def _flush_locked(self):
+        if self._window:
+            summary = self._summarize_locked()
+            self._history.append(summary)
+            for kind, stats in summary['kinds'].items():
+                print(
+                    f"Shadow scoring [{kind}]: {stats['count']} compared, {stats['errors']} errors, "
+                    f"primary p99 {stats['primary_latency']['p99_ms']}ms, "
+                    f"shadow p99 {stats['shadow_latency']['p99_ms']}ms"
+                )
+        self._window = {}
+        self._window_started = time.time()
+
+    def flush(self):
+        """Close the current aggregation window and move it into the history"""
+        with self._lock:
+            self._flush_locked()
+
+    def report(self):
+        """
+        Build a report of the current window and recent flushed windows
+
+        Returns:
+            dict: Shadow scoring report for this worker
+        """
+        with self._lock:
+            self._maybe_flush_locked()
+            return {
+                'pid': os.getpid(),
+                'sample_rate': self.sample_rate,
+                'pending': self._pending,
+                'dropped': self._dropped,
+                'current': self._summarize_locked(),
+                'history': list(self._history)
+            }
+
+
+shadow_scorer = ShadowScorer()
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.prediction import Prediction
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+# Dashboard numbers may lag by up to the TTL; keyed by window size in days
+stats_cache = TTLCache(maxsize=16, ttl=30)
+
+
+def init_app(app):
+    """
+    Configure the stats cache from the application config
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    stats_cache.configure(ttl=app.config.get('ADMIN_STATS_CACHE_TTL', 30))
+
+
+def invalidate_admin_stats():
+    """Drop the cached dashboard statistics after a change that moves them a lot"""
+    stats_cache.clear()
+
+
+def _count_if(condition):
+    return db.func.count(db.case((condition, 1)))
+
+
+def _per_day(kind, column, since):
+    day = db.func.date(column)
+    return (
+        db.select(db.literal(kind).label('kind'), day.label('day'), db.func.count().label('count'))
+        .where(column >= since)
+        .group_by(day)
+    )
+
+
+def _compute_stats(days):
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    since = datetime(since.year, since.month, since.day)
+
+    pending = db.and_(User.invitation_token.isnot(None), User.invitation_accepted_at.is_(None))
+    totals = db.session.execute(
+        db.select(
+            db.func.count(User.id),
+            _count_if(User.is_active == True),
+            _count_if(User.is_active == False),
+            _count_if(User.is_admin == True),
+            _count_if(pending),
+            db.select(db.func.count(Prediction.id)).scalar_subquery()
+        )
+    ).one()
+
+    series = {'invitations_sent': [], 'invitations_accepted': [], 'predictions': []}
+    daily = db.union_all(
+        _per_day('invitations_sent', User.invitation_sent_at, since),
+        _per_day('invitations_accepted', User.invitation_accepted_at, since),
+        _per_day('predictions', Prediction.created_at, since)
+    )
+    for kind, day, count in db.session.execute(daily):
+        series[kind].append({'date': str(day), 'count': count})
+    for points in series.values():
+        points.sort(key=lambda point: point['date'])
+
+    total, active, inactive, admins, pending_count, predictions = totals
+    return {
+        'users': {
+            'total': total,
+            'active': active,
+            'inactive': inactive,
+            'admins': admins,
+            'pending_invitations': pending_count
+        },
+        'invitations': {
+            'sent_per_day': series['invitations_sent'],
+            'accepted_per_day': series['invitations_accepted']
+        },
+        'predictions': {
+            'total': predictions,
+            'per_day': series['predictions']
+        },
+        'days': days,
+        'generated_at': datetime.utcnow().isoformat()
+    }
+
+
+def get_admin_stats(days=30):
+    """
+    Get dashboard statistics, computed with two aggregate queries and cached briefly
+
+    Args:
+        days (int): Number of days covered by the per-day series
+
+    Returns:
+        dict: User counts, invitations per day and prediction volumes
+    """
+    stats = stats_cache.get(days)
+    if stats is None:
+        stats = _compute_stats(days)
+        stats_cache.set(days, stats)
+    return stats
@@ -0,0 +1,251 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from app import db, jwt
+from app.models.revoked_token import RevokedToken
+from app.services.principal_service import invalidate_principal
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    Answers "definitely not present" or "possibly present"; false positives
+    are bounded by the error rate it was sized for, false negatives never
+    happen.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.num_bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def _user_key(user_id):
+    return f'user:{user_id}'
+
+
+class TokenBlocklist:
+    """
+    Revoked JWT store with an in-memory Bloom filter in front of the database
+
+    Every worker keeps a Bloom filter of revoked jtis (and of users whose
+    tokens were all revoked). A token whose jti is not in the filter is
+    accepted without touching the database, which is the common case. Only
+    filter hits are confirmed against the revoked_tokens table. Workers pick
+    up revocations made elsewhere by polling for new rows every
+    TOKEN_BLOCKLIST_SYNC_INTERVAL seconds, and rebuild the filter every
+    TOKEN_BLOCKLIST_REBUILD_INTERVAL seconds so rows purged since then drop
+    out of it. Checking a token only ever reads: rows past the token lifetime
+    are deleted by `flask purge-revoked-tokens`, run from cron. Picking up a
+    user revocation also drops that user's cached principal, so a demoted or
+    deactivated user loses access on every worker within the sync interval.
+    """
+
+    def __init__(self):
+        self.sync_interval = 5
+        self.rebuild_interval = 3600
+        self.expected_entries = 10000
+        self.error_rate = 0.001
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._bloom = None
+        self._pid = None
+        self._last_id = 0
+        self._last_sync = 0
+        self._last_rebuild = 0
+
+    def init_app(self, app):
+        self.sync_interval = app.config.get('TOKEN_BLOCKLIST_SYNC_INTERVAL', 5)
+        self.rebuild_interval = app.config.get('TOKEN_BLOCKLIST_REBUILD_INTERVAL', 3600)
+        self.expected_entries = app.config.get('TOKEN_BLOCKLIST_EXPECTED_ENTRIES', 10000)
+        self.error_rate = app.config.get('TOKEN_BLOCKLIST_ERROR_RATE', 0.001)
+        with self._lock:
+            self._reset()
+
+    def _rebuild_locked(self):
+        count = db.session.query(db.func.count(RevokedToken.id)).scalar() or 0
+        bloom = BloomFilter(max(self.expected_entries, count * 2), self.error_rate)
+        last_id = 0
+        for row_id, jti in db.session.query(RevokedToken.id, RevokedToken.jti).yield_per(5000):
+            self._add_locked(bloom, row_id, jti)
+            last_id = max(last_id, row_id)
+        self._bloom = bloom
+        self._last_id = last_id
+        self._pid = os.getpid()
+        self._last_rebuild = time.monotonic()
+
+    def _add_locked(self, bloom, row_id, jti):
+        bloom.add(jti)
+        if row_id > self._last_id and jti.startswith('user:'):
+            invalidate_principal(jti[len('user:'):])
+
+    def _sync_locked(self):
+        new_rows = (
+            db.session.query(RevokedToken.id, RevokedToken.jti)
+            .filter(RevokedToken.id > self._last_id)
+            .all()
+        )
+        for row_id, jti in new_rows:
+            self._add_locked(self._bloom, row_id, jti)
+            self._last_id = max(self._last_id, row_id)
+        if self._bloom.count > self._bloom.capacity:
+            self._rebuild_locked()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._bloom is not None and self._pid == os.getpid() and now - self._last_sync < self.sync_interval:
+            return
+        with self._lock:
+            if self._bloom is None or self._pid != os.getpid() or now - self._last_rebuild >= self.rebuild_interval:
+                self._rebuild_locked()
+            else:
+                self._sync_locked()
+            self._last_sync = now
+
+    def is_revoked(self, jwt_payload):
+        """
+        Check whether a decoded token has been revoked
+
+        Args:
+            jwt_payload (dict): Decoded JWT claims
+
+        Returns:
+            bool: True if the token must be rejected
+        """
+        self._refresh()
+        bloom = self._bloom
+
+        jti = jwt_payload.get('jti')
+        if jti and jti in bloom:
+            if db.session.query(RevokedToken.id).filter_by(jti=jti).first():
+                return True
+
+        user_key = _user_key(jwt_payload.get('sub'))
+        if user_key in bloom:
+            row = RevokedToken.query.filter_by(jti=user_key).first()
+            # iat has whole-second precision, so a token issued in the second of the revocation
+            # may predate it and is rejected too
+            if row and jwt_payload.get('iat', 0) <= int((row.revoked_at - datetime(1970, 1, 1)).total_seconds()):
+                return True
+
+        return False
+
+    def _remember(self, jti):
+        with self._lock:
+            if self._bloom is not None and self._pid == os.getpid():
+                self._bloom.add(jti)
+
+    def revoke_token(self, jwt_payload):
+        """
+        Revoke a single token by its jti
+
+        Args:
+            jwt_payload (dict): Decoded JWT claims of the token to revoke
+        """
+        jti = jwt_payload['jti']
+        if RevokedToken.query.filter_by(jti=jti).first():
+            return
+
+        db.session.add(RevokedToken(
+            jti=jti,
+            token_type=jwt_payload.get('type', 'access'),
+            user_id=_to_int(jwt_payload.get('sub')),
+            expires_at=datetime.fromtimestamp(jwt_payload['exp'], timezone.utc).replace(tzinfo=None)
+        ))
+        db.session.commit()
+        self._remember(jti)
+
+    def revoke_user(self, user_id, commit=True):
+        """
+        Revoke every token issued to a user up to now
+
+        Args:
+            user_id (int): User ID
+            commit (bool): Whether to commit the session
+        """
+        self.revoke_users([user_id], commit=commit)
+
+    def revoke_users(self, user_ids, commit=True):
+        """
+        Revoke every token issued to each of the users up to now, with set-based statements
+
+        Args:
+            user_ids (list): User IDs
+            commit (bool): Whether to commit the session
+        """
+        if not user_ids:
+            return
+
+        now = datetime.utcnow()
+        expires_at = now + max(
+            current_app.config['JWT_ACCESS_TOKEN_EXPIRES'],
+            current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+        )
+        keys = {_user_key(user_id): user_id for user_id in user_ids}
+
+        # Replace earlier revocations rather than updating them: other workers only sync rows with new ids
+        RevokedToken.query.filter(RevokedToken.jti.in_(list(keys))).delete(synchronize_session=False)
+        db.session.execute(db.insert(RevokedToken), [
+            {'jti': key, 'token_type': 'user', 'user_id': user_id, 'revoked_at': now, 'expires_at': expires_at}
+            for key, user_id in keys.items()
+        ])
+
+        if commit:
+            db.session.commit()
+        for key in keys:
+            self._remember(key)
+
+    def purge_expired(self):
+        """
+        Delete revocations whose tokens have expired anyway and rebuild the filter
+
+        Meant for `flask purge-revoked-tokens`; other workers drop the purged
+        rows from their filters at their next rebuild.
+
+        Returns:
+            int: Number of rows deleted
+        """
+        with self._lock:
+            deleted = RevokedToken.query.filter(RevokedToken.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+            db.session.commit()
+            self._rebuild_locked()
+        return deleted
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+token_blocklist = TokenBlocklist()
+
+
+@jwt.token_in_blocklist_loader
+def _token_in_blocklist_callback(jwt_header, jwt_payload):
+    return token_blocklist.is_revoked(jwt_payload)
@@ -0,0 +1,119 @@
+import csv
+import uuid
+from datetime import datetime
+from app import db
+from app.models.user import User, UNUSABLE_PASSWORD
+from app.services.email_service import enqueue_invitation_emails, outbox_sender
+
+INSERT_BATCH_SIZE = 500
+# Keeps the IN list under SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 10000
+
+_TRUE_VALUES = ['true', 'yes', '1']
+
+
+def parse_invitation_csv(lines):
+    """
+    Read invitations from CSV with an 'email' column and optional
+    'first_name', 'last_name' and 'is_admin' columns
+
+    Args:
+        lines: Iterable of CSV text lines, e.g. an open text file
+
+    Returns:
+        tuple: (list of invitation dicts, list of error dicts with line and message)
+
+    Raises:
+        ValueError: If the CSV has no 'email' column
+    """
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or 'email' not in [name.strip() for name in reader.fieldnames]:
+        raise ValueError("CSV must have a header row with an 'email' column")
+
+    invitations = []
+    errors = []
+    for row in reader:
+        # Fields beyond the header (e.g. a trailing comma) are collected under None and ignored
+        row = {key.strip(): (value or '').strip() for key, value in row.items() if key is not None}
+        email = row.get('email', '')
+        if not email or '@' not in email:
+            errors.append({'line': reader.line_num, 'message': f'Invalid email: {email!r}'})
+            continue
+        invitations.append({
+            'email': email,
+            'first_name': row.get('first_name') or None,
+            'last_name': row.get('last_name') or None,
+            'is_admin': row.get('is_admin', '').lower() in _TRUE_VALUES
+        })
+    return invitations, errors
+
+
+def _existing_emails(emails):
+    existing = set()
+    for start in range(0, len(emails), LOOKUP_CHUNK_SIZE):
+        chunk = emails[start:start + LOOKUP_CHUNK_SIZE]
+        existing.update(email for (email,) in db.session.query(User.email).filter(User.email.in_(chunk)))
+    return existing
+
+
+def import_invitations(invitations, send_emails=True, wait_for_emails=False):
+    """
+    Create invited users in bulk and queue their invitation emails in the outbox
+
+    Emails already registered, or repeated within the import, are skipped.
+    New users are written with batched multi-row inserts in one transaction.
+
+    Args:
+        invitations (list): Invitation dicts from parse_invitation_csv()
+        send_emails (bool): Whether to queue invitation emails
+        wait_for_emails (bool): Send the queued emails before returning, for CLI use
+
+    Returns:
+        dict: Counts of created, existing and duplicate rows
+    """
+    unique = {}
+    duplicates = 0
+    for invitation in invitations:
+        if invitation['email'] in unique:
+            duplicates += 1
+            continue
+        unique[invitation['email']] = invitation
+
+    existing = _existing_emails(list(unique))
+
+    now = datetime.utcnow()
+    rows = []
+    for email, invitation in unique.items():
+        if email in existing:
+            continue
+        rows.append({
+            'email': email,
+            'password_hash': UNUSABLE_PASSWORD,
+            'first_name': invitation['first_name'],
+            'last_name': invitation['last_name'],
+            'is_admin': invitation['is_admin'],
+            'is_active': False,
+            'invitation_token': str(uuid.uuid4()),
+            'invitation_sent_at': now,
+            'created_at': now,
+            'updated_at': now
+        })
+
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        batch = rows[start:start + INSERT_BATCH_SIZE]
+        db.session.execute(db.insert(User), batch)
+        if send_emails:
+            enqueue_invitation_emails([(row['email'], row['invitation_token']) for row in batch])
+    db.session.commit()
+
+    if send_emails and rows:
+        if wait_for_emails:
+            outbox_sender.drain()
+        else:
+            outbox_sender.wake()
+
+    return {
+        'created': len(rows),
+        'existing': len(existing),
+        'duplicates': duplicates
+    }
@@ -0,0 +1,279 @@
+from app import db
+from app.models.user import User, user_serializer
+
+# Fields exposed by the admin user endpoints, in User.to_dict() order
+USER_FIELDS = {
+    'id': User.id,
+    'email': User.email,
+    'first_name': User.first_name,
+    'last_name': User.last_name,
+    'is_admin': User.is_admin,
+    'is_active': User.is_active,
+    'created_at': User.created_at,
+    'updated_at': User.updated_at
+}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 1000
+
+_TRUE_VALUES = ['true', 'yes', '1']
+_FALSE_VALUES = ['false', 'no', '0']
+
+
+def _parse_bool(name, value):
+    if value is None:
+        return None
+    value = value.lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    raise ValueError(f'Invalid value for {name}: expected true or false')
+
+
+def parse_int(args, name, default=None, minimum=0):
+    """
+    Read an integer request argument strictly
+
+    Args:
+        args (dict): Request query arguments
+        name (str): Argument name
+        default (int): Value when the argument is absent or empty
+        minimum (int): Smallest accepted value
+
+    Returns:
+        int: The parsed value, or default
+
+    Raises:
+        ValueError: If the value is not an integer or is below minimum
+    """
+    value = args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = None
+    if number is None or number < minimum:
+        raise ValueError(f'Invalid value for {name}: expected an integer of at least {minimum}')
+    return number
+
+
+def parse_user_filters(args):
+    """
+    Read the user filters from request arguments
+
+    Args:
+        args (dict): Request query arguments or JSON filter object
+
+    Returns:
+        dict: Filters with keys 'active', 'admin' and 'pending', each True, False or None
+
+    Raises:
+        ValueError: If a filter value is not a boolean
+    """
+    filters = {}
+    for name in ['active', 'admin', 'pending']:
+        value = args.get(name)
+        filters[name] = value if isinstance(value, bool) else _parse_bool(name, value)
+    return filters
+
+
+def apply_user_filters(query, filters):
+    """
+    Restrict a users query by the given filters
+
+    Args:
+        query: SQLAlchemy query or select over users
+        filters (dict): Filters returned by parse_user_filters()
+
+    Returns:
+        The filtered query
+    """
+    if filters.get('active') is not None:
+        query = query.filter(User.is_active == filters['active'])
+    if filters.get('admin') is not None:
+        query = query.filter(User.is_admin == filters['admin'])
+    if filters.get('pending') is not None:
+        pending = db.and_(User.invitation_token.isnot(None), User.invitation_accepted_at.is_(None))
+        query = query.filter(pending if filters['pending'] else db.not_(pending))
+    return query
+
+
+def parse_fields(value):
+    """
+    Parse a sparse fieldset such as 'id,email,is_active'
+
+    Args:
+        value (str): Comma separated field names, or None for all fields
+
+    Returns:
+        list: Field names, always including 'id'
+
+    Raises:
+        ValueError: If a field is unknown
+    """
+    if not value:
+        return list(USER_FIELDS)
+
+    fields = ['id']
+    for name in value.split(','):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name not in USER_FIELDS:
+            raise ValueError(f'Unknown field: {name}')
+        fields.append(name)
+    return fields
+
+
+def _build_query(filters, fields, after_id=None):
+    query = apply_user_filters(db.select(*[USER_FIELDS[name] for name in fields]), filters)
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+    return query.order_by(User.id)
+
+
+def row_to_dict(row, fields):
+    """
+    Convert a column-only result row to a JSON-ready dict
+
+    Args:
+        row (Row): Result row with one value per field
+        fields (list): Field names matching the row columns
+
+    Returns:
+        dict: Serialized user
+    """
+    return user_serializer.row_to_dict(row, fields)
+
+
+def get_users_page(filters, fields, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of users ordered by id, selecting only the requested columns
+
+    Args:
+        filters (dict): Filters returned by parse_user_filters()
+        fields (list): Field names returned by parse_fields()
+        after_id (int): Keyset cursor, the last id of the previous page
+        limit (int): Page size
+
+    Returns:
+        tuple: (list of user dicts, next cursor or None on the last page)
+    """
+    rows = db.session.execute(_build_query(filters, fields, after_id).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][0]
+    return [row_to_dict(row, fields) for row in rows], next_cursor
+
+
+def get_users_page_version(filters, after_id=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Summarize the rows of a page cheaply, for use in its ETag
+
+    Any insert, delete or update within the page changes the row count,
+    the id sum or the latest updated_at.
+
+    Args:
+        filters (dict): Filters returned by parse_user_filters()
+        after_id (int): Keyset cursor, the last id of the previous page
+        limit (int): Page size
+
+    Returns:
+        tuple: (row count, sum of ids, latest updated_at)
+    """
+    page = _build_query(filters, ['id', 'updated_at'], after_id).limit(limit + 1).subquery()
+    return tuple(db.session.execute(
+        db.select(db.func.count(), db.func.sum(page.c.id), db.func.max(page.c.updated_at))
+    ).one())
+
+
+def stream_users_json(filters, fields, after_id=None):
+    """
+    Stream every matching user as a JSON array without loading them all at once
+
+    Args:
+        filters (dict): Filters returned by parse_user_filters()
+        fields (list): Field names returned by parse_fields()
+        after_id (int): Optional keyset cursor to resume from
+
+    Yields:
+        bytes: Chunks of the JSON array
+    """
+    result = db.session.execute(
+        _build_query(filters, fields, after_id),
+        execution_options={'yield_per': STREAM_BATCH_SIZE}
+    )
+
+    # One chunk per fetched batch keeps the write count low without buffering the whole export
+    yield b'['
+    separator = b''
+    for partition in result.partitions():
+        yield separator + user_serializer.encode_rows(partition, fields)
+        separator = b','
+    yield b']'
+
+
+SEARCH_COLUMNS = [User.email, User.first_name, User.last_name]
+# Trigram indexes only help once the pattern has at least three characters
+MIN_SUBSTRING_LENGTH = 3
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _prefix_match(expression, term, dialect_name):
+    if dialect_name == 'sqlite':
+        # SQLite only uses expression indexes for comparisons, not LIKE
+        upper_bound = term[:-1] + chr(ord(term[-1]) + 1)
+        return db.and_(expression >= term, expression < upper_bound)
+    return expression.like(_escape_like(term) + '%', escape='\\')
+
+
+def search_users(term, page=1, per_page=20):
+    """
+    Search users by prefix or substring of email, first name or last name
+
+    Results are ranked exact email match first, then email prefix, name
+    prefix and substring matches, and ordered by email within each rank.
+
+    Args:
+        term (str): Search text
+        page (int): 1-based page number
+        per_page (int): Page size
+
+    Returns:
+        tuple: (list of user dicts, whether more results exist)
+    """
+    term = term.strip().lower()
+    dialect_name = db.session.get_bind().dialect.name
+    lowered = [db.func.lower(column) for column in SEARCH_COLUMNS]
+
+    prefixes = [_prefix_match(expression, term, dialect_name) for expression in lowered]
+    prefix = db.or_(*prefixes)
+    match = prefix
+    if len(term) >= MIN_SUBSTRING_LENGTH:
+        pattern = '%' + _escape_like(term) + '%'
+        match = db.or_(prefix, *[expression.like(pattern, escape='\\') for expression in lowered])
+
+    rank = db.case(
+        (lowered[0] == term, 0),
+        (prefixes[0], 1),
+        (db.or_(*prefixes[1:]), 2),
+        else_=3
+    )
+
+    fields = list(USER_FIELDS)
+    statement = (
+        db.select(*USER_FIELDS.values())
+        .where(match)
+        .order_by(rank, lowered[0], User.id)
+        .offset((page - 1) * per_page)
+        .limit(per_page + 1)
+    )
+    rows = db.session.execute(statement).all()
+    return [row_to_dict(row, fields) for row in rows[:per_page]], len(rows) > per_page
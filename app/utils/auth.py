@@ -0,0 +1,19 @@
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import current_user
+
+
+def admin_required(fn):
+    """
+    Decorator rejecting non-admin users with 403
+
+    Place it directly below @jwt_required, above @validate_json and
+    @idempotent, so non-admins are turned away before their body is
+    validated or an idempotency key is reserved for them.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_admin:
+            return jsonify({'message': 'Admin privileges required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,133 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+DEFAULT_MIMETYPES = ['application/json', 'application/x-ndjson', 'text/csv']
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits=31 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        # Sync flush hands every chunk to the client without ending the stream
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class Compressor:
+    """
+    Compresses JSON, NDJSON and CSV responses with brotli or gzip according to Accept-Encoding
+
+    Buffered bodies are only compressed above COMPRESS_MIN_SIZE bytes.
+    Streamed responses are compressed chunk by chunk, flushing after each
+    chunk so slow clients still receive data as it is produced. Brotli is
+    offered only when the brotli package is installed.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.min_size = 500
+        self.gzip_level = 6
+        self.brotli_quality = 4
+        self.mimetypes = set(DEFAULT_MIMETYPES)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_ENABLED', True)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES))
+        app.after_request(self.compress_response)
+
+    def _choose_encoding(self):
+        offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+        # best_match ignores encodings the client gave q=0
+        return request.accept_encodings.best_match(offered)
+
+    def _stream(self, encoding):
+        if encoding == 'br':
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    def _compress_chunks(self, chunks, stream):
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                data = stream.compress(chunk) + stream.flush()
+                if data:
+                    yield data
+            yield stream.finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    def compress_response(self, response):
+        """
+        Compress a response in place when the client and payload allow it
+
+        Args:
+            response (Response): Outgoing response
+
+        Returns:
+            Response: The same response
+        """
+        if (not self.enabled
+                or response.mimetype not in self.mimetypes
+                or response.status_code < 200
+                or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if request.method == 'HEAD':
+            return response
+
+        encoding = self._choose_encoding()
+        if not encoding:
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_chunks(response.response, self._stream(encoding))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            stream = self._stream(encoding)
+            response.set_data(stream.compress(data) + stream.finish())
+
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes differ, so only a weak validator still holds
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+compressor = Compressor()
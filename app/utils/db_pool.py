@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+import weakref
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """Checkout counters shared by a pool and the pools recreated from it"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def to_dict(self):
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_avg': self.wait_seconds_total / waits if waits else 0.0,
+                'wait_seconds_max': self.wait_seconds_max
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection
+
+    Waits only happen once pool_size + max_overflow connections are checked
+    out, so a growing wait time or any timeout means the pool is exhausted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # dispose() swaps in a new pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def configure_engine_options(app):
+    """
+    Use the instrumented pool for engines that pool connections
+
+    Must run before db.init_app(), which creates the engines. SQLite
+    engines, which have no pool options configured, are left unchanged.
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS')
+    if options and 'pool_size' in options and 'poolclass' not in options:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(options, poolclass=InstrumentedQueuePool)
+
+
+_engines = weakref.WeakSet()
+_fork_hook_registered = False
+
+
+def _dispose_after_fork():
+    for engine in list(_engines):
+        # close=False leaves the parent's sockets alone; the child just stops using them
+        engine.dispose(close=False)
+        stats = getattr(engine.pool, 'stats', None)
+        if stats is not None:
+            stats.reset()
+
+
+def register_engines(engines):
+    """
+    Dispose the given engines' pools in every child process after a fork
+
+    Covers gunicorn workers forked from a preloaded app as well as any
+    other forking server or multiprocessing use.
+
+    Args:
+        engines: SQLAlchemy engines to protect
+    """
+    global _fork_hook_registered
+    _engines.update(engines)
+    if not _fork_hook_registered and hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_dispose_after_fork)
+        _fork_hook_registered = True
+
+
+def pool_status(engine):
+    """
+    Describe the state of an engine's connection pool in this worker
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        dict: Pool class and, for queue pools, size, usage, saturation and checkout wait metrics
+    """
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if not isinstance(pool, QueuePool):
+        return status
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    status.update({
+        'size': pool.size(),
+        'max_overflow': pool._max_overflow,
+        'checked_out': checked_out,
+        'checked_in': pool.checkedin(),
+        'overflow': pool.overflow(),
+        'saturation': checked_out / capacity if capacity else 0.0
+    })
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update(stats.to_dict())
+    return status
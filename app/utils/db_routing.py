@@ -0,0 +1,158 @@
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import Response, current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from app.utils.cache import TTLCache
+
+REPLICA_BIND_PREFIX = 'replica_'
+# Time of a client's last write, returned as a cookie and header so any worker can keep its reads on the primary
+LAST_WRITE_COOKIE = 'last_write'
+LAST_WRITE_HEADER = 'X-Last-Write'
+
+# Users who committed a write recently on this worker, for clients that send neither back
+recent_writers = TTLCache(maxsize=100000, ttl=5)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads of @read_only views to a replica bind
+
+    Everything else uses the primary. Once the session flushes or executes
+    an INSERT, UPDATE or DELETE it stays on the primary, so a view never
+    reads older data than it has just written. Replicas are the binds named
+    replica_<n>, configured with DATABASE_REPLICA_URLS.
+    """
+
+    def _replica(self):
+        replica = self.info.get('replica')
+        if replica is None:
+            keys = [key for key in self._db.engines if key and key.startswith(REPLICA_BIND_PREFIX)]
+            # One replica per session keeps the reads of a request consistent with each other
+            replica = random.choice(keys) if keys else False
+            self.info['replica'] = replica
+        return replica
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self.info['wrote'] = True
+        elif self.info.get('read_only') and not self.info.get('wrote') and not self.info.get('primary'):
+            replica = self._replica()
+            if replica:
+                return self._db.engines[replica]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _current_user_id():
+    if not has_request_context():
+        return None
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_writer(session):
+    if session.info.get('wrote') and has_request_context():
+        g.last_write = time.time()
+        user_id = _current_user_id()
+        if user_id is not None:
+            recent_writers.set(user_id, True)
+
+
+def _set_last_write(response):
+    last_write = g.pop('last_write', None)
+    if last_write is not None:
+        value = f'{last_write:.3f}'
+        response.headers[LAST_WRITE_HEADER] = value
+        response.set_cookie(
+            LAST_WRITE_COOKIE, value,
+            max_age=current_app.config.get('READ_YOUR_WRITES_WINDOW', 5),
+            secure=request.is_secure, httponly=True, samesite='Lax'
+        )
+    return response
+
+
+def _wrote_recently(user_id):
+    if user_id is not None and recent_writers.get(user_id) is not None:
+        return True
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        last_write = float(value)
+    except (TypeError, ValueError):
+        return False
+    # A forged or skewed value can only keep that client's own reads on the primary
+    return last_write > time.time() - current_app.config.get('READ_YOUR_WRITES_WINDOW', 5)
+
+
+def init_app(app):
+    """
+    Configure how long a user's reads stay on the primary after they write
+
+    Responses to requests that committed a write carry the write time in
+    the last_write cookie and the X-Last-Write header. Browsers send the
+    cookie back; other clients can echo the header on their next requests.
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    recent_writers.configure(ttl=app.config.get('READ_YOUR_WRITES_WINDOW', 5))
+    app.after_request(_set_last_write)
+
+
+def read_only(fn):
+    """
+    Decorator letting a view's queries go to a read replica
+
+    Place it below @jwt_required. Clients that committed a write within the
+    READ_YOUR_WRITES_WINDOW, on any worker, keep reading from the primary,
+    so they see their own changes despite replication lag. When the view
+    returns a streamed response, the routing stays in place until the
+    response is closed, so queries run by the body (under
+    stream_with_context) go to the replica too.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        from app import db
+
+        session = db.session()
+        previous = session.info.get('read_only')
+        session.info['read_only'] = not _wrote_recently(_current_user_id())
+
+        def restore():
+            session.info['read_only'] = previous
+
+        try:
+            rv = fn(*args, **kwargs)
+        except Exception:
+            restore()
+            raise
+        response = rv[0] if isinstance(rv, tuple) else rv
+        if isinstance(response, Response) and response.is_streamed:
+            response.call_on_close(restore)
+        else:
+            restore()
+        return rv
+    return wrapper
+
+
+@contextmanager
+def use_primary():
+    """Run the queries in the block on the primary, e.g. to re-check a miss before inserting"""
+    from app import db
+
+    session = db.session()
+    previous = session.info.get('primary')
+    session.info['primary'] = True
+    try:
+        yield session
+    finally:
+        session.info['primary'] = previous
@@ -0,0 +1,59 @@
+import hashlib
+from flask import current_app, request
+
+
+def compute_etag(*parts):
+    """
+    Build an entity tag from the values that identify a response version,
+    e.g. a row id and its updated_at, without serializing the body
+
+    Args:
+        *parts: Values that change whenever the response body changes
+
+    Returns:
+        str: Opaque tag value, without quotes
+    """
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+
+
+def _cache_control(policy):
+    return current_app.config[f'CACHE_CONTROL_{policy.upper()}']
+
+
+def cache_headers(response, etag, policy):
+    """
+    Set the ETag, Cache-Control and Vary headers of a cacheable response
+
+    The ETag is weak since the same version may be sent compressed or not.
+
+    Args:
+        response (Response): Response to update
+        etag (str): Tag returned by compute_etag()
+        policy (str): Cache policy name, configured as CACHE_CONTROL_<POLICY>
+
+    Returns:
+        Response: The same response
+    """
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = _cache_control(policy)
+    # Responses depend on who is asking
+    response.vary.add('Authorization')
+    return response
+
+
+def not_modified(etag, policy):
+    """
+    Answer a conditional GET whose If-None-Match already has this version
+
+    Call it before loading or serializing the rest of the response.
+
+    Args:
+        etag (str): Tag returned by compute_etag()
+        policy (str): Cache policy name, configured as CACHE_CONTROL_<POLICY>
+
+    Returns:
+        Response: An empty 304 response, or None if the full body must be sent
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return cache_headers(current_app.response_class(status=304), etag, policy)
@@ -0,0 +1,277 @@
+import base64
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from app.models.idempotency_key import IdempotencyKey
+from app.utils.cache import TTLCache
+
+MAX_KEY_LENGTH = 255
+# Headers worth replaying; the rest are recomputed for the replayed response
+_REPLAYED_HEADERS = ['Content-Type', 'Location']
+
+
+class MemoryIdempotencyStore:
+    """
+    Idempotency records kept in this worker's memory, bounded and expiring
+
+    Retries that reach another worker are not deduplicated, so gunicorn
+    refuses to start more than one worker when it is configured (see
+    gunicorn.conf.py). Meant for development and single-worker setups.
+    """
+
+    shared = False
+
+    def __init__(self, maxsize=10000):
+        self._records = TTLCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def reserve(self, key, record, ttl):
+        with self._lock:
+            existing = self._records.get(key)
+            if existing is not None:
+                return existing
+            self._records.set(key, record, ttl)
+            return None
+
+    def save(self, key, record, ttl):
+        self._records.set(key, record, ttl)
+
+    def release(self, key):
+        self._records.delete(key)
+
+
+class DatabaseIdempotencyStore:
+    """
+    Idempotency records shared by every worker through the idempotency_keys table
+
+    The default store. A key is reserved by inserting its row, so the unique
+    constraint lets only one worker handle it. Records run on their own
+    connection to the primary, never committing the request's session.
+    Expired rows are ignored and deleted when their key is reused; `flask
+    purge-idempotency-keys` deletes the rest.
+    """
+
+    shared = True
+
+    def reserve(self, key, record, ttl):
+        from app import db
+
+        table = IdempotencyKey.__table__
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(table.delete().where(table.c.key == key, table.c.expires_at <= now))
+                connection.execute(table.insert().values(
+                    key=key, record=record, created_at=now, expires_at=now + timedelta(seconds=ttl)
+                ))
+            return None
+        except IntegrityError:
+            pass
+
+        with db.engine.connect() as connection:
+            existing = connection.execute(db.select(table.c.record).where(table.c.key == key)).scalar()
+        if existing is None:
+            # Released in between; treat it as still being processed and let the client retry
+            return dict(record, state='pending')
+        return existing
+
+    def save(self, key, record, ttl):
+        from app import db
+
+        table = IdempotencyKey.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.update().where(table.c.key == key).values(
+                record=record, expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+            ))
+
+    def release(self, key):
+        from app import db
+
+        table = IdempotencyKey.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.delete().where(table.c.key == key))
+
+    def purge_expired(self):
+        """
+        Delete expired records
+
+        Returns:
+            int: Number of records deleted
+        """
+        from app import db
+
+        table = IdempotencyKey.__table__
+        with db.engine.begin() as connection:
+            return connection.execute(table.delete().where(table.c.expires_at <= datetime.utcnow())).rowcount
+
+
+class RedisIdempotencyStore:
+    """
+    Idempotency records shared by every worker through Redis
+
+    Records are reserved with SET NX so only one worker handles a key.
+    Requires the optional redis package.
+    """
+
+    shared = True
+
+    def __init__(self, url, prefix='idempotency:'):
+        import redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def reserve(self, key, record, ttl):
+        if self._client.set(self.prefix + key, json.dumps(record), nx=True, ex=max(1, int(ttl))):
+            return None
+        existing = self._client.get(self.prefix + key)
+        if existing is None:
+            # Expired in between; treat it as still being processed and let the client retry
+            return dict(record, state='pending')
+        return json.loads(existing)
+
+    def save(self, key, record, ttl):
+        self._client.set(self.prefix + key, json.dumps(record), ex=max(1, int(ttl)))
+
+    def release(self, key):
+        self._client.delete(self.prefix + key)
+
+
+class IdempotencyManager:
+    """
+    Replays the stored response of a POST retried with the same Idempotency-Key
+
+    Keys are scoped per user and endpoint. The first request with a key runs
+    the endpoint and its response is kept for IDEMPOTENCY_TTL seconds. A retry
+    with the same body gets that response back, a retry while the first is
+    still running gets 409, and reusing the key for a different body gets
+    422. Server errors and rate limited responses are not kept, so those can
+    be retried.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.ttl = 86400
+        self.lock_timeout = 60
+        self.store = DatabaseIdempotencyStore()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('IDEMPOTENCY_ENABLED', True)
+        self.ttl = app.config.get('IDEMPOTENCY_TTL', 86400)
+        self.lock_timeout = app.config.get('IDEMPOTENCY_LOCK_TIMEOUT', 60)
+
+        storage_url = app.config.get('IDEMPOTENCY_STORAGE_URL') or 'database://'
+        if storage_url.startswith('redis://') or storage_url.startswith('rediss://'):
+            self.store = RedisIdempotencyStore(storage_url)
+        elif storage_url.startswith('memory://'):
+            self.store = MemoryIdempotencyStore(app.config.get('IDEMPOTENCY_MAX_KEYS', 10000))
+        else:
+            self.store = DatabaseIdempotencyStore()
+
+    def check_workers(self, workers):
+        """
+        Make sure retries are deduplicated whichever worker they reach
+
+        Args:
+            workers (int): Number of worker processes serving the app
+
+        Raises:
+            RuntimeError: If several workers would each keep their own records
+        """
+        if self.enabled and workers > 1 and not self.store.shared:
+            raise RuntimeError(
+                f'IDEMPOTENCY_STORAGE_URL=memory:// keeps keys in worker memory but {workers} workers are '
+                'configured; use the default database:// store or a redis:// URL, or run one worker'
+            )
+
+    def _scoped_key(self, key):
+        try:
+            user_id = get_jwt_identity()
+        except RuntimeError:
+            user_id = None
+        return f'{user_id}:{request.method}:{request.path}:{key}'
+
+    def _replay(self, record):
+        response = current_app.response_class(
+            base64.b64decode(record['body']),
+            status=record['status']
+        )
+        for name, value in record['headers']:
+            response.headers[name] = value
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    def handle(self, key, view, args, kwargs):
+        """
+        Run a view once per idempotency key, replaying its response afterwards
+
+        Args:
+            key (str): Idempotency-Key header value
+            view: View function
+            args (tuple): Positional view arguments
+            kwargs (dict): Keyword view arguments
+
+        Returns:
+            Response: The view's response, or the stored one for a retry
+        """
+        scoped_key = self._scoped_key(key)
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+
+        existing = self.store.reserve(
+            scoped_key,
+            {'state': 'pending', 'fingerprint': fingerprint},
+            self.lock_timeout
+        )
+        if existing is not None:
+            if existing['fingerprint'] != fingerprint:
+                return jsonify({'message': 'Idempotency-Key was already used for a different request'}), 422
+            if existing['state'] == 'pending':
+                response = jsonify({'message': 'A request with this Idempotency-Key is still being processed'})
+                response.headers['Retry-After'] = '1'
+                return response, 409
+            return self._replay(existing)
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            self.store.release(scoped_key)
+            raise
+
+        if response.status_code >= 500 or response.status_code == 429 or response.is_streamed:
+            self.store.release(scoped_key)
+            return response
+
+        self.store.save(scoped_key, {
+            'state': 'done',
+            'fingerprint': fingerprint,
+            'status': response.status_code,
+            'headers': [(name, response.headers[name]) for name in _REPLAYED_HEADERS if name in response.headers],
+            'body': base64.b64encode(response.get_data()).decode('ascii')
+        }, self.ttl)
+        return response
+
+
+idempotency = IdempotencyManager()
+
+
+def idempotent(fn):
+    """
+    Decorator honouring the Idempotency-Key header on an endpoint
+
+    Place it below @jwt_required so keys are scoped per user. Requests
+    without the header are handled as usual.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not idempotency.enabled or key is None:
+            return fn(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({'message': f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters'}), 400
+        return idempotency.handle(key, fn, args, kwargs)
+    return wrapper
@@ -0,0 +1,182 @@
+import threading
+import time
+from contextlib import contextmanager
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_local = threading.local()
+_listening = False
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block or request runs more queries than allowed"""
+
+
+class QueryCounter:
+    """Counts the SQL statements run on the current thread while it is active"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self, threshold):
+        """
+        Statements run at least `threshold` times, the usual sign of an N+1 pattern
+
+        Args:
+            threshold (int): Smallest number of runs reported
+
+        Returns:
+            list: (statement, runs) pairs, most repeated first
+        """
+        repeated = [(statement, runs) for statement, runs in self.statements.items() if runs >= threshold]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+    def describe(self):
+        lines = [f'{self.count} queries in {self.seconds * 1000:.1f} ms']
+        for statement, runs in self.repeated(1):
+            lines.append(f'  {runs} x {" ".join(statement.split())[:200]}')
+        return '\n'.join(lines)
+
+
+def _active_counters():
+    if not hasattr(_local, 'counters'):
+        _local.counters = []
+    return _local.counters
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info['query_started'].pop()
+    for counter in _active_counters():
+        counter.record(statement, seconds)
+
+
+def _listen():
+    global _listening
+    if not _listening:
+        # Listening on the Engine class covers the primary, replica and any later engines
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the queries run on this thread inside the block
+
+    Yields:
+        QueryCounter: Counter updated as queries run
+    """
+    _listen()
+    counter = QueryCounter()
+    counters = _active_counters()
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """
+    Fail if the block runs more than `limit` queries
+
+    Wrap a test client call to pin an endpoint's query budget:
+
+        with assert_max_queries(3):
+            client.get('/api/v1/auth/me', headers=headers)
+
+    Args:
+        limit (int): Largest number of queries allowed
+
+    Raises:
+        QueryBudgetExceeded: With the statements that ran, when over the limit
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        raise QueryBudgetExceeded(f'Expected at most {limit} queries, got {counter.describe()}')
+
+
+class RequestQueryStats:
+    """
+    Counts the queries and database time of each request
+
+    With QUERY_STATS_HEADERS set, responses carry X-Query-Count and
+    X-Query-Time (milliseconds). Requests running more than
+    QUERY_COUNT_WARNING queries, or one statement at least
+    QUERY_REPEAT_WARNING times (an N+1 pattern such as a lazy relationship
+    loaded in a loop), are logged. With QUERY_BUDGET_RAISE set, as in the
+    testing configuration, they fail with QueryBudgetExceeded instead.
+    Queries run by a streamed response body are counted after the
+    response is sent, so they are not in its headers.
+    """
+
+    def __init__(self):
+        self.headers = False
+        self.count_warning = 20
+        self.repeat_warning = 5
+        self.raise_on_budget = False
+
+    def init_app(self, app):
+        self.headers = app.config.get('QUERY_STATS_HEADERS', False)
+        self.count_warning = app.config.get('QUERY_COUNT_WARNING', 20)
+        self.repeat_warning = app.config.get('QUERY_REPEAT_WARNING', 5)
+        self.raise_on_budget = app.config.get('QUERY_BUDGET_RAISE', False)
+        _listen()
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._stop)
+
+    def _start(self):
+        counter = QueryCounter()
+        request.environ['realtex.query_counter'] = counter
+        _active_counters().append(counter)
+
+    def _check_budget(self, counter):
+        problems = []
+        if counter.count > self.count_warning:
+            problems.append(f'{counter.count} queries (limit {self.count_warning})')
+        repeated = counter.repeated(self.repeat_warning)
+        if repeated:
+            problems.append(f'{len(repeated)} statements repeated at least {self.repeat_warning} times')
+        if not problems:
+            return
+
+        message = f'Query budget exceeded by {request.method} {request.path}: {", ".join(problems)}\n{counter.describe()}'
+        if self.raise_on_budget:
+            raise QueryBudgetExceeded(message)
+        print(f"Warning: {message}")
+
+    def _finish(self, response):
+        counter = request.environ.get('realtex.query_counter')
+        if counter is None:
+            return response
+
+        if self.headers:
+            response.headers['X-Query-Count'] = str(counter.count)
+            response.headers['X-Query-Time'] = f'{counter.seconds * 1000:.2f}'
+        self._check_budget(counter)
+        return response
+
+    def _stop(self, exc):
+        counter = request.environ.pop('realtex.query_counter', None)
+        counters = _active_counters()
+        if counter is not None and counter in counters:
+            counters.remove(counter)
+
+
+request_query_stats = RequestQueryStats()
@@ -0,0 +1,219 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_rate(value):
+    """
+    Parse a rate limit such as '120/minute'
+
+    Args:
+        value (str): Limit in the form '<count>/<second|minute|hour|day>'
+
+    Returns:
+        tuple: (refill rate in tokens per second, bucket capacity)
+    """
+    count, _, period = value.partition('/')
+    count = int(count)
+    seconds = _PERIODS[period.strip().rstrip('s') or 'second']
+    return count / float(seconds), count
+
+
+class MemoryBucketStore:
+    """
+    Token buckets kept in this worker's memory
+
+    Each bucket is a (tokens, updated_at, full_at) tuple keyed by client.
+    Buckets that have refilled completely carry no information, so they are
+    swept every evict_interval seconds to keep the table small.
+    """
+
+    def __init__(self, evict_interval=60):
+        self.evict_interval = evict_interval
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last_evict = time.monotonic()
+
+    def consume(self, keys, rate, capacity, cost=1):
+        """
+        Take `cost` tokens from every bucket, or from none if any is short
+
+        Args:
+            keys (list): Bucket keys that must all allow the request
+            rate (float): Refill rate in tokens per second
+            capacity (int): Bucket capacity
+
+        Returns:
+            tuple: (allowed, seconds until the request would be allowed)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_evict >= self.evict_interval:
+                self._evict(now)
+
+            levels = []
+            for key in keys:
+                tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+                levels.append(min(capacity, tokens + (now - updated_at) * rate))
+
+            wait = max([(cost - tokens) / rate for tokens in levels if tokens < cost], default=0)
+            allowed = wait == 0
+            for key, tokens in zip(keys, levels):
+                if allowed:
+                    tokens -= cost
+                self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            return allowed, wait
+
+    def _evict(self, now):
+        stale = [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]
+        for key in stale:
+            del self._buckets[key]
+        self._last_evict = now
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / rate)
+    end
+    levels[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - cost
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+if wait == 0 then
+    return {1, '0'}
+end
+return {0, tostring(wait)}
+"""
+
+
+class RedisBucketStore:
+    """
+    Token buckets shared by every worker through Redis
+
+    The refill and consume step for all of a request's buckets runs as a
+    single Lua script so concurrent workers never race on the same bucket.
+    Requires the optional redis package.
+    """
+
+    def __init__(self, url, prefix='ratelimit:'):
+        import redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    def consume(self, keys, rate, capacity, cost=1):
+        allowed, retry_after = self._script(
+            keys=[self.prefix + key for key in keys],
+            args=[rate, capacity, time.time(), cost]
+        )
+        return bool(allowed), float(retry_after)
+
+
+class RateLimiter:
+    """
+    Per-client token bucket rate limiting for selected endpoints
+
+    Requests are limited per client IP and, when a JWT has been verified, per
+    user id. A request is only charged when every bucket allows it, so
+    rejected requests do not use up quota. Behind a reverse proxy the client
+    IP comes from X-Forwarded-For via ProxyFix (see PROXY_FIX_X_FOR). Limits
+    are configured per scope as RATELIMIT_<SCOPE>, e.g.
+    RATELIMIT_PREDICTIONS = '120/minute'.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.store = MemoryBucketStore()
+        self._limits = {}
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self._limits = {}
+
+        storage_url = app.config.get('RATELIMIT_STORAGE_URL') or 'memory://'
+        if storage_url.startswith('redis://') or storage_url.startswith('rediss://'):
+            self.store = RedisBucketStore(storage_url)
+        else:
+            self.store = MemoryBucketStore(app.config.get('RATELIMIT_EVICT_INTERVAL', 60))
+
+    def _get_limit(self, scope):
+        limit = self._limits.get(scope)
+        if limit is None:
+            limit = parse_rate(current_app.config[f'RATELIMIT_{scope.upper()}'])
+            self._limits[scope] = limit
+        return limit
+
+    def hit(self, scope):
+        """
+        Consume one token for the current request from every applicable bucket
+
+        Args:
+            scope (str): Rate limit scope, e.g. 'predictions' or 'login'
+
+        Returns:
+            float: Seconds until the request would be allowed, 0 if allowed now
+        """
+        rate, capacity = self._get_limit(scope)
+
+        keys = [f'{scope}:ip:{request.remote_addr}']
+        try:
+            user_id = get_jwt_identity()
+        except RuntimeError:
+            user_id = None
+        if user_id is not None:
+            keys.append(f'{scope}:user:{user_id}')
+
+        allowed, retry_after = self.store.consume(keys, rate, capacity)
+        return 0 if allowed else retry_after
+
+
+rate_limiter = RateLimiter()
+
+
+def rate_limit(scope):
+    """
+    Decorator enforcing the rate limit of a scope on an endpoint
+
+    Place it below @jwt_required so requests are also limited per user.
+
+    Args:
+        scope (str): Rate limit scope, e.g. 'predictions' or 'login'
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if rate_limiter.enabled:
+                retry_after = rate_limiter.hit(scope)
+                if retry_after:
+                    response = jsonify({'message': 'Too many requests'})
+                    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                    return response, 429
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
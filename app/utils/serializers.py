@@ -0,0 +1,188 @@
+import dataclasses
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from operator import attrgetter
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _identity(value):
+    return value
+
+
+def _converter_for(column):
+    python_type = None
+    try:
+        python_type = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        pass
+    if python_type in (datetime, date):
+        return _isoformat
+    return _identity
+
+
+class ModelSerializer:
+    """
+    Serializes model instances and column-only rows with precompiled accessors
+
+    The attribute getters and value converters for each field are built once
+    on first use instead of being looked up for every row.
+
+    Args:
+        model: SQLAlchemy model class
+        fields (list): Column attribute names to serialize, in output order
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = list(fields)
+        self._compiled = None
+        self._row_converters = {}
+
+    def compile(self):
+        """Build the per-field accessors now instead of on first use"""
+        columns = self.model.__table__.columns
+        compiled = []
+        for name in self.fields:
+            compiled.append((name, attrgetter(name), _converter_for(columns[name])))
+        self._compiled = compiled
+        return compiled
+
+    def to_dict(self, obj):
+        """
+        Serialize a model instance
+
+        Args:
+            obj: Model instance
+
+        Returns:
+            dict: JSON-ready dict of the configured fields
+        """
+        compiled = self._compiled or self.compile()
+        return {name: convert(getter(obj)) for name, getter, convert in compiled}
+
+    def _row_converter(self, fields):
+        fields = tuple(fields)
+        converter = self._row_converters.get(fields)
+        if converter is None:
+            columns = self.model.__table__.columns
+            converter = [(name, _converter_for(columns[name])) for name in fields]
+            self._row_converters[fields] = converter
+        return converter
+
+    def row_to_dict(self, row, fields):
+        """
+        Serialize a column-only result row
+
+        Args:
+            row (Row): Result row with one value per field
+            fields (list): Field names matching the row columns
+
+        Returns:
+            dict: JSON-ready dict
+        """
+        converter = self._row_converter(fields)
+        return {name: convert(value) for (name, convert), value in zip(converter, row)}
+
+    def encode_rows(self, rows, fields):
+        """
+        Encode column-only rows straight to the bytes of JSON array elements
+
+        Args:
+            rows (list): Result rows
+            fields (list): Field names matching the row columns
+
+        Returns:
+            bytes: Comma separated JSON objects, without the enclosing brackets
+        """
+        converter = self._row_converter(fields)
+        items = [{name: convert(value) for (name, convert), value in zip(converter, row)} for row in rows]
+        return dumps(items)[1:-1]
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(obj, sort_keys=False):
+    """
+    Encode an object to JSON bytes, using orjson when it is installed
+
+    Datetimes are written in ISO 8601, as in the streamed listings and exports.
+
+    Args:
+        obj: Object to encode
+        sort_keys (bool): Whether to sort dict keys
+
+    Returns:
+        bytes: Encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(obj, default=_default, sort_keys=sort_keys, separators=(',', ':')).encode('utf-8')
+
+
+def _response_default(value):
+    # The conversions of Flask's default provider, so responses read the same with either encoder
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _dumps_response(obj, sort_keys):
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, default=_response_default, option=option)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes responses with orjson when available
+
+    Falls back to Flask's default encoder when orjson is not installed, when
+    it is disabled with JSON_FAST_ENCODER, or for pretty-printed debug output.
+    Values JSON has no type for are converted as Flask's encoder does, e.g.
+    datetimes to HTTP dates.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs or not self._app.config.get('JSON_FAST_ENCODER', True):
+            return super().dumps(obj, **kwargs)
+        return _dumps_response(obj, self.sort_keys).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        app = self._app
+        if orjson is None or not app.config.get('JSON_FAST_ENCODER', True) or (
+            self.compact is None and app.debug
+        ) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return app.response_class(_dumps_response(obj, self.sort_keys), mimetype=self.mimetype)
@@ -0,0 +1,137 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+# Run in a fresh interpreter so the measurement covers a cold worker boot
+_PROFILE_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app(sys.argv[1])
+finished = time.perf_counter()
+import json
+print(json.dumps({
+    'import_seconds': imported - started,
+    'create_app_seconds': finished - imported,
+    'total_seconds': finished - started,
+    'steps': app.extensions['startup_timings'].steps
+}))
+"""
+
+
+class StartupTimer:
+    """
+    Records how long each phase of create_app takes
+
+    Call mark() at the end of each phase; it records the time elapsed since
+    the previous mark.
+    """
+
+    def __init__(self):
+        self.steps = []
+        self._last = time.perf_counter()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.steps.append((name, now - self._last))
+        self._last = now
+
+
+def _parse_importtime(output, depth=1):
+    """
+    Sum the cumulative import time of modules nested at most `depth` levels deep
+
+    Args:
+        output (str): stderr of `python -X importtime`
+        depth (int): 1 for top-level imports only
+
+    Returns:
+        list: (module, seconds) pairs, slowest first
+    """
+    totals = {}
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        level = (len(indent) - 1) // 2
+        if level < depth:
+            totals[module] = totals.get(module, 0) + int(cumulative) / 1e6
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def profile_startup(config_name='production', depth=1):
+    """
+    Time a cold application start in a fresh interpreter
+
+    Args:
+        config_name (str): Configuration to start the application with
+        depth (int): Import nesting depth reported per module
+
+    Returns:
+        dict: Import, create_app and total seconds, create_app steps and per-module import times
+    """
+    # A worker is not started by the flask command, so drop its marker from the environment
+    env = {key: value for key, value in os.environ.items() if key != 'FLASK_RUN_FROM_CLI'}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROFILE_SCRIPT, config_name],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'Application failed to start:\n{result.stderr[-2000:]}')
+
+    profile = json.loads(result.stdout.strip().splitlines()[-1])
+    profile['imports'] = _parse_importtime(result.stderr, depth)
+    return profile
+
+
+def load_history(path):
+    """
+    Read previous startup measurements
+
+    Args:
+        path (str): JSON lines history file
+
+    Returns:
+        list: History entries, oldest first
+    """
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as history_file:
+        return [json.loads(line) for line in history_file if line.strip()]
+
+
+def record_history(path, profile, config_name, target):
+    """
+    Append a startup measurement to the history file
+
+    Args:
+        path (str): JSON lines history file
+        profile (dict): Result of profile_startup()
+        config_name (str): Configuration that was profiled
+        target (float): Startup time target in seconds
+
+    Returns:
+        dict: The recorded entry
+    """
+    entry = {
+        'recorded_at': datetime.utcnow().isoformat(),
+        'config': config_name,
+        'total_seconds': round(profile['total_seconds'], 4),
+        'import_seconds': round(profile['import_seconds'], 4),
+        'create_app_seconds': round(profile['create_app_seconds'], 4),
+        'target_seconds': target
+    }
+    with open(path, 'a') as history_file:
+        history_file.write(json.dumps(entry) + '\n')
+    return entry
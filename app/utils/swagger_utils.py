@@ -1,5 +1,71 @@
-from flask import Flask
-from flasgger import Swagger
+import hashlib
+import json
+import os
+import threading
+from flask import Flask, current_app, request
+
+
+class ApiSpecCache:
+    """
+    Serves the OpenAPI spec from bytes built once instead of on every request
+
+    The spec is read from SWAGGER_SPEC_FILE when that file exists (written at
+    build time with `flask build-apispec`), otherwise generated from the view
+    docstrings on the first request. Responses carry an ETag so clients and
+    crawlers revalidate with a 304.
+
+    Args:
+        get_swagger: Callable returning the flasgger extension, called on first build
+        endpoint (str): Spec endpoint name in the flasgger config
+        spec_file (str): Optional path of a prebuilt spec
+    """
+
+    def __init__(self, get_swagger, endpoint='apispec', spec_file=None):
+        self.get_swagger = get_swagger
+        self.endpoint = endpoint
+        self.spec_file = spec_file
+        self._body = None
+        self._etag = None
+        self._lock = threading.Lock()
+
+    def build(self):
+        """
+        Generate the spec from the registered views
+
+        Returns:
+            bytes: Spec encoded as JSON
+        """
+        return json.dumps(self.get_swagger().get_apispecs(self.endpoint), sort_keys=True).encode('utf-8')
+
+    def write(self, path):
+        """
+        Generate the spec and save it for later startups
+
+        Args:
+            path (str): Destination file
+        """
+        with open(path, 'wb') as spec_file:
+            spec_file.write(self.build())
+
+    def _load(self):
+        with self._lock:
+            if self._body is None:
+                if self.spec_file and os.path.exists(self.spec_file):
+                    with open(self.spec_file, 'rb') as spec_file:
+                        body = spec_file.read()
+                else:
+                    body = self.build()
+                self._etag = hashlib.sha256(body).hexdigest()[:32]
+                self._body = body
+        return self._body, self._etag
+
+    def view(self):
+        body, etag = self._load()
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response.make_conditional(request)
+
 
 def configure_swagger(app):
     """
@@ -19,7 +85,7 @@ def configure_swagger(app):
             }
         ],
         "static_url_path": "/flasgger_static",
-        "swagger_ui": True,
+        "swagger_ui": app.config.get('SWAGGER_UI_ENABLED', True),
         "specs_route": "/api/docs/"
     }
     
@@ -62,4 +128,25 @@ def configure_swagger(app):
         ]
     }
     
-    Swagger(app, config=swagger_config, template=swagger_template)
+    spec_file = app.config.get('SWAGGER_SPEC_FILE')
+    
+    if swagger_config['swagger_ui']:
+        from flasgger import Swagger
+        swagger = Swagger(app, config=swagger_config, template=swagger_template)
+        # flasgger rebuilds and re-encodes the spec on every request; serve cached bytes instead
+        spec_cache = ApiSpecCache(lambda: swagger, 'apispec', spec_file)
+        app.view_functions['flasgger.apispec'] = spec_cache.view
+    else:
+        def load_swagger():
+            # Without the UI flasgger is only needed to build the spec, so it
+            # is imported on first use, or never when a prebuilt spec exists
+            from flasgger import Swagger
+            swagger = Swagger(config=swagger_config, template=swagger_template)
+            swagger.app = app
+            swagger.load_config(app)
+            return swagger
+        
+        spec_cache = ApiSpecCache(load_swagger, 'apispec', spec_file)
+        app.add_url_rule('/apispec.json', 'apispec', spec_cache.view)
+    
+    app.extensions['apispec_cache'] = spec_cache
@@ -0,0 +1,87 @@
+from functools import wraps
+import yaml
+from flask import jsonify, request
+from jsonschema import Draft4Validator
+
+
+def body_schema_from_docstring(fn):
+    """
+    Extract the JSON body schema from a view's flasgger YAML docstring
+
+    Args:
+        fn: View function whose docstring has a YAML section after '---'
+
+    Returns:
+        dict: Schema of the 'in: body' parameter, or None if there is none
+    """
+    doc = fn.__doc__ or ''
+    _, separator, spec = doc.partition('---')
+    if not separator:
+        return None
+    for parameter in (yaml.safe_load(spec) or {}).get('parameters', []):
+        if parameter.get('in') == 'body':
+            return parameter.get('schema')
+    return None
+
+
+def _field(path):
+    return '.'.join(str(part) for part in path) or None
+
+
+def format_errors(errors):
+    """
+    Turn jsonschema validation errors into JSON-ready error entries
+
+    Args:
+        errors: ValidationError instances
+
+    Returns:
+        list: Dicts with the offending field (None for the whole body) and a message
+    """
+    result = []
+    missing = set()
+    for error in sorted(errors, key=lambda error: list(error.absolute_path)):
+        if error.validator == 'required':
+            # jsonschema may raise one error per missing field; report each field once
+            prefix = _field(error.absolute_path)
+            for name in error.validator_value:
+                field = f'{prefix}.{name}' if prefix else name
+                if name not in error.instance and field not in missing:
+                    missing.add(field)
+                    result.append({'field': field, 'message': f'Missing required field: {field}'})
+            continue
+        field = _field(error.absolute_path)
+        if field is None:
+            result.append({'field': None, 'message': f'Invalid request body: {error.message}'})
+        else:
+            result.append({'field': field, 'message': f'Invalid value for {field}: {error.message}'})
+    return result
+
+
+def validate_json(fn):
+    """
+    Decorator validating the JSON body against the schema in the view's docstring
+
+    The schema is compiled once when the view is defined. Invalid requests
+    get a 400 whose 'message' is the first problem and whose 'errors' lists
+    all of them.
+    """
+    schema = body_schema_from_docstring(fn)
+    if schema is None:
+        raise ValueError(f'{fn.__name__} has no body parameter schema in its docstring')
+    Draft4Validator.check_schema(schema)
+    validator = Draft4Validator(schema)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({'message': 'No data provided'}), 400
+
+        errors = format_errors(validator.iter_errors(data))
+        if errors:
+            return jsonify({'message': errors[0]['message'], 'errors': errors}), 400
+        return fn(*args, **kwargs)
+
+    wrapper.body_validator = validator
+    return wrapper
@@ -0,0 +1,80 @@
+"""
+Gunicorn configuration
+
+    FLASK_CONFIG=production gunicorn -c gunicorn.conf.py
+
+The app is loaded and warmed up once in the master, then forked, so the
+workers share its memory copy-on-write. Each forked worker discards the
+inherited database pool (see app.utils.db_pool) and opens its own
+connections. Worker and thread counts are derived from the CPUs available
+to the process and GUNICORN_WORKLOAD:
+
+- io (default): requests mostly wait on the database and mail server, so
+  2 x CPUs + 1 workers each run GUNICORN_THREADS threads
+- cpu: requests mostly compute (scoring, password hashing), so one
+  single-threaded worker per CPU avoids fighting over the GIL
+
+GUNICORN_WORKERS and GUNICORN_THREADS override the computed values.
+"""
+import os
+
+
+def _cpu_count():
+    # Respects CPU affinity (cgroup cpusets) where the platform exposes it
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+cpus = _cpu_count()
+workload = os.environ.get('GUNICORN_WORKLOAD', 'io').lower()
+
+if workload == 'cpu':
+    default_workers = cpus
+    default_threads = 1
+else:
+    default_workers = 2 * cpus + 1
+    default_threads = 4
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', default_workers))
+threads = int(os.environ.get('GUNICORN_THREADS', default_threads))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+preload_app = True
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then so slow leaks cannot build up; jitter avoids restarting them all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 500))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    from app.utils.idempotency import idempotency
+
+    # Loads the app unless preload_app already did; a RuntimeError stops gunicorn with its message
+    server.app.wsgi()
+    idempotency.check_workers(workers)
+
+
+def post_worker_init(worker):
+    from app.services.email_service import outbox_sender
+
+    # Threads do not survive the fork from the preloaded master; send leftover outbox mail right away
+    outbox_sender.start()
+
+
+def when_ready(server):
+    from app.utils.warmup import warm_up
+
+    server.log.info(f'Workload {workload}: {workers} workers x {threads} threads on {cpus} CPUs')
+    for name, seconds in warm_up(server.app.wsgi()):
+        server.log.info(f'Warmed up {name} in {seconds * 1000:.1f} ms')
+
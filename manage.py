@@ -1,11 +1,10 @@
+import click
 from flask import Flask
-from flask_migrate import Migrate
 
 # Import db and create_app directly
 from app import db, create_app
 
 app = create_app('development')
-migrate = Migrate(app, db)
 
 @app.cli.command('init-db')
 def init_db():
@@ -39,5 +38,203 @@ def create_admin():
     
     print(f'Admin user {admin_email} created successfully')
 
+@app.cli.command('import-users')
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--no-email', is_flag=True, help='Create the users without sending invitation emails')
+def import_users(csv_path, no_email):
+    """Invite users in bulk from a CSV file"""
+    from app.services.user_import_service import parse_invitation_csv, import_invitations
+    
+    with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+        invitations, errors = parse_invitation_csv(csv_file)
+    
+    for error in errors:
+        print(f"Line {error['line']}: {error['message']}")
+    
+    summary = import_invitations(invitations, send_emails=not no_email, wait_for_emails=True)
+    print(f"Created {summary['created']} users, skipped {summary['existing']} existing "
+          f"and {summary['duplicates']} duplicate rows, {len(errors)} invalid rows")
+
+@app.cli.command('import-properties')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='Feed format, guessed from the file name by default')
+@click.option('--chunk-size', type=int, help='Rows loaded per transaction')
+def import_property_feed(path, fmt, chunk_size):
+    """Upsert properties from a CSV or NDJSON listing feed"""
+    from app.services.property_import_service import ImportInterrupted, detect_format, import_properties
+    
+    fmt = fmt or detect_format(path)
+    chunk_size = chunk_size or app.config['PROPERTY_IMPORT_CHUNK_SIZE']
+    interrupted = None
+    with open(path, newline='', encoding='utf-8-sig') as feed:
+        try:
+            summary = import_properties(feed, fmt, chunk_size=chunk_size)
+        except ImportInterrupted as e:
+            interrupted = e
+            summary = e.summary
+    
+    for error in summary['errors']:
+        print(f"Line {error['line']}: {error['message']}")
+    print(f"Loaded {summary['loaded']} properties, {summary['duplicates']} duplicate and "
+          f"{summary['invalid']} invalid rows in {summary['seconds']:.1f}s ({summary['rows_per_second']:.0f} rows/s)")
+    if interrupted:
+        print(f"Error: {str(interrupted)}")
+        print('Fix the feed or database and run the import again; committed rows are updated in place')
+        raise SystemExit(1)
+
+@app.cli.command('export-properties')
+@click.argument('path', default='-')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default='csv', help='Output format')
+@click.option('--city', help='Only properties in this city')
+@click.option('--country', help='Only properties in this country')
+@click.option('--property-type', help='Only properties of this type')
+def export_property_feed(path, fmt, city, country, property_type):
+    """Export properties with their latest prediction; gzip compressed when PATH ends in .gz"""
+    import gzip
+    import sys
+    from app.services.property_export_service import parse_export_filters, stream_export
+    
+    filters = parse_export_filters({'city': city or '', 'country': country or '', 'property_type': property_type or ''})
+    if path == '-':
+        output = sys.stdout.buffer
+    elif path.endswith('.gz'):
+        output = gzip.open(path, 'wb')
+    else:
+        output = open(path, 'wb')
+    
+    try:
+        for chunk in stream_export(filters, fmt):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+@app.cli.command('send-outbox')
+def send_outbox():
+    """Send every due email in the outbox"""
+    from app.services.email_service import outbox_sender
+    
+    processed = outbox_sender.drain()
+    print(f'Processed {processed} outbox emails')
+
+@app.cli.command('purge-revoked-tokens')
+def purge_revoked_tokens():
+    """Delete revoked token entries past the token lifetime"""
+    from app.services.token_blocklist import token_blocklist
+    
+    print(f'Purged {token_blocklist.purge_expired()} expired revoked tokens')
+
+@app.cli.command('purge-idempotency-keys')
+def purge_idempotency_keys():
+    """Delete idempotency records past IDEMPOTENCY_TTL"""
+    from app.utils.idempotency import DatabaseIdempotencyStore, idempotency
+    
+    if not isinstance(idempotency.store, DatabaseIdempotencyStore):
+        print('Idempotency keys are not stored in the database; nothing to purge')
+        return
+    print(f'Purged {idempotency.store.purge_expired()} expired idempotency keys')
+
+@app.cli.command('build-apispec')
+@click.argument('path', default='apispec.json')
+def build_apispec(path):
+    """Write the OpenAPI spec to a file, to be served via SWAGGER_SPEC_FILE"""
+    with app.test_request_context():
+        app.extensions['apispec_cache'].write(path)
+    print(f'API spec written to {path}')
+
+@app.cli.command('startup-profile')
+@click.option('--config', 'config_name', default='production', help='Configuration to start the app with')
+@click.option('--top', default=15, help='Number of slowest imports to list')
+@click.option('--check', is_flag=True, help='Exit with an error if startup is slower than the target')
+@click.option('--no-history', is_flag=True, help='Do not record this run in the history file')
+def startup_profile(config_name, top, check, no_history):
+    """Measure cold startup time per import and create_app step"""
+    from app.utils.startup import profile_startup, load_history, record_history
+    
+    target = app.config['STARTUP_TIME_TARGET']
+    history_path = app.config['STARTUP_PROFILE_HISTORY']
+    profile = profile_startup(config_name)
+    
+    print(f'Slowest imports ({config_name}):')
+    for module, seconds in profile['imports'][:top]:
+        print(f'  {seconds * 1000:8.1f} ms  {module}')
+    print('create_app steps:')
+    for name, seconds in profile['steps']:
+        print(f'  {seconds * 1000:8.1f} ms  {name}')
+    print(f"Import: {profile['import_seconds']:.3f}s, create_app: {profile['create_app_seconds']:.3f}s, "
+          f"total: {profile['total_seconds']:.3f}s (target {target:.3f}s)")
+    
+    previous = [entry for entry in load_history(history_path) if entry['config'] == config_name]
+    if previous:
+        last = previous[-1]['total_seconds']
+        print(f"Previous run: {last:.3f}s ({profile['total_seconds'] - last:+.3f}s)")
+    if not no_history:
+        record_history(history_path, profile, config_name, target)
+    
+    if profile['total_seconds'] > target:
+        print('Startup is slower than the target')
+        if check:
+            raise SystemExit(1)
+
+@app.cli.command('check-query-plans')
+@click.option('--min-rows', default=10000, help='Smallest PostgreSQL table on which a sequential scan fails the check')
+@click.option('--verbose', is_flag=True, help='Print the plan of every query')
+def check_query_plans(min_rows, verbose):
+    """EXPLAIN the hot queries and fail if any scans a large table sequentially"""
+    from app.services.query_plan_service import check_query_plans as run_checks
+    
+    results = run_checks(min_rows=min_rows)
+    failed = [result for result in results if result['sequential_scans']]
+    for result in results:
+        status = 'SEQ SCAN ' + ', '.join(result['sequential_scans']) if result['sequential_scans'] else 'ok'
+        print(f"{result['name']}: {status}")
+        if verbose or result['sequential_scans']:
+            for line in result['plan']:
+                print(f'    {line}')
+    
+    print(f'{len(results) - len(failed)}/{len(results)} hot queries use an index')
+    if failed:
+        raise SystemExit(1)
+
+@app.cli.command('benchmark-hashing')
+@click.option('--requests', 'total', default=32, help='Number of simulated logins')
+@click.option('--concurrency', default=8, help='Number of concurrent clients')
+def benchmark_hashing(total, concurrency):
+    """Compare login hash verification inline versus on the bounded pool"""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from werkzeug.security import generate_password_hash, check_password_hash
+    from app.services.password_service import password_hasher, PasswordHasherBusy
+    
+    pwhash = generate_password_hash('benchmark-password', app.config['PASSWORD_HASH_METHOD'])
+    
+    def run(label, verify):
+        latencies = []
+        rejected = []
+        
+        def login():
+            started = time.perf_counter()
+            try:
+                verify(pwhash, 'benchmark-password')
+            except PasswordHasherBusy:
+                rejected.append(1)
+                return
+            latencies.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            for _ in range(total):
+                clients.submit(login)
+        elapsed = time.perf_counter() - started
+        
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+        p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000 if latencies else 0
+        print(f'{label}: {len(latencies) / elapsed:.1f} logins/s, '
+              f'p50 {p50:.0f}ms, p99 {p99:.0f}ms, rejected {len(rejected)}')
+    
+    run('inline', check_password_hash)
+    run(f'pool ({password_hasher.max_workers} workers)', password_hasher.verify)
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,39 @@
+"""user search indexes
+
+Indexes on lower(email), lower(first_name) and lower(last_name) for the
+admin user search: btree indexes for prefix matches and, on PostgreSQL,
+trigram indexes for substring matches. See User.__table_args__.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 15:09:51.627034
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+USER_SEARCH_COLUMNS = ['email', 'first_name', 'last_name']
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in USER_SEARCH_COLUMNS:
+            op.execute(f'CREATE INDEX ix_users_{column}_lower ON users (lower({column}) text_pattern_ops)')
+            op.execute(f'CREATE INDEX ix_users_{column}_trgm ON users USING gin (lower({column}) gin_trgm_ops)')
+    else:
+        for column in USER_SEARCH_COLUMNS:
+            op.create_index(f'ix_users_{column}_lower', 'users', [sa.text(f'lower({column})')])
+
+
+def downgrade():
+    for column in USER_SEARCH_COLUMNS:
+        op.execute(f'DROP INDEX IF EXISTS ix_users_{column}_lower')
+        op.execute(f'DROP INDEX IF EXISTS ix_users_{column}_trgm')
@@ -0,0 +1,44 @@
+"""hot query indexes
+
+Composite indexes for the area score lookup, property searches by location
+and the latest-prediction-per-property and per-model-version queries. The
+query plans are checked with `flask check-query-plans`.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 15:20:04.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('areas', schema=None) as batch_op:
+        batch_op.create_index('ix_areas_area_name_country', ['area_name', 'country'], unique=False)
+
+    with op.batch_alter_table('properties', schema=None) as batch_op:
+        batch_op.create_index('ix_properties_city_country_property_type', ['city', 'country', 'property_type'], unique=False)
+
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.create_index('ix_predictions_property_id_created_at', ['property_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_predictions_model_version', ['model_version'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('predictions', schema=None) as batch_op:
+        batch_op.drop_index('ix_predictions_model_version')
+        batch_op.drop_index('ix_predictions_property_id_created_at')
+
+    with op.batch_alter_table('properties', schema=None) as batch_op:
+        batch_op.drop_index('ix_properties_city_country_property_type')
+
+    with op.batch_alter_table('areas', schema=None) as batch_op:
+        batch_op.drop_index('ix_areas_area_name_country')
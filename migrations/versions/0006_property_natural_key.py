@@ -0,0 +1,29 @@
+"""property natural key
+
+Unique (country, postcode, address) so listing feed imports can upsert.
+Existing duplicates must be merged before upgrading.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 16:02:41.503127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('properties', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_properties_country_postcode_address', ['country', 'postcode', 'address'])
+
+
+def downgrade():
+    with op.batch_alter_table('properties', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_properties_country_postcode_address', type_='unique')
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import pytest
+
+# Run against a throwaway SQLite database unless TEST_DATABASE_URL points elsewhere
+_db_fd, _db_path = tempfile.mkstemp(suffix='.db')
+os.close(_db_fd)
+os.environ.setdefault('TEST_DATABASE_URL', f'sqlite:///{_db_path}')
+
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models.user import User
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    # Tokens carry the integer user id as their subject
+    app.config['JWT_VERIFY_SUB'] = False
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(email, password='password123', is_admin=False, is_active=True):
+        user = User(email=email, password=password, is_admin=is_admin)
+        user.is_active = is_active
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user('admin@realtex.ai', is_admin=True)
+
+
+@pytest.fixture
+def auth_headers(app):
+    def auth_headers(user):
+        return {'Authorization': 'Bearer ' + create_access_token(identity=user.id)}
+    return auth_headers
+
+
+@pytest.fixture
+def admin_headers(admin, auth_headers):
+    return auth_headers(admin)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if os.path.exists(_db_path):
+        os.remove(_db_path)
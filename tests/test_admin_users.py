@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models.revoked_token import RevokedToken
+from app.models.user import User, UNUSABLE_PASSWORD
+from app.services.principal_service import Principal, invalidate_principal, principal_cache
+from app.services.token_blocklist import token_blocklist
+
+
+def add_users(count, start=0):
+    db.session.execute(db.insert(User), [
+        {'email': f'user{i:03d}@example.com', 'password_hash': UNUSABLE_PASSWORD, 'is_active': i % 2 == 0}
+        for i in range(start, start + count)
+    ])
+    db.session.commit()
+
+
+def fetch_all(client, headers, query=''):
+    ids = []
+    cursor = None
+    while True:
+        url = f'/api/v1/admin/users?limit=10{query}' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        ids.extend(user['id'] for user in response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            return ids
+
+
+def test_keyset_pagination_walks_every_user_once(client, admin_headers):
+    add_users(25)
+    ids = fetch_all(client, admin_headers)
+    assert len(ids) == 26
+    assert ids == sorted(set(ids))
+
+
+def test_keyset_pagination_is_stable_under_inserts(client, admin_headers):
+    add_users(15)
+    first = client.get('/api/v1/admin/users?limit=10', headers=admin_headers)
+    cursor = first.headers['X-Next-Cursor']
+
+    add_users(5, start=100)
+    second = client.get(f'/api/v1/admin/users?limit=10&cursor={cursor}', headers=admin_headers)
+    first_ids = [user['id'] for user in first.get_json()]
+    second_ids = [user['id'] for user in second.get_json()]
+    assert not set(first_ids) & set(second_ids)
+    assert min(second_ids) > max(first_ids)
+
+
+def test_keyset_page_boundaries_and_cursors(client, admin, admin_headers):
+    add_users(19)
+    first = client.get('/api/v1/admin/users?limit=10', headers=admin_headers)
+    first_ids = [user['id'] for user in first.get_json()]
+    # The cursor is the last id of the page
+    assert first.headers['X-Next-Cursor'] == str(first_ids[-1])
+
+    # 20 users fill exactly two pages: the second one has no cursor
+    second = client.get(f"/api/v1/admin/users?limit=10&cursor={first.headers['X-Next-Cursor']}", headers=admin_headers)
+    second_ids = [user['id'] for user in second.get_json()]
+    assert len(second_ids) == 10
+    assert second_ids[0] > first_ids[-1]
+    assert 'X-Next-Cursor' not in second.headers
+
+    past_the_end = client.get(f'/api/v1/admin/users?limit=10&cursor={second_ids[-1]}', headers=admin_headers)
+    assert past_the_end.get_json() == []
+    assert 'X-Next-Cursor' not in past_the_end.headers
+
+
+def test_keyset_cursor_combines_with_filters(client, admin_headers):
+    add_users(30)
+    ids = fetch_all(client, admin_headers, '&active=false')
+    assert len(ids) == 15
+    assert ids == sorted(ids)
+
+
+def test_filters_and_sparse_fields(client, admin_headers):
+    add_users(10)
+    response = client.get('/api/v1/admin/users?active=false&fields=email', headers=admin_headers)
+    users = response.get_json()
+    assert len(users) == 5
+    assert set(users[0]) == {'id', 'email'}
+
+
+@pytest.mark.parametrize('query', ['cursor=abc', 'cursor=-1', 'limit=0', 'limit=ten', 'limit=-5', 'active=maybe'])
+def test_invalid_page_arguments_are_rejected(client, admin_headers, query):
+    response = client.get(f'/api/v1/admin/users?{query}', headers=admin_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('query', ['page=x', 'page=0', 'per_page=-1'])
+def test_invalid_search_page_arguments_are_rejected(client, admin_headers, query):
+    response = client.get(f'/api/v1/admin/users/search?q=user&{query}', headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_non_admin_writes_are_rejected_before_validation(client, make_user, auth_headers):
+    headers = auth_headers(make_user('user@example.com'))
+    invalid_body = {'email': 123}
+
+    assert client.post('/api/v1/admin/users', json=invalid_body, headers=headers).status_code == 403
+    assert client.put('/api/v1/admin/users/1', json={'is_admin': 'yes'}, headers=headers).status_code == 403
+
+
+def test_non_admin_does_not_reserve_idempotency_keys(client, make_user, auth_headers):
+    user = make_user('user@example.com')
+    headers = dict(auth_headers(user), **{'Idempotency-Key': 'create-1'})
+
+    assert client.post('/api/v1/admin/users', json={'email': 'new@example.com'}, headers=headers).status_code == 403
+    # Promoted afterwards, the same key runs the request instead of replaying the 403
+    user.is_admin = True
+    db.session.commit()
+    invalidate_principal(user.id)
+    response = client.post('/api/v1/admin/users', json={'email': 'new@example.com'}, headers=headers)
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
+
+
+def bulk_update(client, headers, body):
+    return client.patch('/api/v1/admin/users', json=body, headers=headers)
+
+
+def test_bulk_update_by_ids(client, make_user, admin_headers):
+    users = [make_user(f'user{number}@example.com') for number in range(3)]
+
+    response = bulk_update(client, admin_headers, {'ids': [users[0].id, users[2].id], 'is_active': False})
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 2
+    db.session.expire_all()
+    assert [user.is_active for user in users] == [False, True, False]
+
+
+def test_bulk_update_by_filter(client, admin, make_user, admin_headers):
+    make_user('inactive@example.com', is_active=False)
+    make_user('active@example.com')
+
+    response = bulk_update(client, admin_headers, {'filter': {'active': False}, 'is_active': True})
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 1
+    assert User.query.filter_by(is_active=False).count() == 0
+
+
+@pytest.mark.parametrize('body', [
+    {'ids': [1], 'is_active': 'no'},
+    {'ids': [], 'is_active': False},
+    {'ids': ['1'], 'is_active': False},
+    {'filter': {}, 'is_active': False},
+    {'filter': {'activ': False}, 'is_active': False},
+    {'filter': {'active': 'false'}, 'is_active': False},
+    {'ids': [1]},
+    {'is_active': False}
+])
+def test_bulk_update_rejects_invalid_bodies(client, make_user, admin_headers, body):
+    make_user('user@example.com')
+    response = bulk_update(client, admin_headers, body)
+    assert response.status_code == 400
+    assert User.query.filter_by(is_active=False).count() == 0
+
+
+def test_bulk_update_never_locks_out_the_calling_admin(client, admin, admin_headers):
+    response = bulk_update(client, admin_headers, {'filter': {'admin': True}, 'is_admin': False, 'is_active': False})
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 0
+    db.session.expire_all()
+    assert admin.is_admin and admin.is_active
+    assert client.get('/api/v1/admin/users', headers=admin_headers).status_code == 200
+
+
+@pytest.mark.parametrize('change', [{'is_active': False}, {'is_admin': False}])
+def test_bulk_deactivation_or_demotion_revokes_tokens(client, make_user, auth_headers, admin_headers, change):
+    user = make_user('user@example.com', is_admin=True)
+    headers = auth_headers(user)
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 200
+
+    assert bulk_update(client, admin_headers, dict(change, ids=[user.id])).status_code == 200
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 401
+
+
+def test_bulk_update_invalidates_admin_stats(client, make_user, admin_headers):
+    user = make_user('user@example.com')
+    assert client.get('/api/v1/admin/stats', headers=admin_headers).get_json()['users']['inactive'] == 0
+
+    assert bulk_update(client, admin_headers, {'ids': [user.id], 'is_active': False}).status_code == 200
+    assert client.get('/api/v1/admin/stats', headers=admin_headers).get_json()['users']['inactive'] == 1
+
+
+def test_update_user_invalidates_the_cached_principal(client, make_user, auth_headers, admin_headers):
+    user = make_user('user@example.com')
+    headers = auth_headers(user)
+    assert client.get('/api/v1/auth/me', headers=headers).get_json()['first_name'] is None
+    assert principal_cache.get(user.id) is not None
+
+    response = client.put(f'/api/v1/admin/users/{user.id}', json={'first_name': 'Ada'}, headers=admin_headers)
+    assert response.status_code == 200
+    assert principal_cache.get(user.id) is None
+    assert client.get('/api/v1/auth/me', headers=headers).get_json()['first_name'] == 'Ada'
+
+
+def test_demotion_reaches_workers_with_a_cached_principal(client, make_user, auth_headers, admin_headers):
+    user = make_user('user@example.com', is_admin=True)
+    stale = Principal(user)
+
+    assert client.put(f'/api/v1/admin/users/{user.id}', json={'is_admin': False}, headers=admin_headers).status_code == 200
+    # Seen from another worker: it still caches the admin principal and is due for a blocklist sync
+    principal_cache.set(user.id, stale)
+    token_blocklist._last_id = 0
+    token_blocklist._last_sync = 0
+    # A token from a login after the demotion is not revoked, yet must not get admin access
+    RevokedToken.query.filter_by(jti=f'user:{user.id}').update({'revoked_at': datetime.utcnow() - timedelta(hours=1)})
+    db.session.commit()
+
+    assert client.get('/api/v1/admin/users', headers=auth_headers(user)).status_code == 403
+
+
+def test_editing_a_user_keeps_their_tokens(client, make_user, auth_headers, admin_headers):
+    user = make_user('user@example.com')
+    headers = auth_headers(user)
+
+    body = {'first_name': 'Ada', 'is_admin': False, 'is_active': True}
+    assert client.put(f'/api/v1/admin/users/{user.id}', json=body, headers=admin_headers).status_code == 200
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 200
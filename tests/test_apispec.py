@@ -0,0 +1,54 @@
+import json
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.utils.swagger_utils import ApiSpecCache
+from manage import build_apispec
+
+
+@pytest.fixture
+def spec_builds(app, monkeypatch):
+    builds = []
+    build = ApiSpecCache.build
+    monkeypatch.setattr(ApiSpecCache, 'build', lambda self: builds.append(1) or build(self))
+    return builds
+
+
+def test_spec_is_built_once(client, spec_builds):
+    first = client.get('/apispec.json')
+    second = client.get('/apispec.json')
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_data() == second.get_data()
+    assert len(spec_builds) == 1
+    spec = first.get_json()
+    assert spec['info']['title'] == 'Realtex AI API'
+    assert '/api/v1/predictions/price' in spec['paths']
+
+
+def test_matching_etag_gets_not_modified(client):
+    first = client.get('/apispec.json')
+    assert first.headers['Cache-Control'] == 'public, max-age=3600'
+
+    response = client.get('/apispec.json', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+    stale = client.get('/apispec.json', headers={'If-None-Match': '"stale"'})
+    assert stale.status_code == 200
+
+
+def test_prebuilt_spec_file_is_served_without_building(app, tmp_path, monkeypatch):
+    path = tmp_path / 'apispec.json'
+    result = app.test_cli_runner().invoke(build_apispec, [str(path)])
+    assert result.exit_code == 0, result.output
+    assert '/api/v1/predictions/price' in json.loads(path.read_text())['paths']
+
+    path.write_text(json.dumps({'swagger': '2.0', 'info': {'title': 'Prebuilt'}}))
+    monkeypatch.setattr(TestingConfig, 'SWAGGER_SPEC_FILE', str(path))
+    monkeypatch.setattr(ApiSpecCache, 'build', lambda self: pytest.fail('spec built despite SWAGGER_SPEC_FILE'))
+
+    response = create_app('testing').test_client().get('/apispec.json')
+    assert response.status_code == 200
+    assert response.get_json()['info']['title'] == 'Prebuilt'
+    assert response.headers['ETag']
@@ -0,0 +1,37 @@
+from werkzeug.security import generate_password_hash
+from app import db
+from app.services.password_service import password_hasher
+
+
+def test_login_upgrades_outdated_hash_in_one_pool_call(client, make_user, monkeypatch):
+    user = make_user('old-hash@example.com')
+    user.password_hash = generate_password_hash('password123', 'pbkdf2:sha256:1000')
+    db.session.commit()
+
+    calls = []
+    run = password_hasher._run
+    monkeypatch.setattr(password_hasher, '_run', lambda fn, *args: calls.append(fn) or run(fn, *args))
+
+    response = client.post('/api/v1/auth/login', json={'email': 'old-hash@example.com', 'password': 'password123'})
+    assert response.status_code == 200
+    assert len(calls) == 1
+
+    db.session.expire_all()
+    assert user.password_hash.startswith('scrypt:')
+    assert not password_hasher.needs_rehash(user.password_hash)
+
+
+def test_login_keeps_current_hash(client, make_user):
+    user = make_user('current@example.com')
+    stored = user.password_hash
+
+    response = client.post('/api/v1/auth/login', json={'email': 'current@example.com', 'password': 'password123'})
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert user.password_hash == stored
+
+
+def test_login_rejects_wrong_password(client, make_user):
+    make_user('wrong@example.com')
+    response = client.post('/api/v1/auth/login', json={'email': 'wrong@example.com', 'password': 'nope'})
+    assert response.status_code == 401
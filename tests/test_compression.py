@@ -0,0 +1,95 @@
+import gzip
+import pytest
+from flask import Response, jsonify
+from app.utils.compression import compressor
+
+BODY = {'items': ['x' * 40] * 50}
+
+
+@pytest.fixture
+def client(app):
+    app.add_url_rule('/big', 'big', lambda: jsonify(BODY))
+    app.add_url_rule('/small', 'small', lambda: jsonify({'ok': True}))
+    app.add_url_rule('/html', 'html', lambda: Response('<p>' + 'x' * 2000 + '</p>', mimetype='text/html'))
+    app.add_url_rule('/empty', 'empty', lambda: Response(status=204, mimetype='application/json'))
+    app.add_url_rule('/not-modified', 'not_modified', lambda: Response(status=304, mimetype='application/json'))
+    app.add_url_rule('/encoded', 'encoded', lambda: Response(
+        gzip.compress(b'{}' * 1000), mimetype='application/json', headers={'Content-Encoding': 'gzip'}
+    ))
+    app.add_url_rule('/stream', 'stream', lambda: Response(
+        (f'{{"line": {number}}}\n' for number in range(100)), mimetype='application/x-ndjson'
+    ))
+    app.add_url_rule('/etag', 'etag', lambda: Response('x' * 1000, mimetype='application/json', headers={'ETag': '"abc"'}))
+    return app.test_client()
+
+
+def get(client, url, accept='gzip', **kwargs):
+    return client.get(url, headers={'Accept-Encoding': accept}, **kwargs)
+
+
+def test_bodies_above_the_minimum_size_are_gzipped(client):
+    response = get(client, '/big')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert gzip.decompress(response.get_data()) == client.get('/big').get_data()
+
+
+def test_bodies_below_the_minimum_size_are_sent_as_is(client):
+    response = get(client, '/small')
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json() == {'ok': True}
+    assert 'Accept-Encoding' in response.vary
+
+
+def test_minimum_size_is_configurable(client, monkeypatch):
+    monkeypatch.setattr(compressor, 'min_size', 1)
+    assert get(client, '/small').headers['Content-Encoding'] == 'gzip'
+
+
+@pytest.mark.parametrize('accept', ['identity', 'gzip;q=0', 'br;q=0, gzip;q=0', ''])
+def test_refused_encodings_are_not_used(client, accept):
+    response = get(client, '/big', accept=accept)
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json() == BODY
+
+
+def test_head_requests_are_not_compressed(client):
+    response = client.head('/big', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+
+
+@pytest.mark.parametrize('url', ['/empty', '/not-modified', '/html'])
+def test_empty_and_other_content_types_are_skipped(client, url):
+    response = get(client, url)
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' not in response.vary
+
+
+def test_already_encoded_responses_are_left_alone(client):
+    response = get(client, '/encoded')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == b'{}' * 1000
+
+
+def test_strong_etag_is_weakened_when_compressed(client):
+    assert get(client, '/etag').headers['ETag'] == 'W/"abc"'
+
+
+def test_streamed_bodies_are_gzipped_chunk_by_chunk(client):
+    response = get(client, '/stream')
+    assert response.is_streamed
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+
+    chunks = list(response.response)
+    assert len(chunks) > 1
+    lines = gzip.decompress(b''.join(chunks)).decode().splitlines()
+    assert lines[0] == '{"line": 0}' and lines[-1] == '{"line": 99}'
+
+
+def test_disabled_compression_sends_bodies_as_is(client, monkeypatch):
+    monkeypatch.setattr(compressor, 'enabled', False)
+    response = get(client, '/big')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' not in response.vary
@@ -0,0 +1,112 @@
+import os
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+from app.utils import db_pool
+from app.utils.db_pool import InstrumentedQueuePool, configure_engine_options, pool_status, register_engines
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f'sqlite:///{tmp_path / "pool.db"}', poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1,
+        pool_timeout=0.05
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_status_reports_usage_and_saturation(engine):
+    connections = [engine.connect() for _ in range(3)]
+    status = pool_status(engine)
+    for connection in connections:
+        connection.close()
+
+    assert status['pool'] == 'InstrumentedQueuePool'
+    assert status['size'] == 2
+    assert status['max_overflow'] == 1
+    assert status['checked_out'] == 3
+    assert status['overflow'] == 1
+    assert status['saturation'] == 1.0
+    assert status['checkouts'] == 3
+    assert status['timeouts'] == 0
+
+    status = pool_status(engine)
+    assert status['checked_out'] == 0
+    assert status['checked_in'] == 2
+    assert status['saturation'] == 0.0
+
+
+def test_exhausted_pool_records_timeouts_and_waits(engine):
+    connections = [engine.connect() for _ in range(3)]
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    for connection in connections:
+        connection.close()
+
+    status = pool_status(engine)
+    assert status['timeouts'] == 1
+    assert status['wait_seconds_max'] >= 0.05
+    assert status['wait_seconds_avg'] > 0
+
+
+def test_pools_without_a_queue_report_only_their_class(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "null.db"}', poolclass=NullPool)
+    assert pool_status(engine) == {'pool': 'NullPool'}
+
+
+def test_engine_options_use_the_instrumented_pool_only_with_pool_settings(app):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': 5}
+    configure_engine_options(app)
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['poolclass'] is InstrumentedQueuePool
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+    configure_engine_options(app)
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS'] == {}
+
+
+def test_dispose_after_fork_swaps_the_pool_and_keeps_parent_connections(engine):
+    register_engines([engine])
+    parent = engine.connect()
+    old_pool = engine.pool
+
+    db_pool._dispose_after_fork()
+
+    assert engine.pool is not old_pool
+    assert engine.pool.stats is old_pool.stats
+    assert pool_status(engine)['checkouts'] == 0
+    # The connection the parent holds is still usable
+    assert parent.execute(text('SELECT 1')).scalar() == 1
+    parent.close()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_gets_its_own_pool(engine):
+    register_engines([engine])
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    parent_pool = engine.pool
+
+    pid = os.fork()
+    if pid == 0:
+        fresh = False
+        try:
+            fresh = engine.pool is not parent_pool and engine.pool.checkedin() == 0
+            with engine.connect() as connection:
+                fresh = fresh and connection.execute(text('SELECT 1')).scalar() == 1
+        finally:
+            os._exit(0 if fresh else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.WEXITSTATUS(status) == 0
+    assert engine.pool is parent_pool
+    assert engine.pool.checkedin() == 1
+
+
+def test_db_pool_endpoint_reports_each_bind(client, admin_headers):
+    response = client.get('/api/v1/admin/db-pool', headers=admin_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['pid'] == os.getpid()
+    assert 'pool' in body['binds']['default']
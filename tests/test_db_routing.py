@@ -0,0 +1,89 @@
+import pytest
+from app import create_app, db
+from app.config import TestingConfig
+from app.models.property import Property
+from app.utils.db_routing import LAST_WRITE_HEADER, recent_writers
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    # An empty replica stands in for one lagging behind the primary
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS', {'replica_0': f'sqlite:///{tmp_path / "replica.db"}'})
+    app = create_app('testing')
+    app.config['JWT_VERIFY_SUB'] = False
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica_0'])
+        yield app
+        db.session.remove()
+        db.drop_all()
+    # db keeps a metadata per bind it has seen; later apps have no replica bind
+    db.metadatas.pop('replica_0', None)
+
+
+def _get(client, url, headers):
+    # Requests share the fixture's app context, so start from a fresh session as a real request would
+    db.session.remove()
+    return client.get(url, headers=headers)
+
+
+def _emails(response):
+    assert response.status_code == 200
+    return [user['email'] for user in response.get_json()]
+
+
+def _create_user(client, headers):
+    response = client.post('/api/v1/admin/users', json={'email': 'new@example.com'}, headers=headers)
+    assert response.status_code == 201
+    # Requests served by another worker do not share this worker's memory
+    recent_writers.clear()
+    return response
+
+
+def test_reads_go_to_the_replica(client, admin_headers):
+    assert _emails(_get(client, '/api/v1/admin/users', admin_headers)) == []
+
+
+def test_writer_reads_from_primary_on_any_worker_through_cookie(client, admin_headers):
+    response = _create_user(client, admin_headers)
+    assert 'last_write=' in response.headers['Set-Cookie']
+
+    # The test client sends the cookie back
+    assert 'new@example.com' in _emails(_get(client, '/api/v1/admin/users', admin_headers))
+
+
+def test_writer_reads_from_primary_on_any_worker_through_header(app, client, admin_headers):
+    last_write = _create_user(client, admin_headers).headers[LAST_WRITE_HEADER]
+    cookieless = app.test_client()
+
+    assert _emails(_get(cookieless, '/api/v1/admin/users', admin_headers)) == []
+    headers = dict(admin_headers, **{LAST_WRITE_HEADER: last_write})
+    assert 'new@example.com' in _emails(_get(cookieless, '/api/v1/admin/users', headers))
+
+
+def test_expired_or_invalid_last_write_reads_from_replica(app, admin_headers):
+    client = app.test_client()
+    for value in ['0', 'soon']:
+        headers = dict(admin_headers, **{LAST_WRITE_HEADER: value})
+        assert _emails(_get(client, '/api/v1/admin/users', headers)) == []
+
+
+def test_streamed_body_reads_from_the_replica(app, client, admin_headers):
+    _create_user(client, admin_headers)
+
+    response = _get(app.test_client(), '/api/v1/admin/users?stream=true', admin_headers)
+    assert response.is_streamed
+    assert _emails(response) == []
+
+
+def test_property_export_reads_from_the_replica(app, client, admin_headers):
+    db.session.add(Property(
+        address='1 High Street', city='London', country='UK', postcode='SW1A 1AA', size_sqft=800,
+        num_bedrooms=2, num_bathrooms=1, listing_price=250000, property_type='Apartment'
+    ))
+    db.session.commit()
+
+    response = _get(client, '/api/v1/properties/export', admin_headers)
+    assert response.status_code == 200
+    # Only the header row: the streamed query ran on the empty replica
+    assert len(response.get_data().splitlines()) == 1
@@ -0,0 +1,113 @@
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from app import db, mail
+from app.models.email_outbox import EmailOutbox
+from app.services.email_service import CircuitBreaker, enqueue_email, outbox_sender
+
+
+def _enqueue(recipient, **columns):
+    entry = enqueue_email(recipient, 'invitation', {'invitation_token': 'token'})
+    for name, value in columns.items():
+        setattr(entry, name, value)
+    db.session.commit()
+    return entry
+
+
+def test_due_emails_are_claimed_and_sent(app):
+    due = _enqueue('due@example.com')
+    later = _enqueue('later@example.com', next_attempt_at=datetime.utcnow() + timedelta(hours=1))
+
+    with mail.record_messages() as outbox:
+        assert outbox_sender.drain() == 1
+
+    assert [message.recipients for message in outbox] == [['due@example.com']]
+    assert db.session.get(EmailOutbox, due.id).status == EmailOutbox.STATUS_SENT
+    assert db.session.get(EmailOutbox, later.id).status == EmailOutbox.STATUS_PENDING
+
+
+def test_claimed_emails_are_not_claimed_again(app):
+    _enqueue('first@example.com')
+    _enqueue('second@example.com')
+
+    claimed = outbox_sender._claim_batch()
+    assert [entry.status for entry in claimed] == [EmailOutbox.STATUS_SENDING] * 2
+    assert outbox_sender._claim_batch() == []
+
+
+def test_stale_sending_emails_are_reclaimed(app):
+    stale = datetime.utcnow() - timedelta(seconds=outbox_sender.stale_after + 60)
+    # Left in 'sending' by a worker that died mid-batch
+    entry = _enqueue('stale@example.com', status=EmailOutbox.STATUS_SENDING, updated_at=stale)
+    _enqueue('busy@example.com', status=EmailOutbox.STATUS_SENDING)
+
+    assert [claimed.id for claimed in outbox_sender._claim_batch()] == [entry.id]
+
+
+def test_failed_sends_are_retried_with_backoff(app, monkeypatch):
+    entry = _enqueue('retry@example.com')
+
+    def fail(self, message):
+        raise RuntimeError('mailbox unavailable')
+    monkeypatch.setattr('flask_mail.Connection.send', fail)
+
+    started = datetime.utcnow()
+    assert outbox_sender.drain() == 1
+
+    entry = db.session.get(EmailOutbox, entry.id)
+    assert entry.status == EmailOutbox.STATUS_PENDING
+    assert entry.attempts == 1
+    assert entry.last_error == 'mailbox unavailable'
+    assert entry.next_attempt_at >= started + timedelta(seconds=outbox_sender.retry_backoff)
+    # Not due again until the backoff has passed
+    assert outbox_sender._claim_batch() == []
+
+
+def test_sender_thread_starts_on_first_request(app, client, monkeypatch):
+    started = threading.Event()
+    monkeypatch.setattr(outbox_sender, 'enabled', True)
+    monkeypatch.setattr(outbox_sender, '_thread', None)
+    monkeypatch.setattr(type(outbox_sender), '_run', lambda self: started.set())
+
+    client.get('/api/v1/auth/me')
+
+    assert started.wait(5)
+
+
+def test_dropped_connection_opens_the_breaker_without_charging_messages(app, monkeypatch):
+    entries = [_enqueue(f'user{number}@example.com') for number in range(3)]
+    sent = []
+
+    def drop_after_first(self, message):
+        if sent:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        sent.append(message)
+    monkeypatch.setattr('flask_mail.Connection.send', drop_after_first)
+    monkeypatch.setattr(outbox_sender, 'breaker', CircuitBreaker(threshold=1, cooldown=60))
+
+    assert outbox_sender.send_batch() == 3
+    assert outbox_sender.breaker.is_open
+
+    statuses = [db.session.get(EmailOutbox, entry.id) for entry in entries]
+    assert statuses[0].status == EmailOutbox.STATUS_SENT
+    for entry in statuses[1:]:
+        assert entry.status == EmailOutbox.STATUS_PENDING
+        assert entry.attempts == 0
+        assert entry.last_error == 'Connection unexpectedly closed'
+    # Nothing is attempted while the breaker is open
+    assert outbox_sender.send_batch() == 0
+
+
+def test_rejected_recipient_is_charged_and_the_batch_continues(app, monkeypatch):
+    refused = _enqueue('refused@example.com')
+    accepted = _enqueue('accepted@example.com')
+
+    def refuse(self, message):
+        if message.recipients == ['refused@example.com']:
+            raise smtplib.SMTPRecipientsRefused({'refused@example.com': (550, b'No such user')})
+    monkeypatch.setattr('flask_mail.Connection.send', refuse)
+
+    assert outbox_sender.send_batch() == 2
+    assert not outbox_sender.breaker.is_open
+    assert db.session.get(EmailOutbox, refused.id).attempts == 1
+    assert db.session.get(EmailOutbox, accepted.id).status == EmailOutbox.STATUS_SENT
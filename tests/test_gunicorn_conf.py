@@ -0,0 +1,45 @@
+import logging
+import os
+import runpy
+from types import SimpleNamespace
+import pytest
+from app import create_app
+from app.config import ProductionConfig
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py')
+
+
+@pytest.fixture
+def production_server(monkeypatch):
+    # The shipped defaults, except for the database the test suite runs against
+    for name in list(os.environ):
+        if name.startswith(('GUNICORN_', 'IDEMPOTENCY_', 'RATELIMIT_')):
+            monkeypatch.delenv(name)
+    monkeypatch.setattr(ProductionConfig, 'SQLALCHEMY_DATABASE_URI', os.environ['TEST_DATABASE_URL'])
+    monkeypatch.setattr(ProductionConfig, 'SQLALCHEMY_ENGINE_OPTIONS', {})
+
+    def server(**overrides):
+        for name, value in overrides.items():
+            monkeypatch.setattr(ProductionConfig, name, value)
+        app = create_app('production')
+        return SimpleNamespace(app=SimpleNamespace(wsgi=lambda: app), log=logging.getLogger('gunicorn.test'))
+    return server
+
+
+def test_default_configuration_boots(production_server):
+    conf = runpy.run_path(CONF_PATH)
+    server = production_server()
+
+    assert conf['workers'] == 2 * conf['cpus'] + 1
+    assert conf['worker_class'] == 'gthread'
+    conf['on_starting'](server)
+    conf['when_ready'](server)
+
+
+def test_memory_idempotency_store_is_refused_with_several_workers(production_server, monkeypatch):
+    monkeypatch.setenv('GUNICORN_WORKERS', '3')
+    conf = runpy.run_path(CONF_PATH)
+    server = production_server(IDEMPOTENCY_STORAGE_URL='memory://')
+
+    with pytest.raises(RuntimeError, match='memory://'):
+        conf['on_starting'](server)
@@ -0,0 +1,70 @@
+from app import db
+from app.models.area import Area
+
+
+def test_profile_is_not_modified_for_matching_etag(client, make_user, auth_headers):
+    headers = auth_headers(make_user('user@example.com'))
+    first = client.get('/api/v1/auth/me', headers=headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+    assert 'Authorization' in first.headers['Vary']
+
+    response = client.get('/api/v1/auth/me', headers=dict(headers, **{'If-None-Match': etag}))
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == etag
+    assert response.headers['Cache-Control'] == first.headers['Cache-Control']
+
+
+def test_stale_etag_gets_the_full_body(client, make_user, auth_headers):
+    headers = auth_headers(make_user('user@example.com'))
+    response = client.get('/api/v1/auth/me', headers=dict(headers, **{'If-None-Match': 'W/"stale"'}))
+    assert response.status_code == 200
+    assert response.get_json()['email'] == 'user@example.com'
+
+
+def test_user_etag_changes_when_the_user_is_updated(client, make_user, admin_headers):
+    user = make_user('user@example.com')
+    url = f'/api/v1/admin/users/{user.id}'
+    etag = client.get(url, headers=admin_headers).headers['ETag']
+
+    assert client.put(url, json={'first_name': 'Ada'}, headers=admin_headers).status_code == 200
+
+    response = client.get(url, headers=dict(admin_headers, **{'If-None-Match': etag}))
+    assert response.status_code == 200
+    assert response.get_json()['first_name'] == 'Ada'
+    assert response.headers['ETag'] != etag
+
+
+def test_user_list_etag_changes_when_a_user_is_added(client, admin, make_user, admin_headers):
+    etag = client.get('/api/v1/admin/users', headers=admin_headers).headers['ETag']
+    conditional = dict(admin_headers, **{'If-None-Match': etag})
+    assert client.get('/api/v1/admin/users', headers=conditional).status_code == 304
+
+    make_user('user@example.com')
+    response = client.get('/api/v1/admin/users', headers=conditional)
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
+
+
+def test_area_score_is_not_modified_for_matching_etag(client, make_user, auth_headers):
+    db.session.add(Area(area_name='London', country='UK', avg_price=500000, avg_rent=2000,
+                        rental_yield=4.8, investment_score=8.0))
+    db.session.commit()
+    headers = auth_headers(make_user('user@example.com'))
+    url = '/api/v1/predictions/area-score?area=London&country=UK'
+
+    etag = client.get(url, headers=headers).headers['ETag']
+    assert client.get(url, headers=dict(headers, **{'If-None-Match': etag})).status_code == 304
+
+
+def test_etag_matches_compressed_and_uncompressed_copies(client, make_user, admin_headers):
+    for number in range(20):
+        make_user(f'user{number}@example.com')
+    compressed = client.get('/api/v1/admin/users', headers=dict(admin_headers, **{'Accept-Encoding': 'gzip'}))
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+
+    # The weak tag matches whether or not the cached copy was compressed
+    conditional = dict(admin_headers, **{'If-None-Match': compressed.headers['ETag']})
+    assert client.get('/api/v1/admin/users', headers=conditional).status_code == 304
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import pytest
+from app.models.user import User
+from app.models.idempotency_key import IdempotencyKey
+from app.utils.idempotency import DatabaseIdempotencyStore, MemoryIdempotencyStore, idempotency
+
+
+def _body(email='new@example.com'):
+    return json.dumps({'email': email})
+
+
+def _create(client, headers, key, email='new@example.com'):
+    return client.post(
+        '/api/v1/admin/users',
+        data=_body(email),
+        content_type='application/json',
+        headers=dict(headers, **{'Idempotency-Key': key})
+    )
+
+
+def test_retry_with_same_key_replays_the_response(client, admin_headers):
+    first = _create(client, admin_headers, 'create-1')
+    retry = _create(client, admin_headers, 'create-1')
+
+    assert first.status_code == 201
+    assert retry.status_code == 201
+    assert retry.get_data() == first.get_data()
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in first.headers
+    assert User.query.filter_by(email='new@example.com').count() == 1
+
+
+def test_reusing_a_key_for_a_different_body_is_rejected(client, admin_headers):
+    assert _create(client, admin_headers, 'create-1').status_code == 201
+    response = _create(client, admin_headers, 'create-1', email='other@example.com')
+
+    assert response.status_code == 422
+    assert User.query.filter_by(email='other@example.com').count() == 0
+
+
+def test_retry_while_first_request_runs_gets_409(client, admin, admin_headers):
+    # The first request reserved the key and has not finished yet
+    idempotency.store.reserve(
+        f'{admin.id}:POST:/api/v1/admin/users:create-1',
+        {'state': 'pending', 'fingerprint': hashlib.sha256(_body().encode()).hexdigest()},
+        60
+    )
+
+    response = _create(client, admin_headers, 'create-1')
+    assert response.status_code == 409
+    assert response.headers['Retry-After'] == '1'
+    assert User.query.filter_by(email='new@example.com').count() == 0
+
+
+def test_keys_are_scoped_per_user(client, make_user, auth_headers, admin_headers):
+    other_admin = auth_headers(make_user('other-admin@realtex.ai', is_admin=True))
+    assert _create(client, admin_headers, 'create-1').status_code == 201
+
+    response = _create(client, other_admin, 'create-1', email='second@example.com')
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
+
+
+def test_memory_store_refuses_several_workers(app, monkeypatch):
+    monkeypatch.setattr(idempotency, 'store', MemoryIdempotencyStore())
+    monkeypatch.setattr(idempotency, 'enabled', True)
+
+    idempotency.check_workers(1)
+    with pytest.raises(RuntimeError, match='IDEMPOTENCY_STORAGE_URL'):
+        idempotency.check_workers(4)
+
+    monkeypatch.setattr(idempotency, 'enabled', False)
+    idempotency.check_workers(4)
+
+
+def test_database_store_is_the_shared_default(app):
+    assert isinstance(idempotency.store, DatabaseIdempotencyStore)
+    idempotency.check_workers(4)
+
+
+def test_database_store_reuses_and_purges_expired_keys(app):
+    store = DatabaseIdempotencyStore()
+    record = {'state': 'pending', 'fingerprint': 'abc'}
+
+    assert store.reserve('1:POST:/x:key', record, 60) is None
+    assert store.reserve('1:POST:/x:key', record, 60) == record
+    assert store.reserve('1:POST:/x:expired', record, -1) is None
+    # An expired key is free again
+    assert store.reserve('1:POST:/x:expired', record, -1) is None
+
+    assert store.purge_expired() == 1
+    assert IdempotencyKey.query.count() == 1
@@ -0,0 +1,58 @@
+import pytest
+from app.services import prediction_service
+from app.services.prediction_service import PredictionModel
+from app.services.shadow_service import shadow_scorer
+
+PAYLOAD = {
+    'location': 'London, UK',
+    'size_sqft': 1200,
+    'num_bedrooms': 3,
+    'num_bathrooms': 2,
+    'property_type': 'Detached House'
+}
+
+
+class CandidateModel(PredictionModel):
+    version = 'candidate-test'
+
+    def predict_price(self, data):
+        return {'predicted_price': 1.0}
+
+
+@pytest.fixture
+def user_headers(make_user, auth_headers):
+    return auth_headers(make_user('user@example.com'))
+
+
+def test_unknown_primary_version_fails_at_startup(app):
+    app.config['PREDICTION_MODEL_VERSION'] = 'missing-version'
+    with pytest.raises(ValueError):
+        prediction_service.init_app(app)
+
+
+def test_unknown_shadow_version_disables_shadow(app, client, user_headers, monkeypatch):
+    app.config['SHADOW_MODEL_VERSION'] = 'typo-version'
+    prediction_service.init_app(app)
+    monkeypatch.setattr(shadow_scorer, 'sample_rate', 1.0)
+
+    assert app.extensions['prediction_models'][1] is None
+    for _ in range(3):
+        response = client.post('/api/v1/predictions/price', json=PAYLOAD, headers=user_headers)
+        assert response.status_code == 200
+
+
+def test_shadow_model_is_resolved_once(app, client, user_headers, monkeypatch):
+    candidate = CandidateModel()
+    prediction_service.register_model(candidate)
+    app.config['SHADOW_MODEL_VERSION'] = candidate.version
+    prediction_service.init_app(app)
+
+    submitted = []
+    monkeypatch.setattr(shadow_scorer, 'should_sample', lambda: True)
+    monkeypatch.setattr(shadow_scorer, 'submit', lambda *args: submitted.append(args[-1]))
+    monkeypatch.setattr(prediction_service, 'get_model', lambda version: pytest.fail('model looked up per request'))
+
+    response = client.post('/api/v1/predictions/price', json=PAYLOAD, headers=user_headers)
+    assert response.status_code == 200
+    assert response.get_json()['predicted_price'] > 1.0
+    assert submitted == [candidate]
@@ -0,0 +1,124 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models.prediction import Prediction
+from app.models.property import Property
+from app.services.property_export_service import build_export_query, parse_export_filters
+from manage import export_property_feed
+
+CREATED = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def add_property(number, city='London'):
+    prop = Property(
+        address=f'{number} High Street', city=city, country='UK', postcode=f'SW1A {number}AA', size_sqft=800,
+        num_bedrooms=2, num_bathrooms=1, listing_price=250000, property_type='Apartment'
+    )
+    db.session.add(prop)
+    db.session.flush()
+    return prop
+
+
+def add_prediction(prop, price, created_at=CREATED):
+    db.session.add(Prediction(
+        property_id=prop.id, predicted_sale_price=price, predicted_rental_yield=4.0,
+        predicted_capital_growth_1y=3.0, predicted_capital_growth_3y=9.0, predicted_capital_growth_5y=15.0,
+        investment_score=7.0, model_version='heuristic-v1', created_at=created_at
+    ))
+    db.session.flush()
+
+
+def export_rows(filters=None):
+    rows = db.session.execute(build_export_query(parse_export_filters(filters or {}))).mappings().all()
+    return {row['id']: row for row in rows}
+
+
+@pytest.fixture
+def user_headers(make_user, auth_headers):
+    return auth_headers(make_user('user@example.com'))
+
+
+def test_property_without_predictions_has_empty_prediction_columns(app):
+    prop = add_property(1)
+    db.session.commit()
+
+    row = export_rows()[prop.id]
+    assert row['prediction_id'] is None
+    assert row['predicted_sale_price'] is None
+    assert row['predicted_at'] is None
+
+
+def test_latest_prediction_is_exported_once(app):
+    prop = add_property(1)
+    add_prediction(prop, 100, CREATED - timedelta(days=1))
+    add_prediction(prop, 200)
+    add_prediction(add_property(2), 300)
+    db.session.commit()
+
+    rows = export_rows()
+    assert len(rows) == 2
+    assert rows[prop.id]['predicted_sale_price'] == 200
+
+
+def test_created_at_ties_pick_the_highest_prediction_id(app):
+    prop = add_property(1)
+    for price in [100, 200, 300]:
+        add_prediction(prop, price)
+    db.session.commit()
+
+    assert export_rows()[prop.id]['predicted_sale_price'] == 300
+
+
+def test_filters_apply_to_properties(app):
+    add_property(1, city='London')
+    paris = add_property(2, city='Paris')
+    db.session.commit()
+
+    assert list(export_rows({'city': 'Paris'})) == [paris.id]
+
+
+def test_ndjson_export_streams_every_property(client, user_headers):
+    for number in range(1, 4):
+        add_prediction(add_property(number), number * 100)
+    db.session.commit()
+
+    response = client.get('/api/v1/properties/export?format=ndjson', headers=user_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data().splitlines()]
+    assert [line['predicted_sale_price'] for line in lines] == [100, 200, 300]
+
+
+def test_inactive_user_cannot_export(client, make_user, auth_headers):
+    headers = auth_headers(make_user('inactive@example.com', is_active=False))
+    assert client.get('/api/v1/properties/export', headers=headers).status_code == 401
+
+
+def test_exports_are_rate_limited(app, client, user_headers):
+    app.config['RATELIMIT_EXPORTS'] = '2/minute'
+    assert client.get('/api/v1/properties/export', headers=user_headers).status_code == 200
+    assert client.get('/api/v1/properties/export', headers=user_headers).status_code == 200
+
+    response = client.get('/api/v1/properties/export', headers=user_headers)
+    assert response.status_code == 429
+    assert 'Retry-After' in response.headers
+
+
+def test_cli_export_to_gz_path_is_gzip_compressed(app, tmp_path):
+    add_prediction(add_property(1), 100)
+    add_property(2)
+    db.session.commit()
+    path = tmp_path / 'properties.csv.gz'
+
+    result = app.test_cli_runner().invoke(export_property_feed, [str(path), '--city', 'London'])
+    assert result.exit_code == 0, result.output
+
+    with gzip.open(path, 'rt', newline='') as exported:
+        rows = list(csv.DictReader(io.StringIO(exported.read())))
+    assert [row['address'] for row in rows] == ['1 High Street', '2 High Street']
+    assert rows[0]['predicted_sale_price'] == '100.0'
+    assert rows[1]['predicted_sale_price'] == ''
@@ -0,0 +1,80 @@
+import io
+import pytest
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models.property import Property
+from app.services import property_import_service
+from app.services.property_import_service import ImportInterrupted, import_properties
+
+HEADER = 'address,city,country,postcode,property_type,size_sqft,num_bedrooms,num_bathrooms,listing_price\n'
+
+
+def feed(*rows):
+    return io.StringIO(HEADER + ''.join(row + '\n' for row in rows))
+
+
+def listing(number, property_type='Apartment', price=250000):
+    return f'{number} High Street,London,UK,sw1a {number}aa,{property_type},800,2,1,{price}'
+
+
+@pytest.mark.parametrize('given, expected', [
+    ('flat', 'Apartment'),
+    ('APARTMENT', 'Apartment'),
+    ('detached house', 'Detached House'),
+    ('DETACHED_HOUSE', 'Detached House'),
+    ('semi-detached', 'Semi-detached House'),
+    ('Semi Detached House', 'Semi-detached House'),
+    ('town house', 'Townhouse'),
+    ('Houseboat', 'Houseboat')
+])
+def test_property_types_map_onto_canonical_names(app, given, expected):
+    assert import_properties(feed(listing(1, given)))['loaded'] == 1
+    assert Property.query.one().property_type == expected
+
+
+def test_reimport_updates_rows_in_place(app):
+    import_properties(feed(listing(1), listing(2)))
+    summary = import_properties(feed(listing(1, price=300000), listing(3)))
+
+    assert summary['loaded'] == 2
+    assert Property.query.count() == 3
+    assert Property.query.filter_by(postcode='SW1A 1AA').one().listing_price == 300000
+
+
+def test_database_error_reports_committed_chunks(app, monkeypatch):
+    load = property_import_service._load_sqlite
+    calls = []
+
+    def fail_second_chunk(rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise OperationalError('INSERT', {}, Exception('disk I/O error'))
+        load(rows)
+    monkeypatch.setattr(property_import_service, '_load_sqlite', fail_second_chunk)
+
+    rows = [listing(number) for number in range(1, 6)]
+    with pytest.raises(ImportInterrupted) as interrupted:
+        import_properties(feed(*rows), chunk_size=2)
+
+    # Lines 2 and 3 hold the first chunk
+    assert interrupted.value.summary['loaded'] == 2
+    assert interrupted.value.summary['committed_through_line'] == 3
+    assert Property.query.count() == 2
+
+    monkeypatch.setattr(property_import_service, '_load_sqlite', load)
+    assert import_properties(feed(*rows), chunk_size=2)['loaded'] == 5
+    assert Property.query.count() == 5
+
+
+def test_endpoint_reports_rows_committed_before_a_bad_line(app, client, admin_headers):
+    app.config['PROPERTY_IMPORT_CHUNK_SIZE'] = 100
+    # Enough rows that the undecodable bytes arrive after the first chunks are committed
+    rows = ''.join(listing(number) + '\n' for number in range(1, 301))
+    body = (HEADER + rows).encode() + b'\xff\xfe broken\n'
+    response = client.post('/api/v1/admin/properties/import', data=body, content_type='text/csv', headers=admin_headers)
+
+    summary = response.get_json()
+    assert response.status_code == 400
+    assert summary['message'].startswith('Import stopped after line')
+    assert 0 < summary['loaded'] == Property.query.count()
+    assert summary['committed_through_line'] == summary['loaded'] + 1
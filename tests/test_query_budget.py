@@ -0,0 +1,50 @@
+import pytest
+from app import db
+from app.models.user import User, UNUSABLE_PASSWORD
+from app.utils.query_stats import QueryBudgetExceeded, assert_max_queries, count_queries
+
+
+@pytest.fixture
+def users(admin):
+    db.session.execute(db.insert(User), [
+        {'email': f'user{i}@example.com', 'password_hash': UNUSABLE_PASSWORD, 'is_active': True}
+        for i in range(40)
+    ])
+    db.session.commit()
+
+
+def test_assert_max_queries_fails_over_budget(app):
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        with assert_max_queries(1):
+            db.session.execute(db.text('SELECT 1'))
+            db.session.execute(db.text('SELECT 2'))
+    assert 'got 2 queries' in str(excinfo.value)
+
+
+def test_user_list_queries_do_not_grow_with_page_size(client, admin_headers, users):
+    # The first request also loads the principal and the revoked token filter
+    client.get('/api/v1/admin/users', headers=admin_headers)
+
+    with count_queries() as small:
+        assert client.get('/api/v1/admin/users?limit=5', headers=admin_headers).status_code == 200
+    with assert_max_queries(small.count):
+        response = client.get('/api/v1/admin/users?limit=40', headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.get_json()) == 40
+
+
+def test_user_list_query_budget(client, admin_headers, users):
+    client.get('/api/v1/admin/users', headers=admin_headers)
+
+    with assert_max_queries(2):
+        response = client.get('/api/v1/admin/users?limit=40', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers['X-Query-Count'] == '2'
+
+
+def test_streamed_user_export_query_budget(client, admin_headers, users):
+    client.get('/api/v1/admin/users', headers=admin_headers)
+
+    with assert_max_queries(1):
+        response = client.get('/api/v1/admin/users?stream=true', headers=admin_headers)
+        assert len(response.get_json()) == 41
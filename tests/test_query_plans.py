@@ -0,0 +1,17 @@
+from app.services.query_plan_service import HOT_QUERIES, check_query_plans
+from manage import check_query_plans as check_query_plans_command
+
+
+def test_every_hot_query_uses_an_index(app):
+    results = check_query_plans()
+
+    assert [result['name'] for result in results] == list(HOT_QUERIES)
+    for result in results:
+        assert result['plan'], result['name']
+        assert result['sequential_scans'] == [], f"{result['name']}: {result['plan']}"
+
+
+def test_cli_reports_every_hot_query(app):
+    result = app.test_cli_runner().invoke(check_query_plans_command)
+    assert result.exit_code == 0, result.output
+    assert f'{len(HOT_QUERIES)}/{len(HOT_QUERIES)} hot queries use an index' in result.output
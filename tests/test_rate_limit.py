@@ -0,0 +1,79 @@
+import pytest
+from app import create_app
+from app.config import TestingConfig
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryBucketStore, parse_rate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    return clock
+
+
+def test_parse_rate():
+    assert parse_rate('120/minute') == (2.0, 120)
+    assert parse_rate('10/seconds') == (10.0, 10)
+
+
+def test_bucket_refills_over_time(clock):
+    store = MemoryBucketStore()
+    assert store.consume(['a'], 1.0, 2) == (True, 0)
+    assert store.consume(['a'], 1.0, 2) == (True, 0)
+    allowed, wait = store.consume(['a'], 1.0, 2)
+    assert not allowed and wait == pytest.approx(1.0)
+
+    clock.now += 1.0
+    assert store.consume(['a'], 1.0, 2) == (True, 0)
+
+
+def test_denied_request_is_not_charged_to_other_buckets(clock):
+    store = MemoryBucketStore()
+    store.consume(['ip:1', 'user:1'], 1.0, 2)
+    store.consume(['ip:1', 'user:1'], 1.0, 2)
+
+    # The user bucket is empty, so the request from a new IP is denied without touching that IP's bucket
+    allowed, _ = store.consume(['ip:2', 'user:1'], 1.0, 2)
+    assert not allowed
+    assert store.consume(['ip:2'], 1.0, 2) == (True, 0)
+    assert store.consume(['ip:2'], 1.0, 2) == (True, 0)
+
+
+def test_full_buckets_are_evicted(clock):
+    store = MemoryBucketStore(evict_interval=10)
+    store.consume(['a'], 1.0, 2)
+    clock.now += 60
+    store.consume(['b'], 1.0, 2)
+    assert len(store) == 1
+
+
+def test_login_is_limited_per_client_ip(app, client):
+    for _ in range(10):
+        assert client.post('/api/v1/auth/login', json={}, environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code == 400
+
+    response = client.post('/api/v1/auth/login', json={}, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert client.post('/api/v1/auth/login', json={}, environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code == 400
+
+
+def test_clients_behind_proxy_get_their_own_limit(app, monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'PROXY_FIX_X_FOR', 1)
+    proxied = create_app('testing').test_client()
+    proxy = {'REMOTE_ADDR': '127.0.0.1'}
+
+    for _ in range(10):
+        proxied.post('/api/v1/auth/login', json={}, environ_base=proxy, headers={'X-Forwarded-For': '203.0.113.1'})
+    assert proxied.post('/api/v1/auth/login', json={}, environ_base=proxy,
+                        headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 429
+    assert proxied.post('/api/v1/auth/login', json={}, environ_base=proxy,
+                        headers={'X-Forwarded-For': '203.0.113.2'}).status_code == 400
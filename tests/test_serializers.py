@@ -0,0 +1,141 @@
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from app import db
+from app.models.prediction import Prediction
+from app.models.property import Property
+from app.models.user import User
+from app.utils import serializers
+from app.utils.serializers import dumps
+
+CREATED = datetime(2026, 1, 2, 3, 4, 5, 678901)
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+# The hand-written to_dict() methods the serializers replaced
+def legacy_user_dict(user):
+    return {
+        'id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'is_admin': user.is_admin,
+        'is_active': user.is_active,
+        'created_at': _iso(user.created_at),
+        'updated_at': _iso(user.updated_at)
+    }
+
+
+def legacy_property_dict(prop):
+    return {
+        'id': prop.id,
+        'address': prop.address,
+        'city': prop.city,
+        'country': prop.country,
+        'postcode': prop.postcode,
+        'latitude': prop.latitude,
+        'longitude': prop.longitude,
+        'size_sqft': prop.size_sqft,
+        'num_bedrooms': prop.num_bedrooms,
+        'num_bathrooms': prop.num_bathrooms,
+        'listing_price': prop.listing_price,
+        'property_type': prop.property_type,
+        'created_at': _iso(prop.created_at),
+        'updated_at': _iso(prop.updated_at)
+    }
+
+
+def legacy_prediction_dict(prediction):
+    return {
+        'id': prediction.id,
+        'property_id': prediction.property_id,
+        'predicted_sale_price': prediction.predicted_sale_price,
+        'predicted_rental_yield': prediction.predicted_rental_yield,
+        'predicted_capital_growth_1y': prediction.predicted_capital_growth_1y,
+        'predicted_capital_growth_3y': prediction.predicted_capital_growth_3y,
+        'predicted_capital_growth_5y': prediction.predicted_capital_growth_5y,
+        'investment_score': prediction.investment_score,
+        'model_version': prediction.model_version,
+        'created_at': _iso(prediction.created_at),
+        'updated_at': _iso(prediction.updated_at)
+    }
+
+
+def ordered(data):
+    # Keeps key order, which a plain dict comparison ignores
+    return json.loads(data, object_pairs_hook=list)
+
+
+@pytest.fixture
+def prediction(app):
+    prop = Property(
+        address='1 High Street', city='London', country='UK', postcode='SW1A 1AA', size_sqft=800,
+        num_bedrooms=2, num_bathrooms=1, listing_price=250000, property_type='Apartment', created_at=CREATED
+    )
+    db.session.add(prop)
+    db.session.flush()
+    prediction = Prediction(
+        property_id=prop.id, predicted_sale_price=260000.5, predicted_rental_yield=4.0,
+        predicted_capital_growth_1y=3.0, predicted_capital_growth_3y=9.0, predicted_capital_growth_5y=15.0,
+        investment_score=7.0, model_version='heuristic-v1', created_at=CREATED
+    )
+    db.session.add(prediction)
+    db.session.commit()
+    return prediction
+
+
+def test_model_dicts_match_the_hand_written_ones(make_user, prediction):
+    user = make_user('user@example.com')
+    user.updated_at = None
+    prop = db.session.get(Property, prediction.property_id)
+
+    for obj, legacy in [(user, legacy_user_dict), (prop, legacy_property_dict), (prediction, legacy_prediction_dict)]:
+        assert list(obj.to_dict().items()) == list(legacy(obj).items())
+    assert user.to_dict()['first_name'] is None
+    assert user.to_dict()['updated_at'] is None
+    assert prop.to_dict()['latitude'] is None
+    assert prop.to_dict()['created_at'] == '2026-01-02T03:04:05.678901'
+
+
+def test_rows_match_instances(make_user):
+    from app.services.user_query_service import USER_FIELDS, row_to_dict
+
+    user = make_user('user@example.com')
+    row = db.session.execute(db.select(*USER_FIELDS.values()).filter_by(id=user.id)).one()
+    assert list(row_to_dict(row, list(USER_FIELDS)).items()) == list(legacy_user_dict(user).items())
+
+
+@pytest.mark.parametrize('value', [
+    {'b': 1, 'a': None, 'nested': {'z': CREATED, 'y': [CREATED.date(), None]}},
+    {'price': Decimal('1.50'), 'id': uuid.UUID(int=1), 'text': 'café', 'ratio': 0.1},
+    [1, 'two', 3.5, True, None]
+])
+def test_fast_provider_matches_flask_default_encoder(app, value):
+    default = DefaultJSONProvider(app)
+    with app.test_request_context():
+        assert ordered(app.json.dumps(value)) == ordered(default.dumps(value))
+        assert ordered(app.json.response(value).get_data()) == ordered(default.response(value).get_data())
+
+
+def test_responses_match_with_either_encoder(app, client, admin, admin_headers, prediction):
+    urls = [f'/api/v1/admin/users/{admin.id}', '/api/v1/admin/users', '/api/v1/auth/me']
+    fast = [client.get(url, headers=admin_headers).get_data() for url in urls]
+
+    app.config['JSON_FAST_ENCODER'] = False
+    plain = [client.get(url, headers=admin_headers).get_data() for url in urls]
+    assert [ordered(body) for body in fast] == [ordered(body) for body in plain]
+
+
+@pytest.mark.parametrize('fast', [True, False])
+def test_dumps_writes_iso_datetimes_with_or_without_orjson(monkeypatch, fast):
+    if not fast:
+        monkeypatch.setattr(serializers, 'orjson', None)
+    assert json.loads(dumps({'at': CREATED, 'day': CREATED.date(), 'none': None})) == {
+        'at': '2026-01-02T03:04:05.678901', 'day': '2026-01-02', 'none': None
+    }
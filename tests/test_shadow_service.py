@@ -0,0 +1,28 @@
+import time
+from app.services.shadow_service import ShadowScorer
+
+
+class CandidateModel:
+    version = 'candidate'
+
+    def predict(self, kind, data):
+        return {'price': data['price'] * 1.1}
+
+
+def test_windows_are_flushed_without_further_requests():
+    scorer = ShadowScorer()
+    scorer.flush_interval = 0.2
+    scorer.submit('price', {'price': 100}, 'primary', {'price': 100}, 0.01, CandidateModel())
+
+    deadline = time.time() + 5
+    while not scorer._history and time.time() < deadline:
+        time.sleep(0.05)
+
+    report = scorer.report()
+    assert len(report['history']) == 1
+    window = report['history'][0]
+    assert window['window_started_at'].endswith('+00:00')
+    stats = window['kinds']['price']
+    assert stats['count'] == 1
+    assert round(stats['output_deltas']['price']['mean_abs_delta'], 6) == 10
+    assert stats['model_versions'] == [{'primary': 'primary', 'shadow': 'candidate'}]
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.prediction import Prediction
+from app.models.property import Property
+from app.models.user import User, UNUSABLE_PASSWORD
+from app.services import stats_service
+from app.services.stats_service import get_admin_stats, invalidate_admin_stats, stats_cache
+
+TODAY = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+def add_user(email, **columns):
+    db.session.execute(db.insert(User), [dict({'email': email, 'password_hash': UNUSABLE_PASSWORD}, **columns)])
+
+
+def add_predictions(*created_at):
+    prop = Property(
+        address='1 High Street', city='London', country='UK', postcode='SW1A 1AA', size_sqft=800,
+        num_bedrooms=2, num_bathrooms=1, listing_price=250000, property_type='Apartment'
+    )
+    db.session.add(prop)
+    db.session.flush()
+    db.session.execute(db.insert(Prediction), [
+        {
+            'property_id': prop.id, 'predicted_sale_price': 1, 'predicted_rental_yield': 1,
+            'predicted_capital_growth_1y': 1, 'predicted_capital_growth_3y': 1, 'predicted_capital_growth_5y': 1,
+            'investment_score': 1, 'model_version': 'heuristic-v1', 'created_at': created
+        }
+        for created in created_at
+    ])
+
+
+def test_aggregates(app):
+    add_user('admin@example.com', is_admin=True, is_active=True)
+    add_user('active@example.com', is_active=True)
+    add_user('invited@example.com', is_active=False, invitation_token='a', invitation_sent_at=TODAY)
+    add_user('accepted@example.com', is_active=True, invitation_token=None,
+             invitation_sent_at=YESTERDAY, invitation_accepted_at=TODAY)
+    add_user('old@example.com', is_active=False, invitation_token='b',
+             invitation_sent_at=TODAY - timedelta(days=40))
+    add_predictions(TODAY, TODAY, YESTERDAY, TODAY - timedelta(days=40))
+    db.session.commit()
+
+    stats = get_admin_stats(days=30)
+    assert stats['users'] == {'total': 5, 'active': 3, 'inactive': 2, 'admins': 1, 'pending_invitations': 2}
+    today, yesterday = str(TODAY.date()), str(YESTERDAY.date())
+    # Days without events are left out; the 40 day old rows fall outside the window
+    assert stats['invitations']['sent_per_day'] == [
+        {'date': yesterday, 'count': 1}, {'date': today, 'count': 1}
+    ]
+    assert stats['invitations']['accepted_per_day'] == [{'date': today, 'count': 1}]
+    assert stats['predictions'] == {
+        'total': 4, 'per_day': [{'date': yesterday, 'count': 1}, {'date': today, 'count': 2}]
+    }
+    assert stats['days'] == 30
+
+
+def test_window_is_counted_in_whole_days(app):
+    add_predictions(YESTERDAY)
+    db.session.commit()
+
+    assert get_admin_stats(days=1)['predictions']['per_day'] == []
+    assert get_admin_stats(days=2)['predictions']['per_day'] == [{'date': str(YESTERDAY.date()), 'count': 1}]
+
+
+def test_cached_stats_are_reused_until_invalidated(app, monkeypatch):
+    calls = []
+    compute = stats_service._compute_stats
+    monkeypatch.setattr(stats_service, '_compute_stats', lambda days: calls.append(days) or compute(days))
+
+    first = get_admin_stats(30)
+    add_user('new@example.com')
+    db.session.commit()
+
+    assert get_admin_stats(30) is first
+    assert get_admin_stats(7)['users']['total'] == 1
+    assert calls == [30, 7]
+
+    invalidate_admin_stats()
+    assert len(stats_cache) == 0
+    assert get_admin_stats(30)['users']['total'] == 1
+    assert calls == [30, 7, 30]
+
+
+def test_cache_entries_expire(app, monkeypatch):
+    monkeypatch.setattr(stats_cache, 'ttl', 0)
+    first = get_admin_stats(30)
+    assert get_admin_stats(30) is not first
+
+
+def test_stats_endpoint_clamps_days(client, admin_headers):
+    response = client.get('/api/v1/admin/stats?days=365', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['days'] == 90
+    assert response.get_json()['users']['admins'] == 1
@@ -0,0 +1,101 @@
+import uuid
+from datetime import datetime, timedelta
+from flask_jwt_extended import decode_token
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.models.revoked_token import RevokedToken
+from app.services.token_blocklist import BloomFilter, token_blocklist
+from manage import purge_revoked_tokens
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    members = [str(uuid.uuid4()) for _ in range(1000)]
+    for member in members:
+        bloom.add(member)
+
+    assert all(member in bloom for member in members)
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_logout_revokes_only_that_token(client, make_user, auth_headers):
+    user = make_user('user@example.com')
+    revoked = auth_headers(user)
+    other = auth_headers(user)
+
+    assert client.post('/api/v1/auth/logout', headers=revoked).status_code == 200
+    assert client.get('/api/v1/auth/me', headers=revoked).status_code == 401
+    assert client.get('/api/v1/auth/me', headers=other).status_code == 200
+
+
+def test_bloom_filter_hit_is_confirmed_against_the_database(client, make_user, auth_headers, monkeypatch):
+    headers = auth_headers(make_user('user@example.com'))
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 200
+
+    # Every lookup is a (false) positive now; only rows in revoked_tokens may reject the token
+    monkeypatch.setattr(BloomFilter, '__contains__', lambda self, value: True)
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 200
+
+
+def test_revocations_from_other_workers_are_picked_up(app, client, make_user, auth_headers):
+    user = make_user('user@example.com')
+    headers = auth_headers(user)
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 200
+
+    token_blocklist.revoke_token(decode_token(headers['Authorization'].split()[1]))
+    # As seen by another worker: its filter predates the revocation and is due for a sync
+    token_blocklist._bloom = BloomFilter(10)
+    token_blocklist._last_id = 0
+    token_blocklist._last_sync = 0
+
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 401
+
+
+def test_checking_a_token_never_purges_or_commits(app, client, make_user, auth_headers):
+    headers = auth_headers(make_user('user@example.com'))
+    db.session.add(RevokedToken(jti='expired', token_type='access', expires_at=datetime.utcnow() - timedelta(days=1)))
+    db.session.commit()
+    commits = []
+
+    def count_commit(session):
+        commits.append(session)
+    event.listen(Session, 'after_commit', count_commit)
+    # Due for a rebuild
+    token_blocklist._last_rebuild = 0
+
+    try:
+        response = client.get('/api/v1/auth/me', headers=headers)
+    finally:
+        event.remove(Session, 'after_commit', count_commit)
+    assert response.status_code == 200
+    assert commits == []
+    assert RevokedToken.query.filter_by(jti='expired').count() == 1
+    assert token_blocklist._last_rebuild > 0
+
+
+def test_cli_purges_expired_revocations(app):
+    db.session.add(RevokedToken(jti='expired', token_type='access', expires_at=datetime.utcnow() - timedelta(days=1)))
+    db.session.add(RevokedToken(jti='current', token_type='access', expires_at=datetime.utcnow() + timedelta(days=1)))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(purge_revoked_tokens)
+    assert result.exit_code == 0, result.output
+    assert 'Purged 1 ' in result.output
+    assert [row.jti for row in RevokedToken.query.all()] == ['current']
+
+
+def test_user_revocation_compares_whole_seconds(app, make_user):
+    user = make_user('user@example.com')
+    token_blocklist.revoke_user(user.id)
+    revoked_at = RevokedToken.query.filter_by(jti=f'user:{user.id}').one().revoked_at
+    second = int((revoked_at - datetime(1970, 1, 1)).total_seconds())
+
+    def is_revoked(iat):
+        return token_blocklist.is_revoked({'jti': str(uuid.uuid4()), 'sub': str(user.id), 'iat': iat})
+
+    assert is_revoked(second - 1)
+    # Issued in the same second: it may predate the revocation
+    assert is_revoked(second)
+    assert not is_revoked(second + 1)
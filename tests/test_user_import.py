@@ -0,0 +1,81 @@
+import io
+import pytest
+from app import db
+from app.models.email_outbox import EmailOutbox
+from app.models.user import User
+from app.services.user_import_service import import_invitations, parse_invitation_csv
+
+
+def csv_lines(text):
+    return io.StringIO(text)
+
+
+def test_parse_reads_optional_columns():
+    invitations, errors = parse_invitation_csv(csv_lines(
+        'email,first_name,last_name,is_admin\n'
+        ' ada@example.com , Ada , Lovelace ,yes\n'
+        'alan@example.com,,,\n'
+    ))
+    assert errors == []
+    assert invitations == [
+        {'email': 'ada@example.com', 'first_name': 'Ada', 'last_name': 'Lovelace', 'is_admin': True},
+        {'email': 'alan@example.com', 'first_name': None, 'last_name': None, 'is_admin': False}
+    ]
+
+
+def test_parse_reports_invalid_emails_by_line():
+    invitations, errors = parse_invitation_csv(csv_lines('email\nada@example.com,\nnot-an-email\n\n,\n'))
+    # The trailing comma adds a field beyond the header, which is ignored
+    assert [invitation['email'] for invitation in invitations] == ['ada@example.com']
+    assert errors == [
+        {'line': 3, 'message': "Invalid email: 'not-an-email'"},
+        {'line': 5, 'message': "Invalid email: ''"}
+    ]
+
+
+@pytest.mark.parametrize('text', ['', 'name,first_name\nada@example.com,Ada\n'])
+def test_parse_requires_an_email_column(text):
+    with pytest.raises(ValueError, match="'email' column"):
+        parse_invitation_csv(csv_lines(text))
+
+
+def test_import_skips_duplicates_and_existing_users(app, make_user):
+    make_user('existing@example.com')
+    invitations, _ = parse_invitation_csv(csv_lines(
+        'email\nnew@example.com\nexisting@example.com\nnew@example.com\nother@example.com\n'
+    ))
+
+    assert import_invitations(invitations) == {'created': 2, 'existing': 1, 'duplicates': 1}
+    created = User.query.filter(User.email.in_(['new@example.com', 'other@example.com'])).all()
+    assert len(created) == 2
+    assert all(not user.is_active and user.invitation_token for user in created)
+    assert sorted(entry.recipient for entry in EmailOutbox.query) == ['new@example.com', 'other@example.com']
+
+
+def test_import_without_emails_queues_nothing(app):
+    invitations, _ = parse_invitation_csv(csv_lines('email\nnew@example.com\n'))
+
+    assert import_invitations(invitations, send_emails=False)['created'] == 1
+    assert User.query.filter_by(email='new@example.com').one().invitation_token
+    assert EmailOutbox.query.count() == 0
+
+
+def test_endpoint_reports_created_users_and_line_errors(client, admin, admin_headers):
+    body = 'email\nnew@example.com\nbroken\nadmin@realtex.ai\nnew@example.com\n'
+    response = client.post('/api/v1/admin/users/import', data=body, content_type='text/csv', headers=admin_headers)
+
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary['created'] == 1
+    assert summary['existing'] == 1
+    assert summary['duplicates'] == 1
+    assert summary['invalid'] == 1
+    assert summary['errors'] == [{'line': 3, 'message': "Invalid email: 'broken'"}]
+
+
+def test_endpoint_rejects_csv_without_email_column(client, admin_headers):
+    response = client.post('/api/v1/admin/users/import', data='name\nAda\n', content_type='text/csv',
+                           headers=admin_headers)
+    assert response.status_code == 400
+    assert response.get_json()['message'].startswith('Invalid CSV')
+    assert db.session.query(User).count() == 1
@@ -0,0 +1,95 @@
+import pytest
+from app import db
+from app.models.user import User, UNUSABLE_PASSWORD
+from app.services.user_query_service import search_users
+
+
+def add_user(email, first_name=None, last_name=None):
+    db.session.execute(db.insert(User), [{
+        'email': email, 'password_hash': UNUSABLE_PASSWORD, 'first_name': first_name, 'last_name': last_name
+    }])
+    db.session.commit()
+
+
+def emails(users):
+    return [user['email'] for user in users]
+
+
+def test_ranking_puts_exact_then_email_prefix_then_name_prefix_then_substring(app):
+    add_user('zed.annabel@example.com')
+    add_user('bob@example.com', first_name='Anna')
+    add_user('anna.b@example.com')
+    add_user('anna@example.com')
+    add_user('carl@example.com', last_name='Annan')
+
+    users, has_more = search_users('ANNA@example.com')
+    assert emails(users) == ['anna@example.com']
+    assert not has_more
+
+    users, _ = search_users('anna')
+    assert emails(users) == [
+        'anna.b@example.com', 'anna@example.com',      # email prefix, by email
+        'bob@example.com', 'carl@example.com',          # first or last name prefix
+        'zed.annabel@example.com'                       # substring
+    ]
+
+
+def test_exact_email_match_ranks_first(app):
+    add_user('anna@example.com.au')
+    add_user('anna@example.com')
+
+    users, _ = search_users('anna@example.com')
+    assert emails(users) == ['anna@example.com', 'anna@example.com.au']
+
+
+def test_short_terms_only_match_prefixes(app):
+    add_user('an@example.com')
+    add_user('joan@example.com')
+
+    users, _ = search_users('an')
+    assert emails(users) == ['an@example.com']
+
+
+def test_like_wildcards_are_matched_literally(app):
+    add_user('a_b@example.com')
+    add_user('axb@example.com')
+
+    users, _ = search_users('a_b')
+    assert emails(users) == ['a_b@example.com']
+
+
+def test_pages_split_the_ranked_results_without_overlap(app):
+    for number in range(5):
+        add_user(f'user{number}@example.com')
+
+    first, first_more = search_users('user', page=1, per_page=2)
+    second, second_more = search_users('user', page=2, per_page=2)
+    last, last_more = search_users('user', page=3, per_page=2)
+    assert emails(first) == ['user0@example.com', 'user1@example.com']
+    assert emails(second) == ['user2@example.com', 'user3@example.com']
+    assert emails(last) == ['user4@example.com']
+    assert (first_more, second_more, last_more) == (True, True, False)
+    assert search_users('user', page=4, per_page=2) == ([], False)
+
+
+def test_full_last_page_reports_no_more_results(app):
+    for number in range(4):
+        add_user(f'user{number}@example.com')
+
+    assert search_users('user', page=2, per_page=2)[1] is False
+
+
+def test_search_endpoint(client, admin_headers):
+    add_user('anna@example.com')
+    response = client.get('/api/v1/admin/users/search?q=anna&per_page=500', headers=admin_headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert emails(body['items']) == ['anna@example.com']
+    assert body['per_page'] == 100
+    assert body['has_more'] is False
+
+
+@pytest.mark.parametrize('query', ['', 'q=%20%20'])
+def test_search_requires_text(client, admin_headers, query):
+    assert client.get(f'/api/v1/admin/users/search?{query}', headers=admin_headers).status_code == 400
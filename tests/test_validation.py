@@ -0,0 +1,80 @@
+import pytest
+from app.utils.validation import validate_json
+
+URL = '/api/v1/predictions/price'
+PAYLOAD = {
+    'location': 'London, UK',
+    'size_sqft': 1200,
+    'num_bedrooms': 3,
+    'num_bathrooms': 2,
+    'property_type': 'Detached House'
+}
+
+
+@pytest.fixture
+def user_headers(make_user, auth_headers):
+    return auth_headers(make_user('user@example.com'))
+
+
+def post(client, headers, **changes):
+    body = {name: value for name, value in dict(PAYLOAD, **changes).items() if value is not None}
+    return client.post(URL, json=body, headers=headers)
+
+
+def test_valid_body_is_accepted(client, user_headers):
+    assert post(client, user_headers).status_code == 200
+
+
+def test_missing_required_field(client, user_headers):
+    response = post(client, user_headers, num_bedrooms=None)
+
+    assert response.status_code == 400
+    assert response.get_json() == {
+        'message': 'Missing required field: num_bedrooms',
+        'errors': [{'field': 'num_bedrooms', 'message': 'Missing required field: num_bedrooms'}]
+    }
+
+
+def test_wrong_type(client, user_headers):
+    response = post(client, user_headers, size_sqft='1200')
+
+    assert response.status_code == 400
+    message = "Invalid value for size_sqft: '1200' is not of type 'number'"
+    assert response.get_json() == {'message': message, 'errors': [{'field': 'size_sqft', 'message': message}]}
+
+
+def test_every_problem_is_listed_once(client, user_headers):
+    response = post(client, user_headers, location=None, property_type=None, num_bathrooms='two')
+
+    assert response.status_code == 400
+    errors = response.get_json()['errors']
+    assert sorted(error['field'] for error in errors) == ['location', 'num_bathrooms', 'property_type']
+    assert response.get_json()['message'] == errors[0]['message']
+
+
+@pytest.mark.parametrize('body', [None, {}, []])
+def test_empty_body(client, user_headers, body):
+    response = client.post(URL, json=body, headers=user_headers)
+    assert response.status_code == 400
+    assert response.get_json() == {'message': 'No data provided'}
+
+
+def test_non_object_body(client, user_headers):
+    response = client.post(URL, json=['London'], headers=user_headers)
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0]['field'] is None
+    assert response.get_json()['message'].startswith('Invalid request body: ')
+
+
+def test_view_without_body_schema_is_rejected_at_definition():
+    def view():
+        """
+        No body
+        ---
+        responses:
+          200:
+            description: OK
+        """
+
+    with pytest.raises(ValueError, match='no body parameter schema'):
+        validate_json(view)